@@ -3,10 +3,12 @@ set -euo pipefail
 cd "$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 PROJECT_ROOT="$(pwd)"
 
+# --with-labels : écrit aussi BGL_matrix_with_labels.csv (Label par fenêtre, même passage)
 python3 "$PROJECT_ROOT/2_features_extraction/generate_features_matrix.py" --dataset bgl \
  --input "$PROJECT_ROOT/data/parsed/BGL/BGL.log_structured.csv" \
  --output "$PROJECT_ROOT/data/features/BGL_matrix.csv" \
- --timestamp-col Time --window-minutes 5 --step-minutes 5
+ --timestamp-col Time --window-minutes 5 --step-minutes 5 \
+ --with-labels
 
 python3 "$PROJECT_ROOT/2_features_extraction/generate_features_matrix.py" --dataset hdfs \
  --input "$PROJECT_ROOT/data/parsed/HDFS/HDFS.log_structured.csv" \
@@ -11,5 +11,4 @@ python3 $PROJECT_ROOT/2_features_extraction/analyze_failures_repartition.py \
 
 python3 $PROJECT_ROOT/2_features_extraction/analyze_failures_repartition.py \
     --dataset bgl \
-    --matrix_csv $PROJECT_ROOT/data/features/BGL_matrix.csv \
-    --structured_csv $PROJECT_ROOT/data/parsed/BGL/BGL.log_structured.csv
+    --matrix_csv $PROJECT_ROOT/data/features/BGL_matrix_with_labels.csv
@@ -13,6 +13,7 @@ python3 $PROJECT_ROOT/3_model_contruction/reduce_multicollinearity.py \
     --vif 10.0 \
     --importances $PROJECT_ROOT/data/features/HDFS_feature_importances.csv
 
+# BGL_matrix_with_labels.csv : généré par 2_generate_features_matrix.sh (--with-labels)
 python3 $PROJECT_ROOT/3_model_contruction/reduce_multicollinearity.py \
     --dataset bgl \
     --input $PROJECT_ROOT/data/features/BGL_matrix_with_labels.csv \
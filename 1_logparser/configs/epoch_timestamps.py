@@ -0,0 +1,166 @@
+"""
+epoch_timestamps.py
+-------------------
+Calcul, une seule fois au parsing, d'une colonne `EpochUs` (int64, microsecondes
+depuis epoch UTC) dans le CSV structuré. Les étapes suivantes (fenêtrage,
+chronologie, entraînement) lisent directement cette colonne au lieu de
+re-parser les dates sous forme de chaînes.
+
+Décodage vectorisé (numpy), sans pd.to_datetime :
+- BGL  : colonne Time à format fixe "2005-06-03-15.42.50.363779" → décodage octet par octet.
+- HDFS : colonnes Date (yymmdd, ex: 81109 → 2008-11-09) et Time (hhmmss) lues comme entiers.
+
+Les timestamps invalides sont laissés vides (NA).
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+# Colonne int64 (µs depuis epoch) ajoutée au CSV structuré. Les étapes suivantes
+# s'exécutent depuis leur propre dossier et relisent ce nom dans leur configs/ :
+# 2_features_extraction/configs/windows.py et 3_model_contruction/configs/build_chronological_matrix.py
+EPOCH_COL = "EpochUs"
+
+# Format fixe BGL : Y = année, M = mois, D = jour, h/m/s = heure/minute/seconde, f = microsecondes
+BGL_TIME_PATTERN = "YYYY-MM-DD-hh.mm.ss.ffffff"
+
+
+# Nombre de jours depuis 1970-01-01 (algorithme "days_from_civil", vectorisé)
+def _days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    mp = (month + 9) % 12
+    doy = (153 * mp + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+# Nombre de jours de chaque mois (index 1..12), février bissextile traité à part
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+# Nombre de jours du mois (années bissextiles comprises) ; 0 pour un mois hors bornes
+def _days_in_month(year: np.ndarray, month: np.ndarray) -> np.ndarray:
+    in_range = (month >= 1) & (month <= 12)
+    days = _DAYS_IN_MONTH[np.where(in_range, month, 0)]
+    is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return days + ((month == 2) & is_leap)
+
+
+# Assembler les champs en microsecondes epoch ; -1 pour les champs hors bornes
+# (jour comparé à la longueur réelle du mois : 2005-02-30 est invalide, pas 2005-03-02)
+def _fields_to_epoch_us(year, month, day, hour, minute, second, micro) -> np.ndarray:
+    valid = (
+        (month >= 1) & (month <= 12) & (day >= 1) & (day <= _days_in_month(year, month))
+        & (hour < 24) & (minute < 60) & (second < 61)
+    )
+    days = _days_from_civil(year, month, day)
+    epoch_us = ((days * 24 + hour) * 60 + minute) * 60 + second
+    epoch_us = epoch_us * 1_000_000 + micro
+    return np.where(valid, epoch_us, -1)
+
+
+def decode_fixed_width_timestamps(
+    values: pd.Series,
+    pattern: str = BGL_TIME_PATTERN,
+    chunk_size: int = 1 << 16,
+) -> pd.Series:
+    """
+    Décode des timestamps texte à largeur fixe (ex : BGL) en microsecondes epoch.
+
+    Les chaînes sont converties en une matrice d'octets (n, largeur) : la validation
+    (chiffres / séparateurs) est une comparaison à un gabarit et tous les champs sont
+    extraits d'un seul produit matriciel chiffres × poids décimaux, par blocs de lignes.
+    """
+    width = len(pattern)
+    symbols = "YMDhmsf"
+
+    # Gabarit : positions des chiffres, octets attendus pour les séparateurs,
+    # poids décimaux de chaque position pour chaque champ (Y, M, D, h, m, s, f)
+    is_digit = np.array([c in symbols for c in pattern])
+    expected = np.frombuffer(pattern.encode("ascii"), dtype=np.uint8)
+    weights = np.zeros((width, len(symbols)), dtype=np.float32)
+    for k, symbol in enumerate(symbols):
+        positions = [pos for pos, c in enumerate(pattern) if c == symbol]
+        for rank, pos in enumerate(positions):
+            weights[pos, k] = 10 ** (len(positions) - 1 - rank)
+    n_frac = pattern.count("f")
+    weights[:, symbols.index("f")] *= 10 ** (6 - n_frac)
+
+    # Étape 1. Octets (un octet de plus que la largeur : non nul ⇔ chaîne trop longue)
+    text = values.astype(str)
+    try:
+        raw = text.to_numpy(dtype=f"S{width + 1}")
+    except UnicodeEncodeError:
+        raw = text.where(text.str.isascii(), "").to_numpy(dtype=f"S{width + 1}")
+    all_chars = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, width + 1)
+
+    epoch_us = np.empty(len(all_chars), dtype=np.int64)
+    valid = np.empty(len(all_chars), dtype=bool)
+
+    for lo in range(0, len(all_chars), chunk_size):
+        chars = all_chars[lo:lo + chunk_size]
+        body = chars[:, :width]
+        digits = body - np.uint8(ord("0"))  # uint8 : tout non-chiffre devient > 9
+
+        # Étape 2. Validation : chiffres aux positions de champ, séparateurs exacts, longueur exacte
+        ok = np.where(is_digit, digits <= 9, body == expected).all(axis=1) & (chars[:, width] == 0)
+
+        # Étape 3. Tous les champs d'un coup (entiers < 2**24 : exacts en float32)
+        fields = (digits.astype(np.float32) @ weights).astype(np.int64)
+        block = _fields_to_epoch_us(*(fields[:, k] for k in range(len(symbols))))
+
+        epoch_us[lo:lo + chunk_size] = block
+        valid[lo:lo + chunk_size] = ok & (block >= 0)
+
+    return pd.Series(epoch_us, index=values.index).where(valid).astype("Int64")
+
+
+def decode_hdfs_timestamps(date: pd.Series, time: pd.Series) -> pd.Series:
+    """
+    Décode les colonnes HDFS Date (yymmdd) et Time (hhmmss), lues comme entiers,
+    en microsecondes epoch. Ex : Date=81109, Time=203615 → 2008-11-09 20:36:15.
+    """
+    date_num = pd.to_numeric(date, errors="coerce")
+    time_num = pd.to_numeric(time, errors="coerce")
+    valid = (date_num.notna() & time_num.notna()).to_numpy(copy=True)
+
+    d = date_num.fillna(0).to_numpy(dtype=np.int64)
+    t = time_num.fillna(0).to_numpy(dtype=np.int64)
+
+    epoch_us = _fields_to_epoch_us(
+        2000 + d // 10000, d // 100 % 100, d % 100,
+        t // 10000, t // 100 % 100, t % 100,
+        np.zeros(len(d), dtype=np.int64),
+    )
+    valid &= epoch_us >= 0
+
+    return pd.Series(epoch_us, index=date.index).where(valid).astype("Int64")
+
+
+def add_epoch_column(structured_path: str, dataset_name: str) -> None:
+    """
+    Ajoute (ou recalcule) la colonne EpochUs dans le CSV structuré, juste après
+    la colonne de temps, et réécrit le fichier en place.
+    """
+    df_struct = pd.read_csv(structured_path)
+
+    if dataset_name == "BGL":
+        epoch_us = decode_fixed_width_timestamps(df_struct["Time"], BGL_TIME_PATTERN)
+    elif dataset_name == "HDFS":
+        epoch_us = decode_hdfs_timestamps(df_struct["Date"], df_struct["Time"])
+    else:
+        raise ValueError(f"Dataset inconnu pour EpochUs : {dataset_name}")
+
+    n_invalid = int(epoch_us.isna().sum())
+    if n_invalid:
+        logging.warning(f"{n_invalid} timestamps invalides (EpochUs vide).")
+
+    if EPOCH_COL in df_struct.columns:
+        df_struct = df_struct.drop(columns=[EPOCH_COL])
+    df_struct.insert(df_struct.columns.get_loc("Time") + 1, EPOCH_COL, epoch_us)
+
+    df_struct.to_csv(structured_path, index=False)
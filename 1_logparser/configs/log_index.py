@@ -0,0 +1,308 @@
+"""
+log_index.py
+------------
+Index construits au parsing sur le CSV structuré, pour répondre aux requêtes
+ad hoc ("toutes les lignes E37 entre t1 et t2 sur le rack R34") sans recharger
+tout le fichier dans pandas.
+
+Contenu du dossier d'index (<structured_csv>.index/, .npy ouverts en memory-map) :
+- row_offsets.npy   : (n_rows + 1,) int64 → position en octets de chaque ligne du CSV ;
+- epoch_us.npy      : (n_rows,) int64     → EpochUs de chaque ligne (NO_TIMESTAMP si vide) ;
+- time_order.npy    : (n_valid,) int64    → lignes triées par EpochUs (tri stable) ;
+- epoch_sorted.npy  : (n_valid,) int64    → EpochUs triés (bornes temporelles par searchsorted) ;
+- <clé>_values.npy  : valeurs triées de la clé : EventId, et Node (BGL) ou BlockId int64 (HDFS) ;
+- <clé>_codes.npy   : (n_rows,) int32 → code de la valeur de chaque ligne (-1 si absente) ;
+- <clé>_rows.npy / <clé>_offsets.npy → listes de postings (lignes croissantes par valeur) ;
+- meta.json         : dataset, nombre de lignes, clés indexées, taille du CSV.
+
+Les postings d'une clé sont rangés dans l'ordre des valeurs triées : un préfixe de
+nœud ("R34", "R34-M1") correspond à une plage contiguë de codes, donc à une seule
+tranche de <clé>_rows.
+
+Requête : seul le critère le plus sélectif (postings ou plage de temps) est
+matérialisé ; les autres sont des filtres sur les codes / timestamps de ces lignes.
+Puis seules les lignes retenues sont lues dans le CSV (seek sur row_offsets).
+
+Fonctions / classes :
+- build_log_index : Construction (un passage sur le CSV structuré).
+- LogIndex        : Chargement, intersection des critères (rows) et lecture ciblée (fetch).
+"""
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from common.block_ids import BLOCK_PREFIX, encode_block_ids
+from configs.epoch_timestamps import EPOCH_COL
+
+
+# EpochUs absent (ligne ignorée par les requêtes temporelles)
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+# Clés indexées par dataset : clé → colonne source (BlockId extrait de Content pour HDFS)
+INDEX_KEYS = {
+    "BGL": {"EventId": "EventId", "Node": "Node"},
+    "HDFS": {"EventId": "EventId", "BlockId": "Content"},
+}
+
+_READ_CHUNK = 1 << 26
+
+
+def default_index_dir(structured_path: str) -> str:
+    return f"{structured_path}.index"
+
+
+# Position en octets du début de chaque ligne de données (+ fin de fichier), lecture par blocs
+def _row_byte_offsets(path: str) -> np.ndarray:
+    newlines = []
+    position = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            newlines.append(np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord("\n")) + position)
+            position += len(chunk)
+
+    starts = np.concatenate(newlines) + 1 if newlines else np.empty(0, dtype=np.int64)
+    # La première fin de ligne clôt l'en-tête ; dernière ligne sans "\n" final acceptée
+    starts = starts.astype(np.int64)
+    if len(starts) == 0 or starts[-1] != position:
+        starts = np.append(starts, position)
+    return starts
+
+
+# Codes par ligne (int32, -1 si absent) et listes de postings : lignes groupées par valeur
+# (valeurs triées), croissantes dans chaque groupe
+def _posting_lists(values: pd.Series):
+    codes, uniques = pd.factorize(values, sort=True)
+    rows = np.flatnonzero(codes >= 0)
+    order = np.argsort(codes[rows], kind="stable")
+
+    offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(codes[rows], minlength=len(uniques)))
+    return codes.astype(np.int32), rows[order].astype(np.int64), offsets, uniques
+
+
+def build_log_index(structured_path: str, dataset_name: str, index_dir: Optional[str] = None) -> str:
+    """
+    Construit les index du CSV structuré (après add_epoch_column) et renvoie le dossier d'index.
+    """
+    if dataset_name not in INDEX_KEYS:
+        raise ValueError(f"Dataset inconnu pour l'index : {dataset_name}")
+    index_dir = index_dir or default_index_dir(structured_path)
+    os.makedirs(index_dir, exist_ok=True)
+
+    # Étape 1. Colonnes utiles uniquement
+    keys = INDEX_KEYS[dataset_name]
+    df = pd.read_csv(structured_path, usecols=[EPOCH_COL, *dict.fromkeys(keys.values())])
+
+    # Étape 2. Position en octets de chaque ligne (lecture ciblée sans pandas)
+    row_offsets = _row_byte_offsets(structured_path)
+    if len(row_offsets) != len(df) + 1:
+        raise ValueError(
+            f"Nombre de lignes incohérent ({len(row_offsets) - 1} lignes physiques, {len(df)} lignes CSV) : "
+            "champ multi-lignes dans le CSV structuré ?"
+        )
+
+    # Étape 3. Timestamps par ligne + ordre chronologique (et timestamps triés pour searchsorted)
+    epoch = df[EPOCH_COL].astype("Int64")
+    epoch_us = epoch.fillna(NO_TIMESTAMP).to_numpy(dtype=np.int64)
+    valid_rows = np.flatnonzero(epoch.notna().to_numpy(copy=True))
+    time_order = valid_rows[np.argsort(epoch_us[valid_rows], kind="stable")].astype(np.int64)
+
+    np.save(os.path.join(index_dir, "row_offsets.npy"), row_offsets)
+    np.save(os.path.join(index_dir, "epoch_us.npy"), epoch_us)
+    np.save(os.path.join(index_dir, "time_order.npy"), time_order)
+    np.save(os.path.join(index_dir, "epoch_sorted.npy"), epoch_us[time_order])
+
+    # Étape 4. Par clé : valeurs triées (chaînes, ou BlockId int64 pour HDFS), code de chaque
+    #          ligne (-1 si absent) et listes de postings
+    for key, source_col in keys.items():
+        if key == "BlockId":
+            # Même extraction que les matrices et la jointure des labels (common/block_ids.py)
+            values = encode_block_ids(df[source_col])
+        else:
+            values = df[source_col].astype("string")
+
+        codes, rows, offsets, uniques = _posting_lists(values)
+        np.save(os.path.join(index_dir, f"{key}_values.npy"), np.asarray(uniques, dtype=np.int64 if key == "BlockId" else str))
+        np.save(os.path.join(index_dir, f"{key}_codes.npy"), codes)
+        np.save(os.path.join(index_dir, f"{key}_rows.npy"), rows)
+        np.save(os.path.join(index_dir, f"{key}_offsets.npy"), offsets)
+
+    meta = {
+        "dataset": dataset_name,
+        "n_rows": int(len(df)),
+        "source_size": os.path.getsize(structured_path),
+        "keys": list(keys),
+    }
+    with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    logging.info(f"Index du CSV structuré : {index_dir} ({len(df)} lignes, clés {list(keys)})")
+    return index_dir
+
+
+def to_epoch_us(value) -> int:
+    """
+    Borne temporelle d'une requête en µs epoch : entier (µs), format BGL
+    "2005-06-03-15.42.50.363779" ou toute date lisible par pandas ("2008-11-09 20:36:15").
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    text = str(value).strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+
+    ts = pd.to_datetime(text, format="%Y-%m-%d-%H.%M.%S.%f", errors="coerce")
+    if pd.isna(ts):
+        ts = pd.to_datetime(text)
+    return int(ts.value // 1000)
+
+
+@dataclass
+class LogIndex:
+    structured_path: str
+    index_dir: str
+    meta: dict
+
+    @classmethod
+    def load(cls, structured_path: str, index_dir: Optional[str] = None) -> "LogIndex":
+        index_dir = index_dir or default_index_dir(structured_path)
+        meta_path = os.path.join(index_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Index absent : {index_dir} (à construire avec build_log_index).")
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if os.path.getsize(structured_path) != meta["source_size"]:
+            logging.warning(f"{structured_path} a changé depuis la construction de l'index, à reconstruire.")
+
+        return cls(structured_path=structured_path, index_dir=index_dir, meta=meta)
+
+    def _array(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r")
+
+    def values(self, key: str) -> np.ndarray:
+        if key not in self.meta["keys"]:
+            raise ValueError(f"Clé non indexée pour {self.meta['dataset']} : {key} (clés : {self.meta['keys']})")
+        return self._array(f"{key}_values")
+
+    # Plages de codes [lo, hi) d'une clé pour des valeurs exactes ou un préfixe
+    def _code_ranges(self, key: str, exact: Iterable = (), prefix: Optional[str] = None) -> List[tuple]:
+        values = self.values(key)
+        ranges = []
+        for value in exact:
+            lo = int(np.searchsorted(values, value, side="left"))
+            if lo < len(values) and values[lo] == value:
+                ranges.append((lo, lo + 1))
+        if prefix is not None:
+            lo = int(np.searchsorted(values, prefix, side="left"))
+            hi = int(np.searchsorted(values, prefix + "\uffff", side="left"))
+            if hi > lo:
+                ranges.append((lo, hi))
+        return ranges
+
+    def rows(
+        self,
+        event_ids: Optional[Iterable[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        node: Optional[str] = None,
+        block_id=None,
+    ) -> np.ndarray:
+        """
+        Lignes (positions dans le CSV structuré, croissantes) vérifiant tous les critères :
+        EventId dans event_ids, start <= EpochUs < end (µs epoch), Node commençant par
+        `node` (BGL), BlockId égal à block_id (HDFS, "blk_..." ou entier).
+        """
+        # Étape 1. Critères sur les clés → plages de codes ; critère temporel → plage de time_order
+        key_ranges: Dict[str, List[tuple]] = {}
+        if event_ids is not None:
+            key_ranges["EventId"] = self._code_ranges("EventId", exact=[str(e) for e in event_ids])
+        if node is not None:
+            key_ranges["Node"] = self._code_ranges("Node", prefix=str(node))
+        if block_id is not None:
+            text = str(block_id)
+            block = encode_block_ids(pd.Series([text if text.startswith(BLOCK_PREFIX) else BLOCK_PREFIX + text])).iloc[0]
+            if pd.isna(block):
+                raise ValueError(f"BlockId invalide : {block_id}")
+            key_ranges["BlockId"] = self._code_ranges("BlockId", exact=[int(block)])
+
+        time_bounds = None
+        if start is not None or end is not None:
+            epoch_sorted = self._array("epoch_sorted")
+            lo = 0 if start is None else int(np.searchsorted(epoch_sorted, start, side="left"))
+            hi = len(epoch_sorted) if end is None else int(np.searchsorted(epoch_sorted, end, side="left"))
+            time_bounds = (lo, max(lo, hi))
+
+        # Étape 2. Nombre de lignes de chaque critère (offsets / bornes), critère le plus sélectif
+        sizes = {}
+        for key, ranges in key_ranges.items():
+            offsets = self._array(f"{key}_offsets")
+            sizes[key] = sum(int(offsets[hi] - offsets[lo]) for lo, hi in ranges)
+        if time_bounds is not None:
+            sizes["time"] = time_bounds[1] - time_bounds[0]
+
+        if not sizes:
+            return np.arange(self.meta["n_rows"], dtype=np.int64)
+        driver = min(sizes, key=sizes.get)
+        if sizes[driver] == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Étape 3. Matérialisation du critère le plus sélectif uniquement
+        if driver == "time":
+            candidates = np.sort(self._array("time_order")[time_bounds[0]:time_bounds[1]])
+        else:
+            postings, offsets = self._array(f"{driver}_rows"), self._array(f"{driver}_offsets")
+            candidates = np.sort(np.concatenate([postings[offsets[lo]:offsets[hi]] for lo, hi in key_ranges[driver]]))
+
+        # Étape 4. Autres critères : filtres sur les codes / timestamps des seules lignes candidates
+        for key, ranges in key_ranges.items():
+            if key == driver:
+                continue
+            codes = self._array(f"{key}_codes")[candidates]
+            keep = np.zeros(len(candidates), dtype=bool)
+            for lo, hi in ranges:
+                keep |= (codes >= lo) & (codes < hi)
+            candidates = candidates[keep]
+
+        if time_bounds is not None and driver != "time":
+            epoch_us = self._array("epoch_us")[candidates]
+            keep = epoch_us != NO_TIMESTAMP
+            if start is not None:
+                keep &= epoch_us >= start
+            if end is not None:
+                keep &= epoch_us < end
+            candidates = candidates[keep]
+
+        return candidates
+
+    def fetch(self, rows: np.ndarray) -> pd.DataFrame:
+        """
+        Lit uniquement les lignes demandées du CSV structuré (seek sur row_offsets).
+        """
+        row_offsets = self._array("row_offsets")
+        rows = np.asarray(rows, dtype=np.int64)
+
+        with open(self.structured_path, "rb") as f:
+            chunks = [f.read(int(row_offsets[0]))]
+            for start, stop in zip(row_offsets[rows], row_offsets[rows + 1]):
+                f.seek(int(start))
+                line = f.read(int(stop - start))
+                chunks.append(line if line.endswith(b"\n") else line + b"\n")
+
+        return pd.read_csv(io.BytesIO(b"".join(chunks)))
+
+    def query(self, limit: Optional[int] = None, **criteria) -> pd.DataFrame:
+        """
+        rows(**criteria) puis fetch des `limit` premières lignes (toutes si None).
+        """
+        rows = self.rows(**criteria)
+        return self.fetch(rows if limit is None else rows[:limit])
@@ -7,6 +7,8 @@
 #   - Application des regex (pré-normalisation)
 #   - Parsing avec l’algorithme Drain (construction de l’arbre)
 #   - Génération des fichiers CSV structurés et des templates
+#   - Ajout de la colonne EpochUs (timestamps décodés une seule fois)
+#   - Construction des index de requête (temps, EventId, Node / BlockId)
 #
 #
 
@@ -15,6 +17,8 @@ import logging
 import os
 from pathlib import Path
 from configs.remap_event_ids import remap_event_ids
+from configs.epoch_timestamps import add_epoch_column
+from configs.log_index import build_log_index
 from configs.parsing_config import get_parsing_configs
 
 try:
@@ -73,8 +77,15 @@ def parse_dataset(dataset_name: str):
     # Étape 5. Remapping des EventId hexadecimal vers E1, E2, E3, ...
     remap_event_ids(templates_path=templates_path, structured_path=structured_path)
 
+    # Étape 6. Timestamps décodés une seule fois (colonne EpochUs, int64 µs epoch)
+    add_epoch_column(structured_path=structured_path, dataset_name=cfg.dataset_name)
+
+    # Étape 7. Index de requête (cf. query_parsed_data.py)
+    index_dir = build_log_index(structured_path=structured_path, dataset_name=cfg.dataset_name)
+
     logging.info(f"Fichier structuré  : {structured_path}")
     logging.info(f"Fichier templates  : {templates_path}")
+    logging.info(f"Index de requête   : {index_dir}")
     logging.info("=== Parsing terminé ===")
 
 
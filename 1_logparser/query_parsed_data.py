@@ -0,0 +1,87 @@
+# query_parsed_data.py
+#
+# Requêtes ad hoc sur un CSV structuré, via les index construits au parsing
+# (cf. configs/log_index.py) : seules les lignes correspondantes sont lues.
+#
+# Exemple : toutes les lignes E37 entre t1 et t2 sur le rack R34
+#   python query_parsed_data.py --structured-csv data/parsed/BGL/BGL.log_structured.csv \
+#       --event E37 --start 2005-06-03-15.00.00.000000 --end 2005-06-04-00.00.00.000000 --node R34
+#
+
+import argparse
+import logging
+import os
+import time
+
+from configs.log_index import LogIndex, build_log_index, default_index_dir, to_epoch_us
+
+
+def setup_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] [%(levelname)s] %(message)s",
+    )
+
+
+# Construction du parser d’arguments CLI
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Requêtes sur un CSV structuré Drain (EventId, plage de temps, nœud BGL, BlockId HDFS)."
+    )
+
+    parser.add_argument("--structured-csv", type=str, required=True, help="Chemin vers le fichier *_structured.csv.")
+    parser.add_argument("--event", type=str, nargs="+", default=None, help="EventId recherchés (ex : E37 E5).")
+    parser.add_argument("--start", type=str, default=None, help="Début (inclus) : µs epoch ou date (ex : 2005-06-03-15.42.50.000000).")
+    parser.add_argument("--end", type=str, default=None, help="Fin (exclue) : µs epoch ou date.")
+    parser.add_argument("--node", type=str, default=None, help="BGL : préfixe de nœud (ex : R34, R34-M1, R34-M1-N8).")
+    parser.add_argument("--block-id", type=str, default=None, help="HDFS : BlockId (ex : blk_-5974833545991408899).")
+    parser.add_argument("--limit", type=int, default=20, help="Nombre maximal de lignes lues et affichées.")
+    parser.add_argument("--output", type=str, default=None, help="Optionnel : CSV des lignes trouvées (toutes, sans --limit).")
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        choices=["HDFS", "BGL"],
+        default=None,
+        help="Dataset du CSV : nécessaire seulement si l'index doit être (re)construit.",
+    )
+    parser.add_argument("--rebuild-index", action="store_true", help="Reconstruire l'index avant la requête.")
+
+    return parser.parse_args()
+
+
+def main():
+    setup_logging()
+    args = parse_args()
+
+    # Étape 1. Index (construit si absent, ex : CSV parsé avant l'ajout des index)
+    if args.rebuild_index or not os.path.exists(default_index_dir(args.structured_csv)):
+        if args.dataset is None:
+            raise ValueError("Index absent : --dataset est requis pour le construire.")
+        build_log_index(args.structured_csv, args.dataset)
+    index = LogIndex.load(args.structured_csv)
+
+    # Étape 2. Lignes vérifiant tous les critères
+    t0 = time.perf_counter()
+    rows = index.rows(
+        event_ids=args.event,
+        start=None if args.start is None else to_epoch_us(args.start),
+        end=None if args.end is None else to_epoch_us(args.end),
+        node=args.node,
+        block_id=args.block_id,
+    )
+    t1 = time.perf_counter()
+
+    # Étape 3. Lecture ciblée des lignes
+    df = index.fetch(rows if args.output else rows[:args.limit])
+    t2 = time.perf_counter()
+
+    logging.info(f"{len(rows)} lignes trouvées (index : {(t1 - t0) * 1e3:.1f} ms, lecture : {(t2 - t1) * 1e3:.1f} ms)")
+    print(df.head(args.limit))
+
+    if args.output:
+        df.to_csv(args.output, index=False)
+        logging.info(f"Lignes sauvegardées : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
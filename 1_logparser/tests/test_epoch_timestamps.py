@@ -0,0 +1,35 @@
+import pandas as pd
+
+from configs.epoch_timestamps import decode_fixed_width_timestamps, decode_hdfs_timestamps
+
+
+def _expected_us(text):
+    return int(pd.Timestamp(text).value // 1000)
+
+
+def test_bgl_timestamps_decode_valid_and_reject_impossible_dates():
+    values = pd.Series([
+        "2005-06-03-15.42.50.363779",
+        "2004-02-29-00.00.00.000001",   # année bissextile
+        "2005-02-29-00.00.00.000000",   # 29 février non bissextile
+        "2005-02-30-15.42.50.363779",
+        "2005-04-31-10.00.00.000000",
+        "1900-02-29-00.00.00.000000",   # siècle non bissextile
+        "2005-06-03 15:42:50.363779",   # séparateurs
+        "2005-06-03-15.42.50.3637790",  # trop long
+        None,
+    ])
+
+    decoded = decode_fixed_width_timestamps(values)
+
+    assert decoded.iloc[0] == _expected_us("2005-06-03 15:42:50.363779")
+    assert decoded.iloc[1] == _expected_us("2004-02-29 00:00:00.000001")
+    assert decoded.iloc[2:].isna().all()
+
+
+def test_hdfs_timestamps_decode_and_reject_impossible_dates():
+    decoded = decode_hdfs_timestamps(pd.Series([81109, 80229, 90229, "x"]), pd.Series([203615, 0, 0, 0]))
+
+    assert decoded.iloc[0] == _expected_us("2008-11-09 20:36:15")
+    assert decoded.iloc[1] == _expected_us("2008-02-29")
+    assert decoded.iloc[2:].isna().all()
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from configs.epoch_timestamps import EPOCH_COL
+from configs.log_index import LogIndex, build_log_index
+
+
+def _write_hdfs_structured(path) -> None:
+    pd.DataFrame({
+        "LineId": [1, 2, 3, 4, 5],
+        EPOCH_COL: [30, 10, None, 20, 40],
+        "Content": [
+            "Receiving block blk_-5974833545991408899 src: /10.0.0.1",
+            "Receiving block blk_-5974833545991408898 src: /10.0.0.2",
+            "Verification succeeded, no block on this line",
+            "Deleting block blk_-5974833545991408899 file /tmp/x",
+            "PacketResponder for block blk_7503483334202473044 terminating",
+        ],
+        "EventId": ["E1", "E1", "E9", "E3", "E2"],
+    }).astype({EPOCH_COL: "Int64"}).to_csv(path, index=False)
+
+
+def test_hdfs_block_query_keeps_19_digit_ids_exact(tmp_path):
+    structured = tmp_path / "HDFS.log_structured.csv"
+    _write_hdfs_structured(structured)
+    build_log_index(str(structured), "HDFS")
+    index = LogIndex.load(str(structured))
+
+    assert index.values("BlockId").tolist() == [-5974833545991408899, -5974833545991408898, 7503483334202473044]
+    assert index.rows(block_id="blk_-5974833545991408899").tolist() == [0, 3]
+    assert index.rows(block_id=-5974833545991408898).tolist() == [1]
+    assert index.fetch(index.rows(block_id="7503483334202473044"))["LineId"].tolist() == [5]
+
+
+def test_rows_combine_event_and_time_criteria(tmp_path):
+    structured = tmp_path / "HDFS.log_structured.csv"
+    _write_hdfs_structured(structured)
+    build_log_index(str(structured), "HDFS")
+    index = LogIndex.load(str(structured))
+
+    # Ligne sans EpochUs exclue de toute requête temporelle
+    assert index.rows(start=0, end=100).tolist() == [0, 1, 3, 4]
+    assert index.rows(event_ids=["E1"], start=15, end=35).tolist() == [0]
@@ -8,6 +8,8 @@ from configs.analysis_failure_bgl import plot_window_anomaly_count
 
 import argparse
 
+import pandas as pd
+
 
 def analyze_failures_repartition_hdfs(matrix_csv, labels_csv, top_k=20):
     df_normaux, df_corrompus, event_cols = load_and_split_hdfs_matrix(
@@ -21,8 +23,19 @@ def analyze_failures_repartition_hdfs(matrix_csv, labels_csv, top_k=20):
 
 def analyze_failures_repartition_bgl(
     matrix_csv: str,
-    structured_csv: str,
+    structured_csv: str = None,
 ) -> None:
+    # 0) Matrice générée avec --with-labels : label déjà calculé par fenêtre
+    if "Label" in pd.read_csv(matrix_csv, nrows=0).columns:
+        plot_window_anomaly_count(
+            matrix_csv=matrix_csv,
+            title="BGL — Fenêtres normales vs anormales (count plot)",
+        )
+        return
+
+    if not structured_csv:
+        raise ValueError("Pour BGL sans colonne Label dans la matrice, vous devez fournir --structured_csv")
+
     # 1) Identifier les EventId de failure depuis le structuré
     failure_event_ids = identify_failure_event_ids(structured_csv)
 
@@ -44,7 +57,7 @@ if __name__ == "__main__":
     parser.add_argument("--dataset", type=str, required=True, choices=["hdfs", "bgl"], help="Nom du dataset : hdfs ou bgl")
     parser.add_argument("--matrix_csv", type=str, required=True, help="Chemin vers le fichier *_matrix.csv")
     parser.add_argument("--labels_csv", type=str, required=False, help="Chemin vers le fichier *_label.csv (HDFS seulement)")
-    parser.add_argument("--structured_csv", type=str, required=False, help="Chemin vers le fichier *_structured.csv (BGL seulement)")
+    parser.add_argument("--structured_csv", type=str, required=False, help="Chemin vers le fichier *_structured.csv (BGL seulement, inutile si la matrice contient Label)")
     parser.add_argument("--top_k", type=int, default=20, help="Top-k EventId à afficher")
 
     args = parser.parse_args()
@@ -66,8 +79,6 @@ if __name__ == "__main__":
         )
 
     elif args.dataset == "bgl":
-        if not args.structured_csv:
-            raise ValueError("Pour BGL, vous devez fournir --structured_csv")
         analyze_failures_repartition_bgl(
             matrix_csv=args.matrix_csv,
             structured_csv=args.structured_csv,
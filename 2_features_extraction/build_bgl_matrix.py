@@ -1,19 +1,37 @@
 import pandas as pd
-from typing import Dict, Any
-from configs.windows import apply_sliding_window
+from typing import Dict, Any, Optional
+from configs.windows import (
+    apply_sliding_window, apply_sliding_window_fields, apply_gap_sessions,
+    WEIGHT_COL, LABEL_COL, FAILURE_COUNT_COL, NORMAL_LABEL,
+)
+
+
+# Champs agrégés par build_bgl_matrix_multi_field : colonne → préfixe des colonnes de comptes
+# (EventId sans préfixe : mêmes colonnes E1, ..., EN que build_bgl_matrix_sliding)
+BGL_COUNT_FIELDS = {
+    "EventId": "",
+    "Level": "Level:",
+    "Component": "Component:",
+    "Type": "Type:",
+}
+
+# Champs dont on compte les valeurs distinctes par fenêtre
+BGL_DISTINCT_FIELDS = {
+    "Node": "Node:nunique",
+}
 
 
 # Étape 1. Fonction d’agrégation spécifique à BGL (histogramme EventId)
 def bgl_agg_eventid_histogram(
     df_window: pd.DataFrame,
-    window_start: pd.Timestamp,
-    window_end: pd.Timestamp
+    window_start: int,
+    window_end: int
 ) -> Dict[str, Any]:
 
     # Étape A. Compter les occurrences des EventId
     event_counts = df_window["EventId"].value_counts().to_dict()
 
-    # Étape B. Ajouter les métadonnées temporelles
+    # Étape B. Ajouter les métadonnées temporelles (µs epoch, int64)
     row = {
         "window_start": window_start,
         "window_end": window_end,
@@ -23,21 +41,42 @@ def bgl_agg_eventid_histogram(
     return row
 
 
+# Variante avec labels : nombre de lignes en failure (Label != "-") et label binaire de la fenêtre
+def bgl_agg_eventid_histogram_with_labels(
+    df_window: pd.DataFrame,
+    window_start: int,
+    window_end: int
+) -> Dict[str, Any]:
+    row = bgl_agg_eventid_histogram(df_window, window_start, window_end)
+
+    failures = int((df_window[LABEL_COL].astype(str) != NORMAL_LABEL).sum())
+    row[FAILURE_COUNT_COL] = failures
+    row[LABEL_COL] = int(failures > 0)
+
+    return row
+
+
 # Étape 2. Fonction principale : construction de la matrice BGL
 def build_bgl_matrix_sliding(
     df: pd.DataFrame,
     timestamp_col: str = "Timestamp",
     window_minutes: int = 5,
     step_minutes: int = 1,
+    start_time: Optional[int] = None,
+    skip_empty: bool = False,
+    with_labels: bool = False,
 ) -> pd.DataFrame:
 
     # Étape A. Utiliser la primitive générique apply_sliding_window()
+    # (with_labels : failure_count + Label calculés dans le même passage que les comptes)
     matrix = apply_sliding_window(
         df=df,
         timestamp_col=timestamp_col,
         window_minutes=window_minutes,
         step_minutes=step_minutes,
-        agg_func=bgl_agg_eventid_histogram,
+        agg_func=bgl_agg_eventid_histogram_with_labels if with_labels else bgl_agg_eventid_histogram,
+        start_time=start_time,
+        skip_empty=skip_empty,
     )
 
     # Étape B. Remplacer les valeurs manquantes par 0
@@ -50,7 +89,60 @@ def build_bgl_matrix_sliding(
     matrix[numeric_cols] = matrix[numeric_cols].astype(int)
 
     # Étape D. Tri des colonnes (EventId triés afin d'avoir le format : Start, end, E1, E2, ..., EN)
-    event_cols = [c for c in matrix.columns if c not in ("window_start", "window_end")]
-    matrix = matrix[["window_start", "window_end"] + sorted(event_cols)]
+    # (avec skip_empty : Start, end, window_weight, E1, ..., EN ; avec with_labels : ..., failure_count, Label)
+    meta_cols = ["window_start", "window_end"] + ([WEIGHT_COL] if skip_empty else [])
+    label_cols = [FAILURE_COUNT_COL, LABEL_COL] if with_labels else []
+    event_cols = [c for c in matrix.columns if c not in meta_cols + label_cols]
+    matrix = matrix[meta_cols + sorted(event_cols) + label_cols]
 
     return matrix
+
+
+# Variante multi-champs : EventId + Level / Component / Type + nombre de nœuds distincts,
+# en un seul passage vectorisé (pas d'agg_func Python par fenêtre)
+def build_bgl_matrix_multi_field(
+    df: pd.DataFrame,
+    timestamp_col: str = "Timestamp",
+    window_minutes: int = 5,
+    step_minutes: int = 1,
+    start_time: Optional[int] = None,
+    skip_empty: bool = False,
+    count_fields: Optional[Dict[str, str]] = None,
+    distinct_fields: Optional[Dict[str, str]] = None,
+    with_labels: bool = False,
+) -> pd.DataFrame:
+
+    # Étape A. Champs absents du CSV structuré ignorés (ex : parsing avec un autre log_format)
+    count_fields = {f: p for f, p in (count_fields or BGL_COUNT_FIELDS).items() if f in df.columns}
+    distinct_fields = {f: c for f, c in (distinct_fields or BGL_DISTINCT_FIELDS).items() if f in df.columns}
+
+    # Étape B. Format : Start, end, [window_weight], E1, ..., EN, Level:..., Component:..., Node:nunique, [failure_count, Label]
+    return apply_sliding_window_fields(
+        df=df,
+        timestamp_col=timestamp_col,
+        window_minutes=window_minutes,
+        step_minutes=step_minutes,
+        count_fields=count_fields,
+        distinct_fields=distinct_fields,
+        start_time=start_time,
+        skip_empty=skip_empty,
+        with_labels=with_labels,
+    )
+
+
+# Variante par sessions : événements de chaque nœud regroupés par inactivité (gap_minutes)
+def build_bgl_matrix_sessions(
+    df: pd.DataFrame,
+    timestamp_col: str = "Timestamp",
+    gap_minutes: float = 5,
+    node_col: str = "Node",
+) -> pd.DataFrame:
+
+    # Format : session_start, session_end, Node, E1, ..., EN (triées chronologiquement)
+    matrix = apply_gap_sessions(
+        df=df,
+        timestamp_col=timestamp_col,
+        gap_minutes=gap_minutes,
+        node_col=node_col,
+    )
+    return matrix.sort_values(["session_start", node_col], kind="stable").reset_index(drop=True)
@@ -1,33 +1,116 @@
-import re
+import numpy as np
 import pandas as pd
-from configs.windows import apply_windows_by_session
-from typing import Optional
+from configs.windows import EPOCH_COL  # (avant common : configs/__init__.py ajoute la racine du projet au chemin)
+from common.block_ids import encode_block_ids
 
-# Étape 1. Fonction spécifique HDFS pour extraire le BlockId
-BLOCK_REGEX = re.compile(r"blk_-?\d+")
+# Niveaux considérés comme erreur pour time_to_error_s
+ERROR_LEVELS = ("WARN", "ERROR", "FATAL")
 
-def hdfs_block_id_extractor(row: pd.Series) -> Optional[str]:
-    content = row.get("Content", "")
-    match = BLOCK_REGEX.search(str(content))
-    if match:
-        return match.group(0)
-    return None
+# Colonnes temporelles ajoutées avec timing=True (first_ts / last_ts en µs epoch)
+TIMING_COLS = ["first_ts", "last_ts", "duration_s", "gap_mean_s", "gap_max_s", "time_to_error_s"]
 
 
-# Étape 2. Fonction d'agrégation par BlockId → features
-def hdfs_agg_event_id_histogram(df_block: pd.DataFrame, block_id: str) -> dict:
-    counts = df_block["EventId"].value_counts().to_dict()
-    return {
-        "BlockId": block_id,
-        **counts,
-    }
+# Timestamps HDFS en µs epoch : colonne EpochUs du parsing, sinon Date (yymmdd) + Time (hhmmss)
+def _hdfs_epoch_microseconds(df: pd.DataFrame) -> pd.Series:
+    if EPOCH_COL in df.columns:
+        return df[EPOCH_COL].astype("Int64")
+
+    ts = pd.to_datetime(
+        df["Date"].astype(str).str.zfill(6) + df["Time"].astype(str).str.zfill(6),
+        format="%y%m%d%H%M%S",
+        errors="coerce",
+    )
+    epoch_us = pd.Series(ts.to_numpy(dtype="datetime64[us]").astype(np.int64), index=df.index)
+    return epoch_us.where(ts.notna()).astype("Int64")
+
+
+# Étape 1. Histogramme des EventId par bloc (un seul np.bincount sur les paires bloc × EventId)
+def _event_counts(event_ids: pd.Series, block_codes: np.ndarray, n_blocks: int) -> pd.DataFrame:
+    event_codes, events = pd.factorize(event_ids, sort=True)
+
+    # (EventId manquant : code -1, ligne non comptée mais bloc conservé)
+    n_events = len(events)
+    has_event = event_codes >= 0
+    pairs = block_codes[has_event] * n_events + event_codes[has_event]
+    counts = np.bincount(pairs, minlength=n_blocks * n_events).reshape(n_blocks, n_events).astype(int)
+    return pd.DataFrame(counts, columns=[str(e) for e in events])
+
+
+# Étape 2. Features temporelles par bloc (vectorisées, sans boucle par bloc)
+def _block_timing(
+    block_codes: np.ndarray,
+    n_blocks: int,
+    epoch_us: pd.Series,
+    is_error: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Une ligne par bloc : first_ts / last_ts (µs epoch), durée, écart moyen et maximal
+    entre deux événements consécutifs, délai avant le premier événement de niveau
+    erreur (-1 si aucun). Durées en secondes ; bloc sans aucun timestamp → valeurs manquantes.
+    """
+    # Étape A. Lignes datées uniquement, triées par (bloc, temps)
+    has_ts = epoch_us.notna().to_numpy(copy=True)
+    codes = block_codes[has_ts]
+    timestamps = epoch_us[has_ts].to_numpy(dtype=np.int64)
+    is_error = is_error[has_ts]
+
+    timing = pd.DataFrame({
+        "first_ts": pd.array([pd.NA] * n_blocks, dtype="Int64"),
+        "last_ts": pd.array([pd.NA] * n_blocks, dtype="Int64"),
+        **{col: np.full(n_blocks, np.nan) for col in TIMING_COLS[2:]},
+    })
+    if len(timestamps) == 0:
+        return timing
+
+    order = np.lexsort((timestamps, codes))
+    codes, timestamps, is_error = codes[order], timestamps[order], is_error[order]
+
+    # Étape B. Bornes de chaque bloc
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(timestamps)] - 1
+    n_events = ends - starts + 1
+    present = codes[starts]
+
+    # Étape C. Écarts entre événements consécutifs d'un même bloc (0 au début de chaque bloc)
+    gaps = np.r_[0, np.diff(timestamps)]
+    gaps[starts] = 0
+    gap_sum = np.add.reduceat(gaps, starts)
+    gap_max = np.maximum.reduceat(gaps, starts)
+
+    # Étape D. Premier événement de niveau erreur
+    no_error = np.iinfo(np.int64).max
+    first_error = np.minimum.reduceat(np.where(is_error, timestamps, no_error), starts)
+
+    first_ts, last_ts = timestamps[starts], timestamps[ends]
+    timing.loc[present, "first_ts"] = first_ts
+    timing.loc[present, "last_ts"] = last_ts
+    timing.loc[present, "duration_s"] = (last_ts - first_ts) / 1e6
+    timing.loc[present, "gap_mean_s"] = np.where(n_events > 1, gap_sum / np.maximum(n_events - 1, 1), 0.0) / 1e6
+    timing.loc[present, "gap_max_s"] = gap_max / 1e6
+    timing.loc[present, "time_to_error_s"] = np.where(first_error != no_error, (first_error - first_ts) / 1e6, -1.0)
+    return timing
 
 
 # Étape 3. Fonction pour construire la matrice HDFS
-def build_hdfs_matrix(df: pd.DataFrame) -> pd.DataFrame:
-    return apply_windows_by_session(
-        df=df,
-        session_extractor=hdfs_block_id_extractor,
-        agg_func=hdfs_agg_event_id_histogram,
-        session_col="BlockId",
-    )
+# (timing=True : features temporelles + first_ts ajoutées après BlockId)
+def build_hdfs_matrix(df: pd.DataFrame, timing: bool = False) -> pd.DataFrame:
+    """
+    Une ligne par BlockId (int64 triés), une colonne par EventId (comptes entiers).
+
+    BlockId extraits une seule fois (encode_block_ids : vectorisé, Int64 nullable) ;
+    les lignes sans BlockId sont écartées AVANT tout regroupement (un passage par
+    float64 fusionnerait des BlockId à 19 chiffres). Comptes et features temporelles
+    sont calculés sur ces mêmes codes de bloc, sans second passage ni fusion.
+    """
+    block_ids = encode_block_ids(df["Content"])
+    valid = block_ids.notna().to_numpy(copy=True)
+    block_codes, blocks = pd.factorize(block_ids[valid].to_numpy(dtype=np.int64), sort=True)
+
+    parts = [pd.DataFrame({"BlockId": np.asarray(blocks, dtype=np.int64)})]
+    if timing:
+        epoch_us = _hdfs_epoch_microseconds(df)[valid]
+        is_error = df.loc[valid, "Level"].isin(ERROR_LEVELS).to_numpy(copy=True)
+        parts.append(_block_timing(block_codes, len(blocks), epoch_us, is_error))
+    parts.append(_event_counts(df.loc[valid, "EventId"], block_codes, len(blocks)))
+
+    return pd.concat(parts, axis=1)
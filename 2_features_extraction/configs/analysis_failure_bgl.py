@@ -7,7 +7,13 @@ par fenêtres temporelles (sliding windows).
 Fonctionnalités :
 - identify_failure_event_ids             : Identification des EventId de failure
 - plot_window_anomaly_count              : Histogramme des anomalies (count plot)
+
+Si la matrice a été générée avec --with-labels (colonne Label calculée pendant le
+fenêtrage), le label de chaque fenêtre est lu directement : ni relecture du CSV
+structuré, ni déduction à partir des EventId de failure.
 """
+from typing import Optional
+
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -64,18 +70,13 @@ def _add_window_anomaly_flags(
 
 
 
-# Plot. Un count plot du nombre de fenêtres normales vs anormales
-def plot_window_anomaly_count(
-    matrix_csv: str,
-    failure_event_ids: list[str],
-    title: str = "BGL — Histogramme des fenêtres normales vs anormales",
-) -> None:
-    df = pd.read_csv(matrix_csv)
-
-    # Ajout des labels anomalies
-    df = _add_window_anomaly_flags(df, failure_event_ids)
-
-    counts = df["is_anomalous"].value_counts().sort_index()
+# Helper: histogramme + affichage console du nombre de fenêtres normales / anormales (colonne is_anomalous)
+def _plot_counts(df: pd.DataFrame, title: str) -> None:
+    # Matrice générée avec --skip-empty-windows : une ligne peut représenter plusieurs fenêtres vides
+    if "window_weight" in df.columns:
+        counts = df.groupby("is_anomalous")["window_weight"].sum().sort_index()
+    else:
+        counts = df["is_anomalous"].value_counts().sort_index()
 
     # Mapping simple
     labels = ["normal", "anomalous"]
@@ -95,6 +96,30 @@ def plot_window_anomaly_count(
     print(f"[INFO] Fenêtres anormales : {values[1]} "
           f"({ratio_anomalies:.4f} ≈ {ratio_anomalies*100:.2f}%)")
 
+
+# Plot. Un count plot du nombre de fenêtres normales vs anormales
+def plot_window_anomaly_count(
+    matrix_csv: str,
+    failure_event_ids: Optional[list[str]] = None,
+    title: str = "BGL — Histogramme des fenêtres normales vs anormales",
+) -> None:
+    df = pd.read_csv(matrix_csv)
+
+    # Matrice avec labels (--with-labels) : affichage uniquement, le CSV avec labels existe déjà
+    if "Label" in df.columns:
+        df["is_anomalous"] = df["Label"] == 1
+        _plot_counts(df, title)
+        plt.tight_layout()
+        plt.show()
+        return
+
+    if failure_event_ids is None:
+        raise ValueError("Matrice sans colonne Label : failure_event_ids est requis.")
+
+    # Ajout des labels anomalies
+    df = _add_window_anomaly_flags(df, failure_event_ids)
+    _plot_counts(df, title)
+
     # === Sauvegarde du CSV avec labels ===
     output_csv = matrix_csv.replace(".csv", "_with_labels.csv")
 
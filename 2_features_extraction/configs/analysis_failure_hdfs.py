@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from common.block_ids import MISSING_LABEL, decode_block_ids, encode_block_ids, load_label_index
+
 # Charge la matrice HDFS et retourne df_normaux, df_corrompus, event_cols
 def load_and_split_hdfs_matrix(
     matrix_csv: str,
@@ -31,36 +34,32 @@ def load_and_split_hdfs_matrix(
     # 1. Charger les données
     # --------------------
     df_matrix = pd.read_csv(matrix_csv)
-    df_labels = pd.read_csv(labels_csv)
 
     if "BlockId" not in df_matrix.columns:
         raise ValueError("La matrice doit contenir une colonne 'BlockId'.")
 
-    if "BlockId" not in df_labels.columns or label_col not in df_labels.columns:
+    labels_header = pd.read_csv(labels_csv, nrows=0).columns
+    if "BlockId" not in labels_header or label_col not in labels_header:
         raise ValueError("labels_csv doit contenir 'BlockId' et 'Label'.")
 
     # --------------------
-    # 2. Convertir Normal / Anomaly en 0 / 1
+    # 2. Index trié des labels (Normal / Anomaly → 0 / 1, BlockId int64, cache .npz)
     # --------------------
-    df_labels = df_labels.copy()
-    df_labels[label_col] = df_labels[label_col].map({
-        "Normal": 0,
-        "Anomaly": 1
-    })
-
-    # Sécurité : si d’autres valeurs apparaissent
-    if df_labels[label_col].isna().any():
-        raise ValueError("Valeurs inattendues dans Label : seulement 'Normal' et 'Anomaly' autorisés.")
+    label_index = load_label_index(labels_csv, label_col)
 
     # --------------------
-    # 3. Fusion matrice + labels via BlockId
+    # 3. Jointure matrice + labels via BlockId int64 (searchsorted, sans merge sur chaînes)
     # --------------------
-    df_merged = df_matrix.merge(df_labels[["BlockId", label_col]], on="BlockId", how="left")
+    df_merged = df_matrix.copy()
+    df_merged["BlockId"] = encode_block_ids(df_merged["BlockId"])
+    labels = label_index.lookup(df_merged["BlockId"].fillna(0).to_numpy(dtype="int64"))
+    df_merged[label_col] = labels
 
     # Vérification : aucun BlockId perdu
-    if df_merged[label_col].isna().any():
-        missing = df_merged[df_merged[label_col].isna()]["BlockId"].unique()
-        raise ValueError(f"Certains BlockId n'ont pas de Label : {missing[:10]} ...")
+    lost = (labels == MISSING_LABEL) | df_merged["BlockId"].isna().to_numpy()
+    if lost.any():
+        missing = decode_block_ids(df_merged.loc[lost, "BlockId"].dropna().unique()[:10])
+        raise ValueError(f"Certains BlockId n'ont pas de Label : {missing} ...")
 
     # --------------------
     # 4. Sauvegarder la matrice enrichie
@@ -161,16 +160,14 @@ def plot_blockid_normal_vs_corrupted_ratio(
     title: str = "HDFS — Répartition des BlockId normaux vs corrompus"
 ) -> None:
 
-    df = pd.read_csv(labels_csv)
-
-    if label_col not in df.columns:
+    if label_col not in pd.read_csv(labels_csv, nrows=0).columns:
         raise ValueError(f"Le fichier labels doit contenir une colonne '{label_col}'.")
 
-    # Comptage simple
-    counts = df[label_col].value_counts().sort_index()  # 0 puis 1
+    # Comptage simple sur l'index des labels (0 puis 1)
+    counts = np.bincount(load_label_index(labels_csv, label_col).labels, minlength=2)
 
-    nb_normal = counts.get("Normal", 0)
-    nb_corrupted = counts.get("Anomaly", 0)
+    nb_normal = int(counts[0])
+    nb_corrupted = int(counts[1])
     total = nb_normal + nb_corrupted
     ratio = nb_corrupted / total if total > 0 else 0
 
@@ -0,0 +1,175 @@
+"""
+event_cube.py
+-------------
+Cube persistant de comptes cumulés (temps × EventId) pour dériver n'importe quelle
+matrice de fenêtres glissantes BGL sans relire les logs.
+
+Principe :
+- le temps est découpé en buckets de `resolution_seconds` à partir du plus petit
+  timestamp t0 (même ancre que generate_time_windows) ;
+- seuls les buckets non vides sont stockés (BGL contient de longues périodes sans logs) ;
+- cumulative[j] = comptes par EventId de tous les buckets < bucket_index[j]
+  → comptes d'une fenêtre = cumulative[hi] - cumulative[lo] : O(fenêtres × EventId).
+
+Fonctions :
+- build_event_cube       : Construction du cube depuis le CSV structuré (un seul passage).
+- save_event_cube        : Sauvegarde (dossier de .npy mappables en mémoire + meta.json).
+- load_event_cube        : Chargement (memory-map par défaut).
+- derive_window_matrix   : Matrice (window, step) identique à build_bgl_matrix_sliding.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from configs.windows import WEIGHT_COL, epoch_microseconds
+
+
+@dataclass
+class EventCube:
+    t0_us: int                  # ancre des buckets (plus petit timestamp, epoch µs)
+    t_max_us: int               # plus grand timestamp (borne des fenêtres générées)
+    resolution_seconds: int     # taille d'un bucket
+    bucket_index: np.ndarray    # (n_buckets,) int64 : indices des buckets non vides, triés
+    cumulative: np.ndarray      # (n_buckets + 1, n_events) : comptes cumulés avant chaque bucket
+    event_ids: List[str]        # EventId correspondant aux colonnes de `cumulative`
+
+
+def build_event_cube(
+    df: pd.DataFrame,
+    timestamp_col: str = "Timestamp",
+    resolution_seconds: int = 60,
+) -> EventCube:
+    """
+    Construit le cube de comptes cumulés à partir du DataFrame structuré (Drain).
+    """
+    # Étape 1. Timestamps en µs epoch (colonne EpochUs, mêmes règles de nettoyage que apply_sliding_window)
+    ts = epoch_microseconds(df, timestamp_col)
+    valid = ts.notna().to_numpy(copy=True)
+    ts_us = ts[valid].to_numpy(dtype=np.int64)
+    if len(ts_us) == 0:
+        raise ValueError(f"Aucun timestamp valide dans la colonne '{timestamp_col}'.")
+
+    # Étape 2. Codage entier des EventId (vocabulaire trié comme les colonnes de la matrice)
+    event_ids = sorted(df.loc[valid, "EventId"].dropna().astype(str).unique())
+    codes = pd.Categorical(df.loc[valid, "EventId"].astype(str), categories=event_ids).codes.astype(np.int64)
+    keep = codes >= 0
+    ts_us, codes = ts_us[keep], codes[keep]
+
+    # Étape 3. Histogramme des buckets non vides
+    t0_us = int(ts_us.min())
+    buckets = (ts_us - t0_us) // (resolution_seconds * 1_000_000)
+    bucket_index, bucket_rows = np.unique(buckets, return_inverse=True)
+
+    n_events = len(event_ids)
+    counts = np.bincount(
+        bucket_rows.ravel() * n_events + codes,
+        minlength=len(bucket_index) * n_events,
+    ).reshape(len(bucket_index), n_events)
+
+    # Étape 4. Sommes préfixes (ligne 0 = aucun bucket)
+    dtype = np.int32 if len(codes) < np.iinfo(np.int32).max else np.int64
+    cumulative = np.zeros((len(bucket_index) + 1, n_events), dtype=dtype)
+    cumulative[1:] = np.cumsum(counts, axis=0)
+
+    return EventCube(
+        t0_us=t0_us,
+        t_max_us=int(ts_us.max()),
+        resolution_seconds=resolution_seconds,
+        bucket_index=bucket_index.astype(np.int64),
+        cumulative=cumulative,
+        event_ids=event_ids,
+    )
+
+
+def save_event_cube(cube: EventCube, cube_dir: str) -> None:
+    os.makedirs(cube_dir, exist_ok=True)
+    np.save(os.path.join(cube_dir, "bucket_index.npy"), cube.bucket_index)
+    np.save(os.path.join(cube_dir, "cumulative.npy"), cube.cumulative)
+
+    meta = {
+        "t0_us": cube.t0_us,
+        "t_max_us": cube.t_max_us,
+        "resolution_seconds": cube.resolution_seconds,
+        "event_ids": cube.event_ids,
+    }
+    with open(os.path.join(cube_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_event_cube(cube_dir: str, mmap: bool = True) -> EventCube:
+    with open(os.path.join(cube_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    mmap_mode = "r" if mmap else None
+    return EventCube(
+        t0_us=meta["t0_us"],
+        t_max_us=meta["t_max_us"],
+        resolution_seconds=meta["resolution_seconds"],
+        bucket_index=np.load(os.path.join(cube_dir, "bucket_index.npy")),
+        cumulative=np.load(os.path.join(cube_dir, "cumulative.npy"), mmap_mode=mmap_mode),
+        event_ids=meta["event_ids"],
+    )
+
+
+def derive_window_matrix(
+    cube: EventCube,
+    window_minutes: int = 5,
+    step_minutes: int = 1,
+    skip_empty: bool = False,
+) -> pd.DataFrame:
+    """
+    Dérive la matrice BGL (window_start, window_end, E1, ..., EN) pour une
+    configuration (window_minutes, step_minutes), sans relire les logs.
+    Même résultat que build_bgl_matrix_sliding sur les mêmes logs (y compris
+    skip_empty : suites de fenêtres vides résumées par une ligne + window_weight).
+    """
+    window_s, step_s = window_minutes * 60, step_minutes * 60
+    if window_s % cube.resolution_seconds or step_s % cube.resolution_seconds:
+        raise ValueError(
+            f"window ({window_minutes} min) et step ({step_minutes} min) doivent être "
+            f"des multiples de la résolution du cube ({cube.resolution_seconds} s)."
+        )
+
+    # Étape 1. Grille des fenêtres : start <= t_max (comme generate_time_windows)
+    step_us = step_s * 1_000_000
+    n_windows = (cube.t_max_us - cube.t0_us) // step_us + 1
+    window_idx = np.arange(n_windows, dtype=np.int64)
+    first_bucket = window_idx * (step_s // cube.resolution_seconds)
+    last_bucket = first_bucket + window_s // cube.resolution_seconds
+
+    # Étape 2. Bornes dans les buckets non vides puis différence des sommes préfixes
+    lo = np.searchsorted(cube.bucket_index, first_bucket, side="left")
+    hi = np.searchsorted(cube.bucket_index, last_bucket, side="left")
+    counts = (cube.cumulative[hi] - cube.cumulative[lo]).astype(np.int64)
+
+    # Étape 3. Même format que build_bgl_matrix_sliding (EventId absents de toutes les fenêtres exclus)
+    present = counts.sum(axis=0) > 0
+    counts = counts[:, present]
+    starts_us = cube.t0_us + window_idx * step_us
+    ends_us = starts_us + window_s * 1_000_000
+
+    # Étape 4 (optionnelle). Une seule ligne par suite de fenêtres vides
+    if skip_empty:
+        empty = hi == lo
+        run_start = empty & ~np.r_[False, empty[:-1]]
+        keep = ~empty | run_start
+        kept_idx = np.flatnonzero(keep)
+
+        # Poids = nombre de fenêtres jusqu'à la prochaine ligne conservée
+        weights = np.diff(np.r_[kept_idx, n_windows])
+        last_idx = kept_idx + weights - 1
+
+        counts = counts[kept_idx]
+        starts_us, ends_us = starts_us[kept_idx], ends_us[last_idx]
+
+    matrix = pd.DataFrame(counts, columns=np.asarray(cube.event_ids)[present].tolist())
+    matrix.insert(0, "window_start", starts_us)
+    matrix.insert(1, "window_end", ends_us)
+    if skip_empty:
+        matrix.insert(2, WEIGHT_COL, weights)
+
+    return matrix
@@ -0,0 +1,95 @@
+"""
+hashed_ngrams.py
+----------------
+Comptes de n-grammes d'EventId (bigrammes, trigrammes...) par session, hachés dans
+un nombre FIXE de buckets : largeur et mémoire indépendantes du nombre de templates.
+
+Principe (à partir d'un SequenceStore, cf. sequence_store.py) :
+- chaque EventId reçoit un hash 64 bits stable (calculé sur la chaîne, pas sur le
+  code entier : mêmes buckets d'un run / d'un dataset à l'autre) ;
+- les n-grammes sont les positions i de `events` dont les n événements
+  i, ..., i + n - 1 appartiennent à la même session → calcul vectorisé ;
+- hash du n-gramme = combinaison FNV-1a des hashes des EventId (et de n) ;
+- sortie : matrice creuse scipy (sessions × buckets), sauvegardée en .npz.
+
+Fonctions :
+- hashed_ngram_counts  : Matrice creuse des comptes de n-grammes hachés.
+- save_ngram_matrix    : Sauvegarde (.npz scipy + identifiants des sessions).
+- load_ngram_matrix    : Chargement.
+"""
+import hashlib
+from typing import Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from configs.sequence_store import SequenceStore
+
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+# Hash 64 bits stable d'un EventId (indépendant de PYTHONHASHSEED et du codage entier)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def hashed_ngram_counts(
+    store: SequenceStore,
+    n_values: Sequence[int] = (2, 3),
+    n_buckets: int = 4096,
+) -> sp.csr_matrix:
+    """
+    Compte les n-grammes (n dans n_values) de chaque session dans n_buckets buckets.
+
+    Retour
+    ------
+    scipy.sparse.csr_matrix
+        (n_sessions, n_buckets) int64, lignes dans l'ordre des sessions du store.
+    """
+    if n_buckets <= 0:
+        raise ValueError("n_buckets doit être strictement positif.")
+
+    # Étape 1. Hash de chaque événement (via le hash de son EventId) et session de chaque position
+    token_hashes = np.array([_token_hash(t) for t in store.vocabulary], dtype=np.uint64)
+    event_hashes = token_hashes[np.asarray(store.events)]
+    lengths = store.lengths
+    position_session = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+
+    rows, cols = [], []
+    with np.errstate(over="ignore"):
+        for n in n_values:
+            n_starts = len(event_hashes) - n + 1
+            if n_starts <= 0:
+                continue
+
+            # Étape 2. Débuts de n-grammes : les n positions sont dans la même session
+            starts = np.flatnonzero(position_session[:n_starts] == position_session[n - 1:])
+
+            # Étape 3. Hash FNV-1a sur (n, hash_1, ..., hash_n) puis bucket
+            h = np.full(len(starts), _FNV_OFFSET ^ np.uint64(n), dtype=np.uint64)
+            for k in range(n):
+                h = (h ^ event_hashes[starts + k]) * _FNV_PRIME
+            h ^= h >> np.uint64(32)
+
+            rows.append(position_session[starts])
+            cols.append((h % np.uint64(n_buckets)).astype(np.int64))
+
+    # Étape 4. Matrice creuse (les doublons (session, bucket) sont additionnés)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+    counts = sp.coo_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+        shape=(len(lengths), n_buckets),
+    )
+    return counts.tocsr()
+
+
+def save_ngram_matrix(matrix: sp.csr_matrix, sessions: np.ndarray, path: str) -> None:
+    sp.save_npz(path, matrix)
+    np.save(f"{path}.sessions.npy", np.asarray(sessions))
+
+
+def load_ngram_matrix(path: str) -> Tuple[sp.csr_matrix, np.ndarray]:
+    return sp.load_npz(path).tocsr(), np.load(f"{path}.sessions.npy")
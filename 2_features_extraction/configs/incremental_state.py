@@ -0,0 +1,69 @@
+"""
+incremental_state.py
+--------------------
+État persistant utilisé par la mise à jour incrémentale des matrices de features
+(generate_features_matrix --incremental).
+
+Fichiers associés à une matrice `<output>.csv` :
+- <output>.csv.state.json   : état du dernier run (lignes consommées, vocabulaire, fenêtre ouverte...)
+- <output>.csv.pending.csv  : lignes de logs encore nécessaires aux fenêtres ouvertes (BGL),
+                              blocs encore ouverts avec leur dernier timestamp (HDFS)
+- <output>.csv.closed_blocks.bin : BlockId int64 des blocs figés dans la matrice (HDFS)
+
+Fonctions :
+- state_paths  : Chemins des fichiers d'état associés à une matrice.
+- closed_blocks_path : Chemin de la liste des blocs HDFS figés.
+- load_state   : Lecture de l'état (None si aucun run précédent).
+- save_state   : Écriture de l'état au format JSON.
+"""
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class FeaturesMatrixState:
+    """
+    État d'une matrice de features à la fin d'un run.
+    """
+    dataset: str                                        # "bgl" ou "hdfs"
+    rows_consumed: int                                  # lignes du CSV structuré déjà intégrées
+    input_offset: Optional[int] = None                  # offset (octets) du CSV structuré après la dernière ligne intégrée
+    columns: List[str] = field(default_factory=list)    # vocabulaire des colonnes EventId
+    window_minutes: Optional[int] = None                # BGL : taille de fenêtre utilisée
+    step_minutes: Optional[int] = None                  # BGL : pas de fenêtre utilisé
+    skip_empty: bool = False                            # BGL : suites de fenêtres vides résumées (window_weight)
+    next_window_start: Optional[int] = None             # BGL : début de la première fenêtre encore ouverte (µs epoch)
+    open_rows_offset: Optional[int] = None              # offset (octets) des fenêtres / blocs ouverts dans le CSV
+    block_idle_minutes: Optional[int] = None            # HDFS : inactivité après laquelle un bloc est figé
+    last_event_ts: Optional[int] = None                 # HDFS : dernier timestamp vu (µs epoch)
+
+
+def state_paths(output_path: str) -> Tuple[str, str]:
+    """
+    Retourne (chemin_etat_json, chemin_lignes_en_attente_csv) pour une matrice.
+    """
+    return f"{output_path}.state.json", f"{output_path}.pending.csv"
+
+
+def closed_blocks_path(output_path: str) -> str:
+    """
+    Fichier binaire (int64 bruts, complété à chaque run) des BlockId figés d'une matrice HDFS.
+    """
+    return f"{output_path}.closed_blocks.bin"
+
+
+def load_state(state_path: str) -> Optional[FeaturesMatrixState]:
+    if not os.path.exists(state_path):
+        return None
+
+    with open(state_path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    return FeaturesMatrixState(**payload)
+
+
+def save_state(state: FeaturesMatrixState, state_path: str) -> None:
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(asdict(state), f, indent=2)
@@ -0,0 +1,197 @@
+"""
+node_hierarchy.py
+-----------------
+Matrices de fenêtres BGL par groupe de nœuds (rack, midplane, node card ou nœud),
+pour localiser les pannes au lieu de regrouper toute la machine dans une seule fenêtre.
+
+Un nœud BGL encode sa position : R34-M1-N8-I:J18-U01
+    rack = R34, midplane = R34-M1, node card = R34-M1-N8, nœud = chaîne complète.
+
+Principe :
+- la hiérarchie est parsée une seule fois sur les nœuds DISTINCTS (quelques dizaines
+  de milliers), puis chaque ligne reçoit un code entier de groupe ;
+- les comptes (fenêtre × groupe × EventId) sont calculés en un seul passage vectorisé
+  (paires fenêtre/ligne de sliding_window_line_index) ;
+- seules les cellules non nulles sont gardées : tenseur creux au format COO,
+  sauvegardé en .npz.
+
+Fonctions :
+- node_group_codes           : Codes entiers des groupes de nœuds au niveau demandé.
+- build_node_window_tensor   : Construction du tenseur creux depuis le CSV structuré.
+- save_node_window_tensor    : Sauvegarde (.npz compressé).
+- load_node_window_tensor    : Chargement.
+- group_window_matrix        : Matrice (window_start, window_end, E1, ..., EN) d'un groupe.
+"""
+import json
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from configs.windows import MICROSECONDS_PER_MINUTE, epoch_microseconds, sliding_window_line_index
+
+
+# Niveaux de la hiérarchie BGL → nombre de composantes "Rxx-Mx-Nx" gardées (None = nœud complet)
+NODE_LEVELS = {
+    "rack": 1,
+    "midplane": 2,
+    "nodecard": 3,
+    "node": None,
+}
+
+# Composantes de position : R<rack>-M<midplane>-N<node card>
+_NODE_PATTERN = r"^(R[0-9A-Za-z]+)(?:-(M[0-9A-Za-z]+))?(?:-(N[0-9A-Za-z]+))?"
+
+
+@dataclass
+class NodeWindowTensor:
+    level: str                  # niveau de la hiérarchie (rack, midplane, nodecard, node)
+    t0_us: int                  # début de la première fenêtre (µs epoch)
+    window_us: int
+    step_us: int
+    n_windows: int
+    groups: List[str]           # noms des groupes (axe 1)
+    event_ids: List[str]        # EventId triés (axe 2)
+    coords: np.ndarray          # (nnz, 3) int64 : (fenêtre, groupe, EventId)
+    counts: np.ndarray          # (nnz,) int64
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.n_windows, len(self.groups), len(self.event_ids)
+
+
+def node_group_codes(nodes: pd.Series, level: str) -> Tuple[np.ndarray, List[str]]:
+    """
+    Code entier du groupe de chaque ligne au niveau `level` (-1 si la position du
+    nœud ne contient pas ce niveau, ex : NULL, UNKNOWN_LOCATION ou carte de lien
+    sans node card).
+
+    Le parsing (regex) n'est appliqué qu'aux nœuds distincts.
+    """
+    if level not in NODE_LEVELS:
+        raise ValueError(f"Niveau inconnu : {level}. Niveaux disponibles : {list(NODE_LEVELS)}")
+
+    # Étape 1. Codes des nœuds distincts
+    node_codes, unique_nodes = pd.factorize(nodes.astype("string"), use_na_sentinel=True)
+    unique_nodes = pd.Series(unique_nodes, dtype="string")
+
+    # Étape 2. Nom du groupe de chaque nœud distinct
+    n_parts = NODE_LEVELS[level]
+    if n_parts is None:
+        group_names = unique_nodes
+    else:
+        parts = unique_nodes.str.extract(_NODE_PATTERN)
+        group_names = parts[0]
+        for k in range(1, n_parts):
+            group_names = group_names + "-" + parts[k]
+
+    # Étape 3. Codes des groupes (triés), propagés aux lignes via le code du nœud
+    group_codes, groups = pd.factorize(group_names, sort=True, use_na_sentinel=True)
+    line_codes = np.where(node_codes >= 0, group_codes[np.maximum(node_codes, 0)], -1)
+
+    return line_codes.astype(np.int64), [str(g) for g in groups]
+
+
+def build_node_window_tensor(
+    df: pd.DataFrame,
+    timestamp_col: str = "Timestamp",
+    window_minutes: int = 5,
+    step_minutes: int = 1,
+    level: str = "midplane",
+    node_col: str = "Node",
+) -> NodeWindowTensor:
+    """
+    Construit le tenseur creux (fenêtre × groupe de nœuds × EventId).
+    Mêmes fenêtres que build_bgl_matrix_sliding : somme sur les groupes = matrice BGL
+    (hors lignes dont le nœud n'a pas de position au niveau demandé).
+    """
+    window_us = window_minutes * MICROSECONDS_PER_MINUTE
+    step_us = step_minutes * MICROSECONDS_PER_MINUTE
+
+    # Étape 1. Timestamps entiers triés (mêmes règles de nettoyage que apply_sliding_window)
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    valid = epoch_us.notna().to_numpy(copy=True)
+    epoch_us = epoch_us[valid].to_numpy(dtype=np.int64)
+    if len(epoch_us) == 0:
+        raise ValueError(f"Aucun timestamp valide dans la colonne '{timestamp_col}'.")
+    order = np.argsort(epoch_us, kind="stable")
+    timestamps = epoch_us[order]
+
+    # Étape 2. Codes entiers : groupe de nœuds (parsing sur les nœuds distincts) et EventId
+    group_codes, groups = node_group_codes(df.loc[valid, node_col], level)
+    event_codes, event_ids = pd.factorize(df.loc[valid, "EventId"].astype("string"), sort=True)
+    group_codes, event_codes = group_codes[order], event_codes[order].astype(np.int64)
+
+    n_unplaced = int((group_codes < 0).sum())
+    if n_unplaced:
+        print(f"[WARN] {n_unplaced} lignes sans position au niveau '{level}' sont ignorées.")
+
+    # Étape 3. Paires (fenêtre, ligne) puis comptes des cellules non nulles
+    t0_us = int(timestamps[0])
+    n_windows = (int(timestamps[-1]) - t0_us) // step_us + 1
+    window_idx, line_idx = sliding_window_line_index(timestamps, t0_us, n_windows, window_us, step_us)
+
+    keep = (group_codes[line_idx] >= 0) & (event_codes[line_idx] >= 0)
+    window_idx, line_idx = window_idx[keep], line_idx[keep]
+    n_groups, n_events = len(groups), len(event_ids)
+    keys = (window_idx * n_groups + group_codes[line_idx]) * n_events + event_codes[line_idx]
+    keys, counts = np.unique(keys, return_counts=True)
+
+    coords = np.column_stack([keys // (n_groups * n_events), keys // n_events % n_groups, keys % n_events])
+
+    return NodeWindowTensor(
+        level=level,
+        t0_us=t0_us,
+        window_us=window_us,
+        step_us=step_us,
+        n_windows=int(n_windows),
+        groups=groups,
+        event_ids=[str(e) for e in event_ids],
+        coords=coords.astype(np.int64),
+        counts=counts.astype(np.int64),
+    )
+
+
+def save_node_window_tensor(tensor: NodeWindowTensor, path: str) -> None:
+    meta = {
+        "level": tensor.level,
+        "t0_us": tensor.t0_us,
+        "window_us": tensor.window_us,
+        "step_us": tensor.step_us,
+        "n_windows": tensor.n_windows,
+        "groups": tensor.groups,
+        "event_ids": tensor.event_ids,
+    }
+    np.savez_compressed(path, coords=tensor.coords, counts=tensor.counts, meta=np.array(json.dumps(meta)))
+
+
+def load_node_window_tensor(path: str) -> NodeWindowTensor:
+    with np.load(path) as payload:
+        meta = json.loads(str(payload["meta"]))
+        return NodeWindowTensor(coords=payload["coords"], counts=payload["counts"], **meta)
+
+
+def group_window_matrix(tensor: NodeWindowTensor, group: str) -> pd.DataFrame:
+    """
+    Matrice d'un groupe de nœuds au format build_bgl_matrix_sliding
+    (window_start, window_end, E1, ..., EN ; EventId absents du groupe exclus).
+    """
+    if group not in tensor.groups:
+        raise ValueError(f"Groupe inconnu au niveau '{tensor.level}' : {group}")
+
+    # Étape 1. Cellules du groupe
+    cells = tensor.coords[:, 1] == tensor.groups.index(group)
+    window_idx, event_idx = tensor.coords[cells, 0], tensor.coords[cells, 2]
+
+    # Étape 2. Matrice dense fenêtres × EventId présents dans le groupe
+    present, event_cols = np.unique(event_idx, return_inverse=True)
+    counts = np.zeros((tensor.n_windows, len(present)), dtype=np.int64)
+    counts[window_idx, event_cols] = tensor.counts[cells]
+
+    matrix = pd.DataFrame(counts, columns=np.asarray(tensor.event_ids, dtype=object)[present].tolist())
+    starts = tensor.t0_us + np.arange(tensor.n_windows, dtype=np.int64) * tensor.step_us
+    matrix.insert(0, "window_start", starts)
+    matrix.insert(1, "window_end", starts + tensor.window_us)
+
+    return matrix
@@ -0,0 +1,202 @@
+"""
+online_windows.py
+-----------------
+Fenêtrage glissant en ligne (flux de logs en temps réel) pour la détection live.
+
+Même sémantique que generate_time_windows / apply_sliding_window :
+    fenêtres [start, start + window_minutes[, start = t0 + i * step_minutes,
+    t0 = premier timestamp reçu (ou `start_time`).
+
+Principe :
+- le temps est découpé en buckets de gcd(window_minutes, step_minutes) minutes ;
+- un buffer circulaire de buckets (dict EventId → count) garde uniquement les
+  buckets encore utiles aux fenêtres non émises → mémoire bornée ;
+- chaque événement = un incrément dans un bucket → O(1) par événement ;
+- une fenêtre est émise dès que le watermark (max timestamp vu - retard toléré)
+  dépasse sa fin ; les événements arrivant après l'émission de toutes leurs
+  fenêtres sont comptés dans `late_events` et ignorés.
+
+Les lignes émises ont le même format que celles de build_bgl_matrix_sliding
+(window_start, window_end en µs epoch, puis les EventId du vocabulaire en int64).
+
+Exemple :
+    counter = OnlineWindowCounter(window_minutes=5, step_minutes=1,
+                                  event_ids=event_cols, allowed_lateness_seconds=30)
+    for ts, event_id in stream:
+        for row in counter.add(ts, event_id):
+            model.predict([counter.vector(row)])
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from configs.windows import BGL_TIMESTAMP_FORMAT, MICROSECONDS_PER_MINUTE
+
+
+TimestampLike = Union[int, pd.Timestamp, str]
+
+
+# Convertir un timestamp (µs epoch comme EpochUs, pd.Timestamp ou chaîne au format BGL) en microsecondes epoch
+def _to_microseconds(timestamp: TimestampLike) -> int:
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = pd.to_datetime(timestamp, format=BGL_TIMESTAMP_FORMAT)
+    return pd.Timestamp(timestamp).value // 1_000
+
+
+class OnlineWindowCounter:
+    """
+    Compteur d'EventId par fenêtre glissante, alimenté événement par événement.
+
+    Paramètres
+    ----------
+    window_minutes : int
+        Taille de la fenêtre (comme apply_sliding_window).
+    step_minutes : int
+        Pas entre deux fenêtres.
+    event_ids : Iterable[str] | None
+        Vocabulaire des colonnes (ex : colonnes EventId de la matrice d'entraînement).
+        Les EventId hors vocabulaire sont comptés dans `unknown_events`.
+        Si None, chaque ligne ne contient que les EventId observés (comme bgl_agg_eventid_histogram).
+    allowed_lateness_seconds : float
+        Retard toléré pour les événements arrivant dans le désordre.
+    start_time : int | pd.Timestamp | None
+        Début de la première fenêtre (par défaut : premier événement reçu).
+    """
+
+    def __init__(
+        self,
+        window_minutes: int = 5,
+        step_minutes: int = 1,
+        event_ids: Optional[Iterable[str]] = None,
+        allowed_lateness_seconds: float = 0.0,
+        start_time: Optional[TimestampLike] = None,
+    ) -> None:
+        if window_minutes <= 0 or step_minutes <= 0:
+            raise ValueError("window_minutes et step_minutes doivent être strictement positifs.")
+
+        bucket_minutes = math.gcd(window_minutes, step_minutes)
+        self._bucket_us = bucket_minutes * MICROSECONDS_PER_MINUTE
+        self._window_us = window_minutes * MICROSECONDS_PER_MINUTE
+        self._step_us = step_minutes * MICROSECONDS_PER_MINUTE
+        self._buckets_per_window = window_minutes // bucket_minutes
+        self._buckets_per_step = step_minutes // bucket_minutes
+        self._lateness_us = int(allowed_lateness_seconds * 1_000_000)
+
+        # Buffer circulaire : assez de buckets pour couvrir une fenêtre + le retard toléré
+        lateness_buckets = -(-self._lateness_us // self._bucket_us)
+        ring_size = self._buckets_per_window + self._buckets_per_step + lateness_buckets + 1
+        self._ring: List[Dict[str, int]] = [{} for _ in range(ring_size)]
+
+        self.event_ids: Optional[List[str]] = list(event_ids) if event_ids is not None else None
+        self._vocabulary = set(self.event_ids) if self.event_ids is not None else None
+
+        self._anchor_us: Optional[int] = _to_microseconds(start_time) if start_time is not None else None
+        self._max_us: Optional[int] = None
+        self._next_window = 0
+
+        self.late_events = 0
+        self.unknown_events = 0
+
+    @property
+    def columns(self) -> List[str]:
+        if self.event_ids is None:
+            raise ValueError("Aucun vocabulaire fourni (event_ids=None) : colonnes variables.")
+        return ["window_start", "window_end"] + self.event_ids
+
+    def add(self, timestamp: TimestampLike, event_id: str) -> List[Dict[str, Any]]:
+        """
+        Ajoute un événement et retourne les fenêtres fermées par ce nouvel événement.
+        """
+        t_us = _to_microseconds(timestamp)
+        if self._anchor_us is None:
+            self._anchor_us = t_us
+        if self._max_us is None or t_us > self._max_us:
+            self._max_us = t_us
+
+        # Étape 1. Émettre les fenêtres fermées par le watermark (libère leurs buckets)
+        emitted = self._emit_while(
+            lambda start_us: start_us + self._window_us <= self._max_us - self._lateness_us
+        )
+
+        # Étape 2. Ignorer les événements hors de toute fenêtre (step > window),
+        #          rejeter ceux dont toutes les fenêtres sont déjà émises
+        bucket_idx = (t_us - self._anchor_us) // self._bucket_us
+        if t_us >= self._anchor_us and bucket_idx % self._buckets_per_step >= self._buckets_per_window:
+            return emitted
+        if t_us < self._anchor_us or bucket_idx < self._next_window * self._buckets_per_step:
+            self.late_events += 1
+            return emitted
+
+        if self._vocabulary is not None and event_id not in self._vocabulary:
+            self.unknown_events += 1
+            return emitted
+
+        # Étape 3. Incrément O(1) du bucket
+        bucket = self._ring[bucket_idx % len(self._ring)]
+        bucket[event_id] = bucket.get(event_id, 0) + 1
+
+        return emitted
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Fin de flux : émet toutes les fenêtres restantes dont le début est <= dernier timestamp
+        (même borne que generate_time_windows).
+        """
+        if self._max_us is None:
+            return []
+        return self._emit_while(lambda start_us: start_us <= self._max_us)
+
+    def vector(self, row: Dict[str, Any]) -> np.ndarray:
+        """
+        Vecteur de features (int64, ordre du vocabulaire) d'une ligne émise.
+        """
+        return np.array([row[c] for c in self.columns[2:]], dtype=np.int64)
+
+    def to_frame(self, rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Assemble des lignes émises en matrice au format build_bgl_matrix_sliding.
+        """
+        matrix = pd.DataFrame(rows)
+        event_cols = self.event_ids
+        if event_cols is None:
+            event_cols = sorted(c for c in matrix.columns if c not in ("window_start", "window_end"))
+        matrix = matrix.reindex(columns=["window_start", "window_end"] + event_cols)
+        matrix[event_cols] = matrix[event_cols].fillna(0).astype(int)
+        return matrix
+
+    # Émettre les fenêtres successives tant que `condition(window_start_us)` est vraie
+    def _emit_while(self, condition) -> List[Dict[str, Any]]:
+        rows = []
+        while condition(self._anchor_us + self._next_window * self._step_us):
+            rows.append(self._emit_next_window())
+        return rows
+
+    def _emit_next_window(self) -> Dict[str, Any]:
+        first_bucket = self._next_window * self._buckets_per_step
+
+        # Somme des buckets de la fenêtre
+        counts: Dict[str, int] = {}
+        for bucket_idx in range(first_bucket, first_bucket + self._buckets_per_window):
+            for event_id, count in self._ring[bucket_idx % len(self._ring)].items():
+                counts[event_id] = counts.get(event_id, 0) + count
+
+        # Les buckets du pas qui se termine ne servent plus à aucune fenêtre
+        for bucket_idx in range(first_bucket, first_bucket + self._buckets_per_step):
+            self._ring[bucket_idx % len(self._ring)].clear()
+
+        start_us = self._anchor_us + self._next_window * self._step_us
+        self._next_window += 1
+
+        row: Dict[str, Any] = {
+            "window_start": start_us,
+            "window_end": start_us + self._window_us,
+        }
+        if self.event_ids is None:
+            row.update(counts)
+        else:
+            row.update({event_id: counts.get(event_id, 0) for event_id in self.event_ids})
+        return row
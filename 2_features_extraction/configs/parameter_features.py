@@ -0,0 +1,152 @@
+"""
+parameter_features.py
+---------------------
+Agrégation des paramètres numériques extraits par Drain (colonne ParameterList)
+par session HDFS (BlockId) ou par fenêtre glissante BGL.
+
+Un "slot" = (EventId, position du paramètre dans le template), ex : "E8:3" pour la
+taille de "Receiving block blk_<*> src: /<*>:<*> size <*>".
+Pour chaque slot : somme, maximum et nombre de valeurs distinctes par session.
+
+Principe (pas de parsing ligne par ligne) :
+- ParameterList est découpé une seule fois par EventId concerné, en colonnes
+  (str.split(expand=True)), puis converti en nombres (pd.to_numeric) ;
+- les agrégats sont des np.bincount / np.maximum.at sur des indices de session entiers.
+
+Fonctions :
+- parse_slot_spec            : "E8:3,E5:0" → [("E8", 3), ("E5", 0)].
+- extract_parameter_values   : Valeurs numériques de chaque slot (une colonne float par slot).
+- hdfs_parameter_features    : Agrégats par BlockId (à fusionner sur BlockId).
+- bgl_parameter_features     : Agrégats par fenêtre (à fusionner sur window_start).
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from common.block_ids import encode_block_ids
+from configs.windows import MICROSECONDS_PER_MINUTE, epoch_microseconds, sliding_window_line_index
+
+
+Slot = Tuple[str, int]
+
+def parse_slot_spec(spec: str) -> List[Slot]:
+    """
+    "E8:3,E5:0" → [("E8", 3), ("E5", 0)] (positions à partir de 0).
+    """
+    slots = []
+    for item in spec.split(","):
+        event_id, position = item.strip().rsplit(":", 1)
+        slots.append((event_id, int(position)))
+    return slots
+
+
+def extract_parameter_values(df: pd.DataFrame, slots: List[Slot]) -> Dict[Slot, np.ndarray]:
+    """
+    Pour chaque slot, tableau float64 aligné sur les lignes de df : valeur numérique
+    du paramètre pour les lignes de cet EventId, NaN ailleurs (ou si non numérique).
+    """
+    values: Dict[Slot, np.ndarray] = {}
+    event_ids = df["EventId"].to_numpy()
+
+    for event_id in dict.fromkeys(e for e, _ in slots):
+        # Étape 1. Lignes du template, ParameterList "['a', 'b', ...]" découpé une seule fois en colonnes
+        rows = np.flatnonzero(event_ids == event_id)
+        params = (
+            df["ParameterList"].iloc[rows].astype(str)
+            .str.slice(2, -2)
+            .str.split("', '", expand=True, regex=False)
+        )
+
+        # Étape 2. Conversion numérique des positions demandées
+        for position in [p for e, p in slots if e == event_id]:
+            column = np.full(len(df), np.nan)
+            if position < params.shape[1]:
+                column[rows] = pd.to_numeric(params[position], errors="coerce").to_numpy(dtype=float)
+            values[(event_id, position)] = column
+
+    return values
+
+
+# Somme / max / nombre de valeurs distinctes de chaque slot par session (paires (session, ligne))
+def _aggregate_slots(
+    session_idx: np.ndarray,
+    line_idx: np.ndarray,
+    n_sessions: int,
+    values: Dict[Slot, np.ndarray],
+) -> pd.DataFrame:
+    columns = {}
+    for (event_id, position), slot_values in values.items():
+        v = slot_values[line_idx]
+        keep = ~np.isnan(v)
+        sessions, v = session_idx[keep], v[keep]
+        prefix = f"param:{event_id}:{position}"
+
+        columns[f"{prefix}:sum"] = np.bincount(sessions, weights=v, minlength=n_sessions)
+
+        maxima = np.full(n_sessions, -np.inf)
+        np.maximum.at(maxima, sessions, v)
+        columns[f"{prefix}:max"] = np.where(np.isfinite(maxima), maxima, 0.0)
+
+        codes, uniques = pd.factorize(v)
+        pairs = np.unique(sessions * max(len(uniques), 1) + codes)
+        columns[f"{prefix}:nunique"] = np.bincount(pairs // max(len(uniques), 1), minlength=n_sessions)
+
+    return pd.DataFrame(columns)
+
+
+def hdfs_parameter_features(df: pd.DataFrame, slots: List[Slot]) -> pd.DataFrame:
+    """
+    Agrégats des slots par BlockId (int64 triés, comme build_hdfs_matrix).
+    """
+    block_ids = encode_block_ids(df["Content"])
+    lines = np.flatnonzero(block_ids.notna().to_numpy(copy=True))
+    block_codes, blocks = pd.factorize(block_ids.iloc[lines].to_numpy(dtype=np.int64), sort=True)
+
+    features = _aggregate_slots(block_codes, lines, len(blocks), extract_parameter_values(df, slots))
+    features.insert(0, "BlockId", blocks)
+    return features
+
+
+def bgl_parameter_features(
+    df: pd.DataFrame,
+    slots: List[Slot],
+    timestamp_col: str = "Timestamp",
+    window_minutes: int = 5,
+    step_minutes: int = 1,
+    start_time: Optional[int] = None,
+    skip_empty: bool = False,
+) -> pd.DataFrame:
+    """
+    Agrégats des slots par fenêtre glissante (mêmes fenêtres que build_bgl_matrix_sliding,
+    clé window_start en µs epoch). skip_empty : comme la matrice, une seule ligne par
+    suite de fenêtres vides (une ligne d'agrégats par ligne de la matrice).
+    """
+    window_us = window_minutes * MICROSECONDS_PER_MINUTE
+    step_us = step_minutes * MICROSECONDS_PER_MINUTE
+
+    # Étape 1. Timestamps entiers triés et paires (fenêtre, ligne)
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    valid_lines = np.flatnonzero(epoch_us.notna().to_numpy(copy=True))
+    if len(valid_lines) == 0:
+        raise ValueError(f"Aucun timestamp valide dans la colonne '{timestamp_col}'.")
+    timestamps = epoch_us.iloc[valid_lines].to_numpy(dtype=np.int64)
+    order = np.argsort(timestamps, kind="stable")
+    timestamps, valid_lines = timestamps[order], valid_lines[order]
+
+    t_min = int(timestamps[0]) if start_time is None else int(start_time)
+    n_windows = (int(timestamps[-1]) - t_min) // step_us + 1
+    window_idx, pos = sliding_window_line_index(timestamps, t_min, n_windows, window_us, step_us)
+    starts = t_min + np.arange(n_windows, dtype=np.int64) * step_us
+
+    # Étape 2 (optionnelle). Une seule ligne par suite de fenêtres vides
+    # (mêmes lignes que apply_sliding_window_fields(skip_empty=True))
+    if skip_empty:
+        empty = np.bincount(window_idx, minlength=n_windows) == 0
+        kept = np.flatnonzero(~empty | (empty & ~np.r_[False, empty[:-1]]))
+        window_idx, starts = np.searchsorted(kept, window_idx), starts[kept]
+
+    # Étape 3. Agrégats (positions → lignes de df)
+    features = _aggregate_slots(window_idx, valid_lines[pos], len(starts), extract_parameter_values(df, slots))
+    features.insert(0, "window_start", starts)
+    return features
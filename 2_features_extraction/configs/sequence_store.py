@@ -0,0 +1,237 @@
+"""
+sequence_store.py
+-----------------
+Séquences ordonnées d'EventId par session (bloc HDFS, fenêtre ou session BGL), pour les
+modèles de séquence (prédiction du prochain événement, scores n-grammes).
+
+Format "ragged array" (pas de listes Python ni de colonne CSV de listes) :
+- events  : (n_events,) int32   → codes EventId de toutes les sessions, bout à bout ;
+- offsets : (n_sessions + 1,) int64 → la session i occupe events[offsets[i]:offsets[i + 1]] ;
+- sessions: (n_sessions,) int64 → identifiant de chaque session (BlockId codé, window_start
+  ou session_start) ;
+- vocabulary                    → EventId de chaque code (triés).
+
+Sauvegarde dans un dossier (events.npy, offsets.npy, sessions.npy, meta.json) :
+les .npy sont ouverts en memory-map, chaque séquence est une vue sans copie.
+
+Fonctions :
+- build_hdfs_sequences        : Séquences par BlockId (ordre des lignes du log).
+- build_bgl_window_sequences  : Séquences par fenêtre glissante (ordre chronologique).
+- build_bgl_session_sequences : Séquences par session d'inactivité (mêmes sessions que la matrice).
+- save_sequence_store         : Sauvegarde.
+- load_sequence_store         : Chargement (memory-map par défaut).
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from common.block_ids import encode_block_ids
+from configs.windows import MICROSECONDS_PER_MINUTE, epoch_microseconds, gap_session_index, sliding_window_line_index
+
+
+@dataclass
+class SequenceStore:
+    events: np.ndarray          # (n_events,) int32 : codes EventId bout à bout
+    offsets: np.ndarray         # (n_sessions + 1,) int64
+    sessions: np.ndarray        # (n_sessions,) identifiants des sessions
+    vocabulary: List[str]       # EventId de chaque code
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """
+        Séquence de la i-ème session (vue sur `events`, sans copie).
+        """
+        return self.events[self.offsets[i]:self.offsets[i + 1]]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def index_of(self, session_id) -> int:
+        """
+        Position d'une session (BlockId int64 ou "blk_...", window_start).
+        """
+        if isinstance(session_id, str):
+            session_id = int(encode_block_ids(pd.Series([session_id])).iloc[0])
+        matches = np.flatnonzero(self.sessions == session_id)
+        if len(matches) == 0:
+            raise KeyError(session_id)
+        return int(matches[0])
+
+    def decode(self, i: int) -> List[str]:
+        """
+        Séquence de la i-ème session sous forme d'EventId (pour inspection).
+        """
+        return [self.vocabulary[code] for code in self[i]]
+
+
+# Assembler un SequenceStore à partir de paires (session, code) déjà triées par session
+def _pack_sequences(
+    session_idx: np.ndarray,
+    event_codes: np.ndarray,
+    n_sessions: int,
+    sessions: np.ndarray,
+    vocabulary: List[str],
+) -> SequenceStore:
+    offsets = np.zeros(n_sessions + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(session_idx, minlength=n_sessions))
+    return SequenceStore(
+        events=event_codes.astype(np.int32),
+        offsets=offsets,
+        sessions=sessions,
+        vocabulary=vocabulary,
+    )
+
+
+def build_hdfs_sequences(df: pd.DataFrame) -> SequenceStore:
+    """
+    Séquences d'EventId par BlockId, dans l'ordre des lignes du log.
+    Sessions = BlockId int64 triés (même ordre que build_hdfs_matrix).
+    """
+    # Étape 1. BlockId et EventId codés en entiers (lignes sans bloc / EventId ignorées)
+    block_ids = encode_block_ids(df["Content"])
+    valid = (block_ids.notna() & df["EventId"].notna()).to_numpy(copy=True)
+    block_codes, blocks = pd.factorize(block_ids[valid].to_numpy(dtype=np.int64), sort=True)
+    event_codes, vocabulary = pd.factorize(df.loc[valid, "EventId"].astype(str), sort=True)
+
+    # Étape 2. Regroupement par bloc, ordre des lignes conservé (tri stable)
+    order = np.argsort(block_codes, kind="stable")
+
+    return _pack_sequences(
+        session_idx=block_codes[order],
+        event_codes=event_codes[order],
+        n_sessions=len(blocks),
+        sessions=np.asarray(blocks, dtype=np.int64),
+        vocabulary=[str(v) for v in vocabulary],
+    )
+
+
+def build_bgl_window_sequences(
+    df: pd.DataFrame,
+    timestamp_col: str = "Timestamp",
+    window_minutes: int = 5,
+    step_minutes: int = 1,
+    start_time: Optional[int] = None,
+    skip_empty: bool = False,
+) -> SequenceStore:
+    """
+    Séquences d'EventId par fenêtre glissante, dans l'ordre chronologique.
+    Mêmes fenêtres que build_bgl_matrix_sliding (fenêtres vides = séquences vides) ;
+    sessions = window_start (µs epoch). skip_empty : comme la matrice, une seule
+    séquence vide par suite de fenêtres vides (une séquence par ligne de la matrice).
+    """
+    window_us = window_minutes * MICROSECONDS_PER_MINUTE
+    step_us = step_minutes * MICROSECONDS_PER_MINUTE
+
+    # Étape 1. Timestamps entiers triés (tri stable : ordre du log à timestamp égal) ;
+    # lignes sans EventId gardées pour la grille de fenêtres (comme la matrice), hors séquence
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    valid = epoch_us.notna().to_numpy(copy=True)
+    epoch_us = epoch_us[valid].to_numpy(dtype=np.int64)
+    if len(epoch_us) == 0:
+        raise ValueError(f"Aucun timestamp valide dans la colonne '{timestamp_col}'.")
+    order = np.argsort(epoch_us, kind="stable")
+    timestamps = epoch_us[order]
+    event_codes, vocabulary = pd.factorize(df.loc[valid, "EventId"].astype("string"), sort=True)
+    event_codes = event_codes[order]
+
+    # Étape 2. Paires (fenêtre, ligne) triées par fenêtre puis par temps
+    t_min = int(timestamps[0]) if start_time is None else int(start_time)
+    n_windows = (int(timestamps[-1]) - t_min) // step_us + 1
+    window_idx, line_idx = sliding_window_line_index(timestamps, t_min, n_windows, window_us, step_us)
+    pair_order = np.lexsort((line_idx, window_idx))
+    window_idx, line_idx = window_idx[pair_order], line_idx[pair_order]
+    starts = t_min + np.arange(n_windows, dtype=np.int64) * step_us
+
+    # Étape 3 (optionnelle). Une seule séquence par suite de fenêtres vides
+    # (mêmes lignes que apply_sliding_window_fields(skip_empty=True))
+    if skip_empty:
+        empty = np.bincount(window_idx, minlength=n_windows) == 0
+        kept = np.flatnonzero(~empty | (empty & ~np.r_[False, empty[:-1]]))
+        window_idx, starts = np.searchsorted(kept, window_idx), starts[kept]
+
+    has_event = event_codes[line_idx] >= 0
+    window_idx, line_idx = window_idx[has_event], line_idx[has_event]
+
+    return _pack_sequences(
+        session_idx=window_idx,
+        event_codes=event_codes[line_idx],
+        n_sessions=len(starts),
+        sessions=starts,
+        vocabulary=[str(v) for v in vocabulary],
+    )
+
+
+def build_bgl_session_sequences(
+    df: pd.DataFrame,
+    timestamp_col: str = "Timestamp",
+    gap_minutes: float = 5,
+    node_col: str = "Node",
+) -> SequenceStore:
+    """
+    Séquences d'EventId par session (nœud, inactivité > gap_minutes), dans l'ordre
+    chronologique. Mêmes sessions et même ordre que build_bgl_matrix_sessions
+    (tri par session_start puis nœud) : la séquence i correspond à la ligne i de la
+    matrice ; sessions = session_start (µs epoch).
+    """
+    gap_us = int(gap_minutes * MICROSECONDS_PER_MINUTE)
+
+    # Étape 1. Même découpage que apply_gap_sessions (lignes datées et avec nœud)
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    valid = (epoch_us.notna() & df[node_col].notna()).to_numpy(copy=True)
+    if not valid.any():
+        raise ValueError(f"Aucun timestamp valide dans la colonne '{timestamp_col}'.")
+    timestamps = epoch_us[valid].to_numpy(dtype=np.int64)
+    node_codes, _ = pd.factorize(df.loc[valid, node_col].astype(str), sort=True)
+    # (EventId manquant : code -1, ligne gardée pour le découpage mais hors séquence)
+    event_codes, vocabulary = pd.factorize(df.loc[valid, "EventId"].astype("string"), sort=True)
+    order, session_idx, first = gap_session_index(timestamps, node_codes, gap_us)
+    timestamps, node_codes, event_codes = timestamps[order], node_codes[order], event_codes[order]
+
+    # Étape 2. Rang de chaque session dans l'ordre de la matrice (session_start, nœud)
+    session_order = np.lexsort((node_codes[first], timestamps[first]))
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[session_order] = np.arange(len(first))
+
+    # Étape 3. Regroupement par session (tri stable : ordre chronologique conservé),
+    # lignes sans EventId ignorées
+    keep = event_codes >= 0
+    session_rank, event_codes = rank[session_idx[keep]], event_codes[keep]
+    pair_order = np.argsort(session_rank, kind="stable")
+
+    return _pack_sequences(
+        session_idx=session_rank[pair_order],
+        event_codes=event_codes[pair_order],
+        n_sessions=len(first),
+        sessions=timestamps[first][session_order],
+        vocabulary=[str(v) for v in vocabulary],
+    )
+
+
+def save_sequence_store(store: SequenceStore, store_dir: str) -> None:
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, "events.npy"), store.events)
+    np.save(os.path.join(store_dir, "offsets.npy"), store.offsets)
+    np.save(os.path.join(store_dir, "sessions.npy"), store.sessions)
+
+    with open(os.path.join(store_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"vocabulary": store.vocabulary}, f, indent=2)
+
+
+def load_sequence_store(store_dir: str, mmap: bool = True) -> SequenceStore:
+    with open(os.path.join(store_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    mmap_mode = "r" if mmap else None
+    return SequenceStore(
+        events=np.load(os.path.join(store_dir, "events.npy"), mmap_mode=mmap_mode),
+        offsets=np.load(os.path.join(store_dir, "offsets.npy"), mmap_mode=mmap_mode),
+        sessions=np.load(os.path.join(store_dir, "sessions.npy"), mmap_mode=mmap_mode),
+        vocabulary=meta["vocabulary"],
+    )
@@ -5,20 +5,61 @@ Module regroupant les primitives génériques de fenêtrage et de découpage
 utilisées pour l’extraction de features pour les logs.
 
 Fonctions :
+- epoch_microseconds        : Timestamps en µs epoch (colonne EpochUs du parsing, sinon décodage texte).
 - generate_time_windows     : Génération d'intervalles temporels successifs (sliding windows).
 - apply_sliding_window      : Application d’un fenêtrage temporel à un DataFrame (ex. BGL).
+- sliding_window_line_index : Paires (fenêtre, ligne) d'un fenêtrage glissant, sans boucle sur les fenêtres.
+- apply_sliding_window_fields : Histogrammes de plusieurs colonnes catégorielles par fenêtre, en un seul passage vectorisé.
 - apply_windows_by_session  : Découpage par identifiant de session logique (ex. BlockId pour HDFS).
+- apply_gap_sessions        : Sessions par nœud découpées par inactivité (ex. BGL), en un seul passage vectorisé.
 """
+import numpy as np
 import pandas as pd
-from typing import Iterator, Tuple, Callable, Optional
+from typing import Dict, Iterator, List, Tuple, Callable, Optional, Union
+
+# Format des timestamps BGL (colonne Time) : 2005-06-03-15.42.50.363779
+BGL_TIMESTAMP_FORMAT = "%Y-%m-%d-%H.%M.%S.%f"
+
+# Colonne int64 (µs depuis epoch) ajoutée au CSV structuré par le parsing
+# (même nom que EPOCH_COL de 1_logparser/configs/epoch_timestamps.py)
+EPOCH_COL = "EpochUs"
+
+# Nombre de fenêtres représentées par une ligne (apply_sliding_window(skip_empty=True))
+WEIGHT_COL = "window_weight"
+
+# Labels par fenêtre (BGL) : lignes dont Label != "-" = événements de failure
+LABEL_COL = "Label"
+FAILURE_COUNT_COL = "failure_count"
+NORMAL_LABEL = "-"
+
+MICROSECONDS_PER_MINUTE = 60_000_000
+
+
+def epoch_microseconds(df: pd.DataFrame, timestamp_col: str) -> pd.Series:
+    """
+    Timestamps des logs en microsecondes epoch (Int64, NA si invalide).
+
+    La colonne EpochUs calculée une seule fois au parsing est lue directement ;
+    les CSV structurés produits avant son ajout sont décodés depuis `timestamp_col`.
+
+    Attention : si EpochUs est présente, `timestamp_col` n'est PAS lue (EpochUs est
+    dérivée au parsing de la colonne Time BGL, celle que les appelants passent ici).
+    Pour fenêtrer sur une autre colonne, la retirer du DataFrame ou la convertir avant.
+    """
+    if EPOCH_COL in df.columns:
+        return df[EPOCH_COL].astype("Int64")
+
+    ts = pd.to_datetime(df[timestamp_col], format=BGL_TIMESTAMP_FORMAT, errors="coerce")
+    epoch_us = pd.Series(ts.to_numpy(dtype="datetime64[us]").astype(np.int64), index=df.index)
+    return epoch_us.where(ts.notna()).astype("Int64")
 
 
 def generate_time_windows(
-    start_time: pd.Timestamp,
-    end_time: pd.Timestamp,
+    start_time: Union[int, pd.Timestamp],
+    end_time: Union[int, pd.Timestamp],
     window_minutes: int,
     step_minutes: int,
-) -> Iterator[Tuple[pd.Timestamp, pd.Timestamp]]:
+) -> Iterator[Tuple[Union[int, pd.Timestamp], Union[int, pd.Timestamp]]]:
     """
     Génère des intervalles temporels successifs de type sliding window.
 
@@ -34,8 +75,9 @@ def generate_time_windows(
 
     Paramètres
     ----------
-    start_time : pd.Timestamp
-    end_time : pd.Timestamp
+    start_time : int | pd.Timestamp
+        int = microsecondes epoch (colonne EpochUs) → fenêtres en µs epoch.
+    end_time : int | pd.Timestamp
     window_minutes : int
     step_minutes : int
 
@@ -45,8 +87,12 @@ def generate_time_windows(
         Pour itérer fenêtre par fenêtre.
     """
 
-    window_delta = pd.Timedelta(minutes=window_minutes)
-    step_delta = pd.Timedelta(minutes=step_minutes)
+    if isinstance(start_time, (int, np.integer)):
+        window_delta = window_minutes * MICROSECONDS_PER_MINUTE
+        step_delta = step_minutes * MICROSECONDS_PER_MINUTE
+    else:
+        window_delta = pd.Timedelta(minutes=window_minutes)
+        step_delta = pd.Timedelta(minutes=step_minutes)
 
     current_start = start_time
 
@@ -63,12 +109,26 @@ def apply_sliding_window(
     window_minutes: int,
     step_minutes: int,
     agg_func,
+    start_time: Optional[int] = None,
+    skip_empty: bool = False,
 ) -> pd.DataFrame:
     """
     Applique un fenêtrage glissant générique à un DataFrame.
 
     `agg_func` transforme chaque sous-DataFrame (une fenêtre) → en un dict de features :
         agg_func(df_window, window_start, window_end) → dict
+    window_start / window_end sont des entiers (µs epoch, cf. epoch_microseconds).
+
+    `start_time` (µs epoch) permet d'imposer le début de la première fenêtre (par
+    défaut le plus petit timestamp) : utilisé par la mise à jour incrémentale pour
+    reprendre la grille de fenêtres là où le run précédent s'est arrêté.
+
+    `skip_empty` : au lieu de parcourir toutes les fenêtres vides des longues
+    périodes sans logs, on saute directement à la prochaine fenêtre contenant un
+    événement. Chaque suite de fenêtres vides est résumée par UNE ligne vide
+    (window_start = début de la première, window_end = fin de la dernière) et la
+    colonne `window_weight` indique le nombre de fenêtres représentées par chaque
+    ligne (1 pour une fenêtre non vide) → sum(window_weight) = nombre total de fenêtres.
 
     Retour
     ------
@@ -76,15 +136,24 @@ def apply_sliding_window(
         Matrice finale → une ligne par fenêtre.
     """
 
-    # Étape 1. Nettoyer et ordonner les timestamps
-    df = df.copy()
-    df[timestamp_col] = pd.to_datetime(df[timestamp_col], format="%Y-%m-%d-%H.%M.%S.%f", errors="coerce")
-    df = df.dropna(subset=[timestamp_col])
-    df = df.sort_values(timestamp_col)
+    # Étape 1. Timestamps entiers (µs epoch), sans re-parser de chaînes si EpochUs est présent
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    df = df[epoch_us.notna().to_numpy()]
+    epoch_us = epoch_us.dropna().to_numpy(dtype=np.int64)
+    order = np.argsort(epoch_us, kind="stable")
+    df = df.iloc[order]
+    timestamps = epoch_us[order]
 
     # Étape 2. Définir les limites temporelles
-    t_min = df[timestamp_col].min()
-    t_max = df[timestamp_col].max()
+    if len(timestamps) == 0:
+        return pd.DataFrame()
+    t_min = int(timestamps[0]) if start_time is None else int(start_time)
+    t_max = int(timestamps[-1])
+
+    if skip_empty:
+        return _apply_sliding_window_skip_empty(
+            df, timestamps, t_min, t_max, window_minutes, step_minutes, agg_func
+        )
 
     # Étape 3. Générer les fenêtres avec generate_time_windows()
     rows = []
@@ -92,8 +161,10 @@ def apply_sliding_window(
         t_min, t_max, window_minutes, step_minutes
     ):
         # Étape 4. Extraire les logs dans la fenêtre
-        mask = (df[timestamp_col] >= w_start) & (df[timestamp_col] < w_end) # Garde seulement les lignes dans la fenêtre de temps
-        df_window = df[mask]
+        # (timestamps triés → bornes [w_start, w_end[ par recherche dichotomique, sans masque sur tout le DataFrame)
+        lo = timestamps.searchsorted(w_start, side="left")
+        hi = timestamps.searchsorted(w_end, side="left")
+        df_window = df.iloc[lo:hi]
 
         # Étape 5. Extraire les features via agg_func
         row = agg_func(df_window, w_start, w_end)
@@ -104,6 +175,205 @@ def apply_sliding_window(
     return pd.DataFrame(rows)
 
 
+# Variante de apply_sliding_window qui saute les suites de fenêtres vides (cf. skip_empty)
+def _apply_sliding_window_skip_empty(
+    df: pd.DataFrame,
+    timestamps: np.ndarray,
+    t_min: int,
+    t_max: int,
+    window_minutes: int,
+    step_minutes: int,
+    agg_func,
+) -> pd.DataFrame:
+    window_delta = window_minutes * MICROSECONDS_PER_MINUTE
+    step_delta = step_minutes * MICROSECONDS_PER_MINUTE
+
+    # Nombre total de fenêtres (start <= t_max, comme generate_time_windows)
+    n_windows = (t_max - t_min) // step_delta + 1 if t_max >= t_min else 0
+
+    # Événements couverts par au moins une fenêtre : avec step > window, ceux tombés
+    # entre deux fenêtres ne doivent pas couper une suite de fenêtres vides en deux lignes
+    covered_ts = timestamps[(timestamps - t_min) % step_delta < window_delta]
+
+    rows = []
+    i = 0
+    while i < n_windows:
+        w_start = t_min + i * step_delta
+        w_end = w_start + window_delta
+        next_event = covered_ts.searchsorted(w_start, side="left")
+
+        # Fenêtre vide : sauter directement à la première fenêtre contenant le prochain événement
+        if next_event == len(covered_ts) or covered_ts[next_event] >= w_end:
+            if next_event == len(covered_ts):
+                next_i = n_windows
+            else:
+                next_i = min(n_windows, (int(covered_ts[next_event]) - t_min - window_delta) // step_delta + 1)
+            last_end = t_min + (next_i - 1) * step_delta + window_delta
+
+            row = agg_func(df.iloc[0:0], w_start, last_end)
+            row[WEIGHT_COL] = next_i - i
+            rows.append(row)
+            i = next_i
+            continue
+
+        lo = timestamps.searchsorted(w_start, side="left")
+        hi = timestamps.searchsorted(w_end, side="left")
+        row = agg_func(df.iloc[lo:hi], w_start, w_end)
+        row[WEIGHT_COL] = 1
+        rows.append(row)
+        i += 1
+
+    return pd.DataFrame(rows)
+
+
+# Codage entier d'une colonne catégorielle : codes (-1 si manquant) + modalités triées
+def _encode_categorical(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    present = values.notna().to_numpy(copy=True)
+    categorical = pd.Categorical(values[present].astype(str))
+    codes = np.full(len(values), -1, dtype=np.int64)
+    codes[present] = categorical.codes
+    return codes, [str(c) for c in categorical.categories]
+
+
+def sliding_window_line_index(
+    timestamps: np.ndarray,
+    t_min: int,
+    n_windows: int,
+    window_us: int,
+    step_us: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Associe chaque ligne aux fenêtres [t_min + i * step, + window[ qui la contiennent.
+
+    Une ligne appartient à au plus ceil(window / step) fenêtres → paires (fenêtre, ligne)
+    calculées en ceil(window / step) opérations vectorisées, sans boucle sur les fenêtres.
+
+    Retour
+    ------
+    (np.ndarray, np.ndarray)
+        Indices de fenêtre et indices de ligne (positions dans `timestamps`), même longueur.
+    """
+    offset = timestamps - t_min
+    last_window = offset // step_us
+    lines = np.arange(len(timestamps), dtype=np.int64)
+
+    window_parts, line_parts = [], []
+    for r in range(-(-window_us // step_us)):
+        window_idx = last_window - r
+        inside = (offset >= 0) & (window_idx >= 0) & (window_idx < n_windows) & (offset < window_idx * step_us + window_us)
+        window_parts.append(window_idx[inside])
+        line_parts.append(lines[inside])
+
+    return np.concatenate(window_parts), np.concatenate(line_parts)
+
+
+def apply_sliding_window_fields(
+    df: pd.DataFrame,
+    timestamp_col: str,
+    window_minutes: int,
+    step_minutes: int,
+    count_fields: Dict[str, str],
+    distinct_fields: Optional[Dict[str, str]] = None,
+    start_time: Optional[int] = None,
+    skip_empty: bool = False,
+    with_labels: bool = False,
+) -> pd.DataFrame:
+    """
+    Fenêtrage glissant vectorisé de plusieurs colonnes en un seul passage.
+
+    Mêmes fenêtres que apply_sliding_window (mêmes bornes, même `start_time`, même
+    `skip_empty`), mais sans agg_func Python par fenêtre : chaque colonne est codée
+    en entiers une seule fois, les paires (fenêtre, ligne) sont calculées une seule
+    fois, puis chaque histogramme est un np.bincount sur ces paires.
+
+    Paramètres
+    ----------
+    count_fields : Dict[str, str]
+        Colonne catégorielle → préfixe de ses colonnes de comptes (une par modalité),
+        ex : {"EventId": "", "Level": "Level:"} → E1, E2, ..., Level:FATAL, Level:INFO, ...
+    distinct_fields : Dict[str, str] | None
+        Colonne → nom de la colonne du nombre de valeurs distinctes par fenêtre,
+        ex : {"Node": "Node:nunique"}.
+    with_labels : bool
+        Ajoute failure_count (lignes dont Label != "-") et Label (0/1) en fin de matrice.
+
+    Retour
+    ------
+    pd.DataFrame
+        window_start, window_end, [window_weight], puis pour chaque champ ses
+        modalités triées (uniquement celles présentes dans au moins une fenêtre).
+    """
+    window_us = window_minutes * MICROSECONDS_PER_MINUTE
+    step_us = step_minutes * MICROSECONDS_PER_MINUTE
+
+    # Étape 1. Timestamps entiers triés (mêmes règles de nettoyage que apply_sliding_window)
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    valid = epoch_us.notna().to_numpy(copy=True)
+    epoch_us = epoch_us[valid].to_numpy(dtype=np.int64)
+    order = np.argsort(epoch_us, kind="stable")
+    timestamps = epoch_us[order]
+    if len(timestamps) == 0:
+        return pd.DataFrame()
+
+    # Étape 2. Grille des fenêtres (start <= t_max, comme generate_time_windows)
+    t_min = int(timestamps[0]) if start_time is None else int(start_time)
+    t_max = int(timestamps[-1])
+    n_windows = (t_max - t_min) // step_us + 1 if t_max >= t_min else 0
+
+    # Étape 3. Paires (fenêtre, ligne), calculées une seule fois pour tous les champs
+    window_idx, line_idx = sliding_window_line_index(timestamps, t_min, n_windows, window_us, step_us)
+
+    # Étape 4 (optionnelle). Une seule ligne par suite de fenêtres vides
+    starts = t_min + np.arange(n_windows, dtype=np.int64) * step_us
+    ends = starts + window_us
+    if skip_empty:
+        empty = np.bincount(window_idx, minlength=n_windows) == 0
+        kept = np.flatnonzero(~empty | (empty & ~np.r_[False, empty[:-1]]))
+        weights = np.diff(np.r_[kept, n_windows])
+        starts, ends = starts[kept], ends[kept + weights - 1]
+        row_idx = np.searchsorted(kept, window_idx)
+    else:
+        row_idx = window_idx
+    n_rows = len(starts)
+
+    # Étape 5. Histogrammes / valeurs distinctes : un bincount par champ sur les codes entiers
+    distinct_fields = distinct_fields or {}
+    blocks = []
+    for field in list(count_fields) + list(distinct_fields):
+        codes, categories = _encode_categorical(df.loc[valid, field])
+        codes = codes[order][line_idx]
+        keep = codes >= 0
+        rows, codes = row_idx[keep], codes[keep]
+        n_cat = max(len(categories), 1)
+
+        if field in distinct_fields:
+            pairs = np.unique(rows * n_cat + codes)
+            values = np.bincount(pairs // n_cat, minlength=n_rows)[:, None]
+            columns = [distinct_fields[field]]
+        else:
+            counts = np.bincount(rows * n_cat + codes, minlength=n_rows * n_cat).reshape(n_rows, n_cat)
+            present = counts.sum(axis=0) > 0
+            values = counts[:, present]
+            categories = np.asarray(categories, dtype=object)[present[:len(categories)]]
+            columns = [f"{count_fields[field]}{category}" for category in categories]
+
+        blocks.append(pd.DataFrame(values.astype(np.int64), columns=columns))
+
+    # Étape 6 (optionnelle). Labels : nombre de lignes en failure par fenêtre, même passage
+    if with_labels:
+        is_failure = (df.loc[valid, LABEL_COL].astype(str) != NORMAL_LABEL).to_numpy(copy=True)[order]
+        failures = np.bincount(row_idx[is_failure[line_idx]], minlength=n_rows)
+        blocks.append(pd.DataFrame({FAILURE_COUNT_COL: failures, LABEL_COL: (failures > 0).astype(np.int64)}))
+
+    matrix = pd.concat(blocks, axis=1)
+    matrix.insert(0, "window_start", starts)
+    matrix.insert(1, "window_end", ends)
+    if skip_empty:
+        matrix.insert(2, WEIGHT_COL, weights)
+
+    return matrix
+
+
 def apply_windows_by_session(
     df: pd.DataFrame,
     session_extractor: Callable[[pd.Series], Optional[str]],
@@ -170,3 +440,88 @@ def apply_windows_by_session(
     matrix[numeric_cols] = matrix[numeric_cols].astype(int)
 
     return matrix
+
+
+def gap_session_index(
+    timestamps: np.ndarray,
+    node_codes: np.ndarray,
+    gap_us: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sessions par nœud séparées par une inactivité > gap_us (cf. apply_gap_sessions).
+
+    Retour
+    ------
+    (np.ndarray, np.ndarray, np.ndarray)
+        order : tri des lignes par (nœud, temps), stable (ordre du log à timestamp égal) ;
+        session_idx : session de chaque ligne, dans l'ordre `order` ;
+        first : position (dans l'ordre `order`) du premier événement de chaque session.
+    """
+    order = np.lexsort((timestamps, node_codes))
+    timestamps, node_codes = timestamps[order], node_codes[order]
+
+    # Début de session : changement de nœud ou inactivité > gap
+    is_start = np.ones(len(timestamps), dtype=bool)
+    is_start[1:] = (node_codes[1:] != node_codes[:-1]) | (np.diff(timestamps) > gap_us)
+    return order, np.cumsum(is_start) - 1, np.flatnonzero(is_start)
+
+
+def apply_gap_sessions(
+    df: pd.DataFrame,
+    timestamp_col: str,
+    gap_minutes: float,
+    node_col: str = "Node",
+    count_field: str = "EventId",
+) -> pd.DataFrame:
+    """
+    Découpe les événements de chaque nœud en sessions séparées par une inactivité
+    de plus de `gap_minutes`, puis compte `count_field` par session.
+
+    Un seul passage vectorisé sur les logs triés par (nœud, temps) : une session
+    commence à chaque changement de nœud ou écart > gap entre deux événements
+    consécutifs du même nœud ; les comptes sont un np.bincount sur (session, code).
+
+    Paramètres
+    ----------
+    gap_minutes : float
+        Inactivité maximale (minutes) entre deux événements d'une même session.
+    node_col : str
+        Colonne identifiant le nœud (lignes sans nœud ignorées).
+    count_field : str
+        Colonne catégorielle comptée par session (EventId).
+
+    Retour
+    ------
+    pd.DataFrame
+        Une ligne par session : session_start, session_end (µs epoch, premier et
+        dernier événement), node_col, puis une colonne par modalité triée de count_field.
+    """
+    gap_us = int(gap_minutes * MICROSECONDS_PER_MINUTE)
+
+    # Étape 1. Timestamps entiers + codes entiers des nœuds et de count_field
+    epoch_us = epoch_microseconds(df, timestamp_col)
+    valid = (epoch_us.notna() & df[node_col].notna()).to_numpy(copy=True)
+    timestamps = epoch_us[valid].to_numpy(dtype=np.int64)
+    node_codes, nodes = _encode_categorical(df.loc[valid, node_col])
+    event_codes, event_ids = _encode_categorical(df.loc[valid, count_field])
+
+    # Étapes 2-3. Tri par (nœud, temps) et découpage en sessions
+    order, session_idx, first = gap_session_index(timestamps, node_codes, gap_us)
+    timestamps, node_codes, event_codes = timestamps[order], node_codes[order], event_codes[order]
+    last = np.r_[first[1:], len(timestamps)] - 1
+    n_sessions = len(first)
+
+    # Étape 4. Histogramme (session × modalité)
+    n_events = max(len(event_ids), 1)
+    keep = event_codes >= 0
+    counts = np.bincount(
+        session_idx[keep] * n_events + event_codes[keep],
+        minlength=n_sessions * n_events,
+    ).reshape(n_sessions, n_events)[:, :len(event_ids)]
+
+    matrix = pd.DataFrame(counts.astype(np.int64), columns=event_ids)
+    matrix.insert(0, "session_start", timestamps[first])
+    matrix.insert(1, "session_end", timestamps[last])
+    matrix.insert(2, node_col, np.asarray(nodes, dtype=object)[node_codes[first]])
+
+    return matrix
@@ -1,10 +1,23 @@
 import argparse
-from typing import Literal
+import os
+from typing import Literal, Optional, Tuple
 
 import pandas as pd
 
-from build_bgl_matrix import build_bgl_matrix_sliding
+from build_bgl_matrix import build_bgl_matrix_sliding, build_bgl_matrix_multi_field, build_bgl_matrix_sessions
 from build_hdfs_matrix import build_hdfs_matrix
+from configs.windows import FAILURE_COUNT_COL, LABEL_COL
+from configs.event_cube import build_event_cube, save_event_cube
+from configs.hashed_ngrams import hashed_ngram_counts, save_ngram_matrix
+from configs.parameter_features import bgl_parameter_features, hdfs_parameter_features, parse_slot_spec
+from configs.sequence_store import (
+    build_bgl_session_sequences,
+    build_bgl_window_sequences,
+    build_hdfs_sequences,
+    save_sequence_store,
+)
+from configs.node_hierarchy import NODE_LEVELS, build_node_window_tensor, save_node_window_tensor
+from incremental_features_matrix import update_bgl_matrix_incremental, update_hdfs_matrix_incremental
 
 # Fonction pour générer et sauvegarder la matrice de features pour un dataset donné
 def generate_features_matrix(
@@ -14,29 +27,140 @@ def generate_features_matrix(
     timestamp_col: str = "Timestamp",
     window_minutes: int = 5,
     step_minutes: int = 1,
+    incremental: bool = False,
+    cube_dir: Optional[str] = None,
+    cube_resolution_seconds: int = 60,
+    skip_empty_windows: bool = False,
+    multi_field: bool = False,
+    node_tensor_path: Optional[str] = None,
+    node_level: str = "midplane",
+    session_gap_minutes: Optional[float] = None,
+    sequences_dir: Optional[str] = None,
+    ngram_path: Optional[str] = None,
+    ngram_n: Tuple[int, ...] = (2, 3),
+    ngram_buckets: int = 4096,
+    hdfs_timing: bool = False,
+    param_slots: Optional[str] = None,
+    with_labels: bool = False,
+    block_idle_minutes: int = 60,
 ) -> pd.DataFrame:
 
+    # Mode incrémental : seules les nouvelles lignes du CSV structuré sont traitées
+    # (état sauvegardé à côté de la matrice, cf. incremental_features_matrix.py)
+    if incremental:
+        if multi_field or hdfs_timing or param_slots or with_labels:
+            raise ValueError(
+                "--multi-field / --hdfs-timing / --param-slots / --with-labels ne sont pas disponibles en mode incrémental."
+            )
+        if dataset.lower() == "bgl":
+            return update_bgl_matrix_incremental(
+                input_path=input_path,
+                output_path=output_path,
+                timestamp_col=timestamp_col,
+                window_minutes=window_minutes,
+                step_minutes=step_minutes,
+                skip_empty=skip_empty_windows,
+            )
+        if dataset.lower() == "hdfs":
+            return update_hdfs_matrix_incremental(
+                input_path=input_path,
+                output_path=output_path,
+                block_idle_minutes=block_idle_minutes,
+            )
+        raise ValueError(f"Dataset non supporté: {dataset}. Utilise 'bgl' ou 'hdfs'.")
+
     # Étape 1. Charger le CSV structuré
     df = pd.read_csv(input_path)
 
     # Étape 2. Orienter vers le bon constructeur selon le dataset
-    if dataset.lower() == "bgl":
-        matrix = build_bgl_matrix_sliding(
+    if with_labels and (dataset.lower() != "bgl" or session_gap_minutes is not None):
+        raise ValueError("--with-labels n'est disponible que pour les fenêtres glissantes BGL.")
+
+    if dataset.lower() == "bgl" and session_gap_minutes is not None:
+        # Sessions par nœud découpées par inactivité (au lieu de fenêtres de temps fixes)
+        matrix = build_bgl_matrix_sessions(df=df, timestamp_col=timestamp_col, gap_minutes=session_gap_minutes)
+        print(f"[INFO] {len(matrix)} sessions (gap = {session_gap_minutes} min)")
+
+    elif dataset.lower() == "bgl":
+        # Multi-champs : EventId + Level / Component / Type + nœuds distincts, en un seul passage
+        build_bgl = build_bgl_matrix_multi_field if multi_field else build_bgl_matrix_sliding
+        matrix = build_bgl(
             df=df,
             timestamp_col=timestamp_col,
             window_minutes=window_minutes,
             step_minutes=step_minutes,
+            skip_empty=skip_empty_windows,
+            with_labels=with_labels,
         )
 
+        # Optionnel : cube de comptes cumulés pour dériver d'autres (window, step) sans relire les logs
+        if cube_dir is not None:
+            save_event_cube(build_event_cube(df, timestamp_col, cube_resolution_seconds), cube_dir)
+            print(f"[INFO] Cube de comptes cumulés sauvegardé : {cube_dir}")
+
+        # Optionnel : comptes (fenêtre × groupe de nœuds × EventId) pour localiser les pannes
+        if node_tensor_path is not None:
+            tensor = build_node_window_tensor(df, timestamp_col, window_minutes, step_minutes, level=node_level)
+            save_node_window_tensor(tensor, node_tensor_path)
+            print(f"[INFO] Tenseur {tensor.shape} ({len(tensor.counts)} cellules non nulles) "
+                  f"par {node_level} sauvegardé : {node_tensor_path}")
+
     elif dataset.lower() == "hdfs":
-        # Construction de la matrice avec `build_hdfs_matrix(df: pd.DataFrame) -> pd.DataFrame`
-        matrix = build_hdfs_matrix(df)
+        # Construction de la matrice avec `build_hdfs_matrix(df: pd.DataFrame, timing: bool) -> pd.DataFrame`
+        # (hdfs_timing : + first_ts, durée, écarts entre événements, délai avant la première erreur)
+        matrix = build_hdfs_matrix(df, timing=hdfs_timing)
 
     else:
         raise ValueError(f"Dataset non supporté: {dataset}. Utilise 'bgl' ou 'hdfs'.")
 
+    # Optionnel : agrégats (somme, max, valeurs distinctes) des paramètres numériques de Drain
+    if param_slots:
+        slots = parse_slot_spec(param_slots)
+        if dataset.lower() == "hdfs":
+            matrix = matrix.merge(hdfs_parameter_features(df, slots), on="BlockId", how="left")
+        elif "window_start" in matrix.columns:
+            # (même grille que la matrice, y compris le regroupement des fenêtres vides)
+            params = bgl_parameter_features(
+                df, slots, timestamp_col, window_minutes, step_minutes, skip_empty=skip_empty_windows
+            )
+            matrix = matrix.merge(params, on="window_start", how="left")
+        else:
+            raise ValueError("--param-slots n'est disponible que pour les fenêtres glissantes BGL et les blocs HDFS.")
+        param_cols = [c for c in matrix.columns if c.startswith("param:")]
+        matrix[param_cols] = matrix[param_cols].fillna(0)
+        print(f"[INFO] {len(param_cols)} colonnes de paramètres ajoutées ({len(slots)} slots).")
+
+    # Optionnel : séquences ordonnées d'EventId par session (ragged array memory-mappable)
+    # et/ou comptes de n-grammes hachés calculés sur ces séquences
+    if sequences_dir is not None or ngram_path is not None:
+        # (une séquence par ligne de la matrice : sessions d'inactivité ou fenêtres glissantes)
+        if dataset.lower() == "bgl" and session_gap_minutes is not None:
+            store = build_bgl_session_sequences(df, timestamp_col, session_gap_minutes)
+        elif dataset.lower() == "bgl":
+            store = build_bgl_window_sequences(
+                df, timestamp_col, window_minutes, step_minutes, skip_empty=skip_empty_windows
+            )
+        else:
+            store = build_hdfs_sequences(df)
+
+        if sequences_dir is not None:
+            save_sequence_store(store, sequences_dir)
+            print(f"[INFO] {len(store)} séquences ({len(store.events)} événements) sauvegardées : {sequences_dir}")
+
+        if ngram_path is not None:
+            ngrams = hashed_ngram_counts(store, n_values=ngram_n, n_buckets=ngram_buckets)
+            save_ngram_matrix(ngrams, store.sessions, ngram_path)
+            print(f"[INFO] n-grammes {ngram_n} hachés {ngrams.shape} ({ngrams.nnz} valeurs non nulles) : {ngram_path}")
+
     # Étape 3. Sauvegarder la matrice en CSV
-    matrix.to_csv(output_path, index=False)
+    # (with_labels : matrice sans labels + <output>_with_labels.csv, sans relire le CSV structuré)
+    if with_labels:
+        labels_path = f"{os.path.splitext(output_path)[0]}_with_labels.csv"
+        matrix.drop(columns=[FAILURE_COUNT_COL, LABEL_COL]).to_csv(output_path, index=False)
+        matrix.to_csv(labels_path, index=False)
+        print(f"[INFO] Matrice avec labels : {labels_path} ({int(matrix[LABEL_COL].sum())} lignes anormales)")
+    else:
+        matrix.to_csv(output_path, index=False)
 
     return matrix
 
@@ -90,6 +214,114 @@ def _parse_args() -> argparse.Namespace:
         help="Pas de la fenêtre glissante en minutes (BGL, défaut=1).",
     )
 
+    parser.add_argument(
+        "--skip-empty-windows",
+        action="store_true",
+        help="BGL : résumer chaque suite de fenêtres vides en une ligne pondérée (colonne window_weight).",
+    )
+
+    parser.add_argument(
+        "--session-gap-minutes",
+        type=float,
+        default=None,
+        help="BGL : sessions par nœud séparées par une inactivité > N minutes (au lieu de fenêtres glissantes).",
+    )
+
+    parser.add_argument(
+        "--with-labels",
+        action="store_true",
+        help="BGL : labels par fenêtre (failure_count, Label) calculés pendant le fenêtrage → <output>_with_labels.csv.",
+    )
+
+    parser.add_argument(
+        "--multi-field",
+        action="store_true",
+        help="BGL : ajouter les comptes par Level / Component / Type et le nombre de nœuds distincts par fenêtre.",
+    )
+
+    parser.add_argument(
+        "--node-tensor-output",
+        type=str,
+        default=None,
+        help="Fichier .npz du tenseur creux (fenêtre × groupe de nœuds × EventId) (BGL).",
+    )
+
+    parser.add_argument(
+        "--node-level",
+        type=str,
+        default="midplane",
+        choices=list(NODE_LEVELS),
+        help="Niveau de regroupement des nœuds pour --node-tensor-output (défaut=midplane).",
+    )
+
+    parser.add_argument(
+        "--hdfs-timing",
+        action="store_true",
+        help="HDFS : ajouter first_ts et les features temporelles par bloc (durée, écarts, délai avant erreur).",
+    )
+
+    parser.add_argument(
+        "--param-slots",
+        type=str,
+        default=None,
+        help="Paramètres numériques Drain à agréger, EventId:position séparés par des virgules (ex : E8:3,E5:0).",
+    )
+
+    parser.add_argument(
+        "--sequences-output",
+        type=str,
+        default=None,
+        help="Dossier où sauvegarder les séquences d'EventId par session (bloc HDFS / fenêtre ou session BGL).",
+    )
+
+    parser.add_argument(
+        "--ngram-output",
+        type=str,
+        default=None,
+        help="Fichier .npz (scipy) des comptes de n-grammes d'EventId hachés par session.",
+    )
+
+    parser.add_argument(
+        "--ngram-n",
+        type=str,
+        default="2,3",
+        help="Tailles de n-grammes pour --ngram-output (défaut=2,3).",
+    )
+
+    parser.add_argument(
+        "--ngram-buckets",
+        type=int,
+        default=4096,
+        help="Nombre de buckets de hachage pour --ngram-output (défaut=4096).",
+    )
+
+    parser.add_argument(
+        "--cube-output",
+        type=str,
+        default=None,
+        help="Dossier où sauvegarder le cube de comptes cumulés (BGL, cf. sweep_window_configs.py).",
+    )
+
+    parser.add_argument(
+        "--cube-resolution-seconds",
+        type=int,
+        default=60,
+        help="Résolution temporelle du cube en secondes (BGL, défaut=60).",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Mise à jour incrémentale : ne traite que les lignes ajoutées depuis le dernier run.",
+    )
+
+    parser.add_argument(
+        "--block-idle-minutes",
+        type=int,
+        default=60,
+        help="HDFS incrémental : inactivité (minutes) après laquelle un bloc est figé dans la matrice (défaut=60).",
+    )
+
     return parser.parse_args()
 
 
@@ -104,6 +336,22 @@ def main() -> None:
         timestamp_col=args.timestamp_col,
         window_minutes=args.window_minutes,
         step_minutes=args.step_minutes,
+        incremental=args.incremental,
+        cube_dir=args.cube_output,
+        cube_resolution_seconds=args.cube_resolution_seconds,
+        skip_empty_windows=args.skip_empty_windows,
+        multi_field=args.multi_field,
+        node_tensor_path=args.node_tensor_output,
+        node_level=args.node_level,
+        session_gap_minutes=args.session_gap_minutes,
+        sequences_dir=args.sequences_output,
+        ngram_path=args.ngram_output,
+        ngram_n=tuple(int(n) for n in args.ngram_n.split(",")),
+        ngram_buckets=args.ngram_buckets,
+        hdfs_timing=args.hdfs_timing,
+        param_slots=args.param_slots,
+        with_labels=args.with_labels,
+        block_idle_minutes=args.block_idle_minutes,
     )
 
 
@@ -0,0 +1,393 @@
+"""
+incremental_features_matrix.py
+------------------------------
+Mise à jour incrémentale des matrices de features : seules les lignes du CSV
+structuré ajoutées depuis le run précédent sont lues (reprise à l'offset en octets
+mémorisé dans l'état, sans reparcourir le début du fichier).
+
+- BGL  : les fenêtres fermées (window_end <= dernier timestamp vu) sont figées dans
+         le CSV ; les fenêtres encore ouvertes sont écrites en fin de fichier et
+         recalculées au run suivant à partir des lignes en attente (pending).
+- HDFS : un bloc n'a pas d'événement de fin ; il est figé dans le CSV dès qu'il n'a
+         reçu aucun événement pendant block_idle_minutes (par rapport au dernier
+         timestamp vu). Les blocs encore ouverts sont écrits en fin de fichier et seuls
+         eux sont réécrits au run suivant. Réécriture complète uniquement si un nouvel
+         EventId apparaît ou si un événement tardif touche un bloc déjà figé.
+
+Les nouveaux EventId deviennent des colonnes remplies de 0 pour les lignes existantes.
+
+Remarque : le CSV structuré doit être complété en fin de fichier (les EventId
+déjà attribués ne doivent pas être renumérotés entre deux runs).
+"""
+import io
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from build_bgl_matrix import build_bgl_matrix_sliding
+from build_hdfs_matrix import TIMING_COLS, build_hdfs_matrix
+from common.block_ids import encode_block_ids
+from configs.incremental_state import FeaturesMatrixState, closed_blocks_path, state_paths, load_state, save_state
+from configs.windows import MICROSECONDS_PER_MINUTE, WEIGHT_COL, epoch_microseconds
+
+
+WINDOW_COLS = ["window_start", "window_end"]
+
+
+# Lire uniquement les lignes du CSV structuré qui n'ont pas encore été intégrées :
+# reprise à l'offset (octets) du run précédent ; retourne (lignes, nouvel offset)
+def _read_new_rows(
+    input_path: str,
+    input_offset: Optional[int] = None,
+    rows_consumed: int = 0,
+) -> Tuple[pd.DataFrame, int]:
+    with open(input_path, "rb") as f:
+        header = f.readline()
+        start = input_offset if input_offset is not None else len(header)
+        f.seek(start)
+        content = f.read()
+
+    # Dernière ligne incomplète (écriture en cours) laissée pour le run suivant
+    content = content[:content.rfind(b"\n") + 1]
+
+    # État sans offset (runs antérieurs) : lignes déjà intégrées sautées, une dernière fois
+    skiprows = range(1, rows_consumed + 1) if input_offset is None and rows_consumed else None
+    df_new = pd.read_csv(io.BytesIO(header + content), skiprows=skiprows)
+    return df_new, start + len(content)
+
+
+# Écrire les fenêtres fermées puis les fenêtres ouvertes ; retourne l'offset (octets) des fenêtres ouvertes
+def _write_matrix_with_open_tail(
+    closed: pd.DataFrame,
+    open_: pd.DataFrame,
+    output_path: str,
+    append_offset: Optional[int] = None,
+) -> int:
+    if append_offset is None:
+        with open(output_path, "wb") as f:
+            closed.to_csv(f, index=False)
+            open_offset = f.tell()
+            open_.to_csv(f, index=False, header=False)
+        return open_offset
+
+    # Append : on écrase uniquement les anciennes fenêtres ouvertes
+    with open(output_path, "r+b") as f:
+        f.truncate(append_offset)
+        f.seek(append_offset)
+        closed.to_csv(f, index=False, header=False)
+        open_offset = f.tell()
+        open_.to_csv(f, index=False, header=False)
+    return open_offset
+
+
+# Relire la partie figée (fenêtres fermées) d'une matrice BGL
+def _read_closed_rows(output_path: str, open_rows_offset: int) -> pd.DataFrame:
+    with open(output_path, "rb") as f:
+        content = f.read(open_rows_offset)
+
+    # (window_start / window_end en µs epoch : relus tels quels, sans parsing de dates)
+    df_closed = pd.read_csv(io.BytesIO(content))
+    return df_closed
+
+
+# Aligner une matrice BGL sur un vocabulaire d'EventId (colonnes manquantes → 0)
+def _align_bgl_columns(matrix: pd.DataFrame, event_cols: List[str]) -> pd.DataFrame:
+    meta_cols = WINDOW_COLS + ([WEIGHT_COL] if WEIGHT_COL in matrix.columns else [])
+    matrix = matrix.reindex(columns=meta_cols + event_cols, fill_value=0)
+    matrix[event_cols] = matrix[event_cols].fillna(0).astype(int)
+    return matrix
+
+
+def update_bgl_matrix_incremental(
+    input_path: str,
+    output_path: str,
+    timestamp_col: str = "Timestamp",
+    window_minutes: int = 5,
+    step_minutes: int = 1,
+    skip_empty: bool = False,
+) -> pd.DataFrame:
+    """
+    Met à jour la matrice BGL à partir des lignes ajoutées au CSV structuré.
+
+    Avec skip_empty, une suite de fenêtres vides à cheval sur deux runs peut être
+    résumée en deux lignes au lieu d'une (la somme des window_weight est identique).
+
+    Retour
+    ------
+    pd.DataFrame
+        Fenêtres (re)calculées pendant ce run.
+    """
+    state_path, pending_path = state_paths(output_path)
+    state = load_state(state_path)
+    if state is not None and not os.path.exists(output_path):
+        state = None
+
+    # Étape 1. Charger les lignes à traiter
+    if state is None:
+        print("[INFO] Aucun état précédent : construction complète de la matrice BGL.")
+        df_work, input_offset = _read_new_rows(input_path)
+        rows_consumed = len(df_work)
+        start_time = None
+    else:
+        if (state.dataset, state.window_minutes, state.step_minutes, state.skip_empty) != (
+            "bgl", window_minutes, step_minutes, skip_empty
+        ):
+            raise ValueError(
+                "Paramètres de fenêtrage différents de l'état existant "
+                f"({state.window_minutes}/{state.step_minutes} min, skip_empty={state.skip_empty}) : "
+                f"supprimer {state_path} pour tout recalculer."
+            )
+
+        df_new, input_offset = _read_new_rows(input_path, state.input_offset, state.rows_consumed)
+        if df_new.empty:
+            state.input_offset = input_offset
+            save_state(state, state_path)
+            print("[INFO] Aucune nouvelle ligne depuis le dernier run, matrice inchangée.")
+            return pd.DataFrame(columns=WINDOW_COLS + state.columns)
+
+        print(f"[INFO] {len(df_new)} nouvelles lignes depuis le dernier run.")
+        df_pending = pd.read_csv(pending_path) if os.path.exists(pending_path) else df_new.iloc[0:0]
+        df_work = pd.concat([df_pending, df_new], ignore_index=True)
+        rows_consumed = state.rows_consumed + len(df_new)
+        start_time = state.next_window_start
+
+    # Étape 2. Timestamps des lignes à traiter, en µs epoch (pour la découpe fermé / ouvert)
+    ts = epoch_microseconds(df_work, timestamp_col)
+    if start_time is not None:
+        is_late = (ts < start_time).fillna(False).to_numpy(dtype=bool)
+        n_late = int(is_late.sum())
+        if n_late:
+            print(f"[WARN] {n_late} lignes antérieures à la dernière fenêtre fermée sont ignorées.")
+            df_work, ts = df_work[~is_late], ts[~is_late]
+    # (aucun timestamp valide, premier run compris : pas de fenêtre ni d'état à écrire)
+    if ts.isna().all():
+        if state is None:
+            print(f"[WARN] Aucun timestamp valide dans la colonne '{timestamp_col}', matrice non créée.")
+            return pd.DataFrame(columns=WINDOW_COLS)
+        state.rows_consumed = rows_consumed
+        state.input_offset = input_offset
+        save_state(state, state_path)
+        print("[INFO] Aucune nouvelle fenêtre à calculer, matrice inchangée.")
+        return pd.DataFrame(columns=WINDOW_COLS + state.columns)
+    t_max = int(ts.max())
+
+    # Étape 3. Calculer uniquement les fenêtres à partir de la première fenêtre ouverte
+    matrix = build_bgl_matrix_sliding(
+        df=df_work,
+        timestamp_col=timestamp_col,
+        window_minutes=window_minutes,
+        step_minutes=step_minutes,
+        start_time=start_time,
+        skip_empty=skip_empty,
+    )
+
+    # Étape 4. Séparer fenêtres fermées (plus aucun log futur ne peut y tomber) / ouvertes
+    is_closed = matrix["window_end"] <= t_max
+    closed, open_ = matrix[is_closed], matrix[~is_closed]
+    n_closed = len(closed)
+    if len(open_):
+        next_window_start = int(open_["window_start"].iloc[0])
+    else:
+        # (fin de la dernière fenêtre - window + step : valable aussi pour une ligne résumant des fenêtres vides)
+        next_window_start = (
+            int(matrix["window_end"].iloc[-1]) + (step_minutes - window_minutes) * MICROSECONDS_PER_MINUTE
+        )
+
+    # Étape 5. Écriture : append si le vocabulaire est inchangé, réécriture sinon
+    new_event_cols = [c for c in matrix.columns if c not in WINDOW_COLS + [WEIGHT_COL]]
+    known_cols = state.columns if state is not None else []
+    added_cols = sorted(set(new_event_cols) - set(known_cols))
+
+    if state is not None and not added_cols:
+        closed = _align_bgl_columns(closed, known_cols)
+        open_ = _align_bgl_columns(open_, known_cols)
+        open_offset = _write_matrix_with_open_tail(closed, open_, output_path, append_offset=state.open_rows_offset)
+        event_cols = known_cols
+    else:
+        event_cols = sorted(set(known_cols) | set(new_event_cols))
+        if state is not None:
+            print(f"[INFO] Nouveaux EventId : {added_cols} → réécriture de la matrice.")
+            closed = pd.concat([_read_closed_rows(output_path, state.open_rows_offset), closed], ignore_index=True)
+        closed = _align_bgl_columns(closed, event_cols)
+        open_ = _align_bgl_columns(open_, event_cols)
+        open_offset = _write_matrix_with_open_tail(closed, open_, output_path)
+
+    # Étape 6. Sauvegarder les lignes nécessaires aux fenêtres ouvertes + l'état
+    df_work[(ts >= next_window_start).fillna(False).to_numpy(dtype=bool)].to_csv(pending_path, index=False)
+    save_state(
+        FeaturesMatrixState(
+            dataset="bgl",
+            rows_consumed=rows_consumed,
+            input_offset=input_offset,
+            columns=event_cols,
+            window_minutes=window_minutes,
+            step_minutes=step_minutes,
+            skip_empty=skip_empty,
+            next_window_start=next_window_start,
+            open_rows_offset=open_offset,
+        ),
+        state_path,
+    )
+
+    print(f"[INFO] Fenêtres fermées ajoutées : {n_closed} — fenêtres ouvertes : {len(open_)}")
+    return matrix
+
+
+
+
+# BlockId int64 en index (pd.Index explicite : avec pandas 3, set_index sur deux BlockId
+# dont l'écart déborde d'un int64 est pris pour un RangeIndex vide)
+def _index_by_block(rows: pd.DataFrame) -> pd.DataFrame:
+    block_ids = pd.Index(rows["BlockId"].to_numpy(dtype=np.int64), name="BlockId")
+    return rows.drop(columns=["BlockId"]).set_axis(block_ids)
+
+
+# Lignes HDFS (BlockId + EventId) : BlockId int64 en index, comptes entiers alignés sur event_cols
+def _align_hdfs_rows(rows: pd.DataFrame, event_cols: List[str]) -> pd.DataFrame:
+    rows = rows.reindex(columns=event_cols, fill_value=0)
+    return rows.fillna(0).astype(int)
+
+
+# Relire une matrice HDFS (partie figée ou fichier complet d'un état antérieur), BlockId int64 en index
+def _read_hdfs_rows(output_path: str, open_rows_offset: Optional[int]) -> pd.DataFrame:
+    rows = _read_closed_rows(output_path, open_rows_offset) if open_rows_offset is not None else pd.read_csv(output_path)
+    # Matrice produite avant le codage int64 des BlockId : conversion "blk_..." → int64
+    rows["BlockId"] = encode_block_ids(rows["BlockId"]).astype("int64")
+    return _index_by_block(rows)
+
+
+def update_hdfs_matrix_incremental(
+    input_path: str,
+    output_path: str,
+    block_idle_minutes: int = 60,
+) -> pd.DataFrame:
+    """
+    Met à jour la matrice HDFS (BlockId × EventId) à partir des lignes ajoutées
+    au CSV structuré : les compteurs des BlockId touchés sont incrémentés, les
+    nouveaux BlockId sont ajoutés.
+
+    Comme les fenêtres BGL, la matrice est une partie figée suivie des blocs ouverts :
+    un bloc est figé quand son dernier événement date de plus de block_idle_minutes
+    avant le dernier timestamp vu. Un run ne lit que les nouvelles lignes et ne
+    réécrit que les blocs ouverts ; il réécrit toute la matrice seulement si un
+    nouvel EventId apparaît ou si un événement tardif touche un bloc déjà figé.
+
+    Retour
+    ------
+    pd.DataFrame
+        Blocs (re)calculés pendant ce run (figés pendant ce run puis encore ouverts).
+    """
+    state_path, pending_path = state_paths(output_path)
+    closed_path = closed_blocks_path(output_path)
+    state = load_state(state_path)
+    if state is not None and not os.path.exists(output_path):
+        state = None
+
+    # Étape 1. Charger les lignes à traiter
+    if state is None:
+        print("[INFO] Aucun état précédent : construction complète de la matrice HDFS.")
+        df_new, input_offset = _read_new_rows(input_path)
+        rows_consumed = len(df_new)
+        known_cols = []
+    else:
+        if state.dataset != "hdfs":
+            raise ValueError(f"L'état {state_path} ne correspond pas à une matrice HDFS.")
+        if state.block_idle_minutes not in (None, block_idle_minutes):
+            raise ValueError(
+                f"Inactivité des blocs différente de l'état existant ({state.block_idle_minutes} min) : "
+                f"supprimer {state_path} pour tout recalculer."
+            )
+
+        df_new, input_offset = _read_new_rows(input_path, state.input_offset, state.rows_consumed)
+        if df_new.empty:
+            state.input_offset = input_offset
+            save_state(state, state_path)
+            print("[INFO] Aucune nouvelle ligne depuis le dernier run, matrice inchangée.")
+            return pd.DataFrame(columns=["BlockId"] + state.columns)
+
+        print(f"[INFO] {len(df_new)} nouvelles lignes depuis le dernier run.")
+        rows_consumed = state.rows_consumed + len(df_new)
+        known_cols = state.columns
+
+    # Étape 2. Histogrammes + dernier timestamp des blocs touchés, en un seul passage
+    delta = _index_by_block(build_hdfs_matrix(df_new, timing=True))
+    delta_last_ts = delta["last_ts"]
+    delta = delta.drop(columns=TIMING_COLS)
+
+    # Ancien ordre des colonnes conservé, nouveaux EventId ajoutés en fin (remplis de 0)
+    added_cols = sorted(c for c in delta.columns if c not in known_cols)
+    event_cols = list(known_cols) + added_cols
+    if state is not None and added_cols:
+        print(f"[INFO] Nouveaux EventId : {added_cols}")
+
+    # Étape 3. Blocs ouverts du run précédent (comptes + dernier timestamp) et blocs figés
+    incremental = state is not None and state.open_rows_offset is not None
+    if incremental and os.path.exists(pending_path):
+        pending = _index_by_block(pd.read_csv(pending_path))
+    else:
+        pending = pd.DataFrame(columns=["last_ts"], index=pd.Index([], dtype="int64", name="BlockId"))
+    closed_ids = np.fromfile(closed_path, dtype=np.int64) if incremental and os.path.exists(closed_path) else None
+
+    is_late = np.isin(delta.index.to_numpy(), closed_ids) if closed_ids is not None else np.zeros(len(delta), dtype=bool)
+    full_rewrite = state is not None and (not incremental or bool(added_cols) or bool(is_late.any()))
+
+    head = None
+    if full_rewrite:
+        head = _align_hdfs_rows(_read_hdfs_rows(output_path, state.open_rows_offset), event_cols)
+        if not incremental:
+            # Matrice d'un état antérieur : ses blocs sont considérés comme figés
+            is_late = delta.index.isin(head.index)
+        if is_late.any():
+            print(f"[INFO] {int(is_late.sum())} blocs figés touchés par des événements tardifs → réécriture de la matrice.")
+            head = head.add(_align_hdfs_rows(delta[is_late], event_cols), fill_value=0).astype(int)
+
+    # Étape 4. Blocs ouverts = blocs ouverts précédents + blocs touchés (hors blocs figés)
+    delta, delta_last_ts = delta[~is_late], delta_last_ts[~is_late]
+    counts = _align_hdfs_rows(pending.drop(columns=["last_ts"]), event_cols).add(
+        _align_hdfs_rows(delta, event_cols), fill_value=0
+    ).astype(int)
+    counts.index.name = "BlockId"
+    last_ts = pd.concat([pending["last_ts"].astype("Int64"), delta_last_ts.astype("Int64")]).groupby(level=0).max()
+    last_ts = last_ts.reindex(counts.index)
+
+    # Étape 5. Blocs figés pendant ce run : inactifs depuis block_idle_minutes
+    seen_ts = [int(v) for v in (last_ts.max(), state.last_event_ts if state is not None else None) if pd.notna(v)]
+    last_event_ts = max(seen_ts) if seen_ts else None
+    if last_event_ts is not None:
+        is_idle = (last_ts <= last_event_ts - block_idle_minutes * MICROSECONDS_PER_MINUTE).fillna(False)
+    else:
+        is_idle = pd.Series(False, index=counts.index)
+    is_idle = is_idle.to_numpy(dtype=bool)
+    closed, open_ = counts[is_idle].sort_index(), counts[~is_idle].sort_index()
+
+    # Étape 6. Écriture : append après la partie figée, réécriture complète sinon
+    if state is not None and not full_rewrite:
+        open_offset = _write_matrix_with_open_tail(
+            closed.reset_index(), open_.reset_index(), output_path, append_offset=state.open_rows_offset
+        )
+        with open(closed_path, "ab") as f:
+            closed.index.to_numpy(dtype=np.int64).tofile(f)
+    else:
+        all_closed = pd.concat([head, closed]) if head is not None else closed
+        open_offset = _write_matrix_with_open_tail(all_closed.reset_index(), open_.reset_index(), output_path)
+        all_closed.index.to_numpy(dtype=np.int64).tofile(closed_path)
+
+    # Étape 7. Sauvegarder les blocs ouverts (avec leur dernier timestamp) + l'état
+    open_.assign(last_ts=last_ts[~is_idle]).reset_index().to_csv(pending_path, index=False)
+    save_state(
+        FeaturesMatrixState(
+            dataset="hdfs",
+            rows_consumed=rows_consumed,
+            input_offset=input_offset,
+            columns=event_cols,
+            open_rows_offset=open_offset,
+            block_idle_minutes=block_idle_minutes,
+            last_event_ts=last_event_ts,
+        ),
+        state_path,
+    )
+
+    print(f"[INFO] Blocs figés pendant ce run : {len(closed)} — blocs ouverts : {len(open_)}")
+    return pd.concat([closed, open_]).reset_index()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import time
+from typing import List, Tuple
+
+import pandas as pd
+
+from configs.event_cube import build_event_cube, derive_window_matrix, load_event_cube, save_event_cube
+
+
+# Parser une grille "5:1,5:5,10:5" → [(5, 1), (5, 5), (10, 5)]
+def _parse_grid(grid: str) -> List[Tuple[int, int]]:
+    configs = []
+    for item in grid.split(","):
+        window, step = item.split(":")
+        configs.append((int(window), int(step)))
+    return configs
+
+
+# Générer les matrices BGL d'une grille (window, step) à partir du cube de comptes cumulés
+def sweep_window_configs(
+    cube_dir: str,
+    grid: List[Tuple[int, int]],
+    output_dir: str,
+    input_path: str = None,
+    timestamp_col: str = "Timestamp",
+    resolution_seconds: int = 60,
+    skip_empty: bool = False,
+) -> None:
+
+    # Étape 1. Charger le cube (ou le construire une seule fois depuis le CSV structuré)
+    if not os.path.exists(os.path.join(cube_dir, "meta.json")):
+        if input_path is None:
+            raise ValueError(f"Cube absent dans {cube_dir} : fournir --input pour le construire.")
+        print(f"[INFO] Construction du cube ({resolution_seconds} s) depuis {input_path}...")
+        cube = build_event_cube(pd.read_csv(input_path), timestamp_col, resolution_seconds)
+        save_event_cube(cube, cube_dir)
+    cube = load_event_cube(cube_dir)
+
+    # Étape 2. Une matrice par configuration, sans relire les logs
+    os.makedirs(output_dir, exist_ok=True)
+    for window_minutes, step_minutes in grid:
+        t_start = time.perf_counter()
+        matrix = derive_window_matrix(cube, window_minutes, step_minutes, skip_empty=skip_empty)
+        output_path = os.path.join(output_dir, f"BGL_matrix_w{window_minutes}_s{step_minutes}.csv")
+        matrix.to_csv(output_path, index=False)
+        print(f"[INFO] w={window_minutes} s={step_minutes} → {matrix.shape} "
+              f"({time.perf_counter() - t_start:.2f} s) : {output_path}")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Balayage de configurations de fenêtres BGL à partir du cube de comptes cumulés."
+    )
+    parser.add_argument("--cube", type=str, required=True, help="Dossier du cube (généré par --cube-output).")
+    parser.add_argument("--grid", type=str, required=True, help="Configurations window:step, ex: 5:1,5:5,10:5.")
+    parser.add_argument("--output-dir", type=str, required=True, help="Dossier de sortie des matrices.")
+    parser.add_argument("--input", type=str, default=None, help="CSV structuré (si le cube doit être construit).")
+    parser.add_argument("--timestamp-col", type=str, default="Timestamp", help="Colonne timestamp (BGL).")
+    parser.add_argument("--resolution-seconds", type=int, default=60, help="Résolution du cube à construire.")
+    parser.add_argument("--skip-empty-windows", action="store_true", help="Résumer les suites de fenêtres vides.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    sweep_window_configs(
+        cube_dir=args.cube,
+        grid=_parse_grid(args.grid),
+        output_dir=args.output_dir,
+        input_path=args.input,
+        timestamp_col=args.timestamp_col,
+        resolution_seconds=args.resolution_seconds,
+        skip_empty=args.skip_empty_windows,
+    )
+
+
+if __name__ == "__main__":
+    main()
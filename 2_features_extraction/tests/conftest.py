@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules de l'étape 2 s'importent depuis leur dossier (from configs.x import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from build_hdfs_matrix import build_hdfs_matrix
+
+
+def _logs() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Date": [81109] * 6,
+        "Time": [203615, 203616, 203617, 203618, 203619, 203620],
+        "Level": ["INFO", "INFO", "INFO", "WARN", "INFO", "INFO"],
+        "Content": [
+            "Receiving block blk_-5974833545991408899 src: /10.0.0.1",
+            "Verification succeeded, no block id on this line",
+            "Receiving block blk_-5974833545991408898 src: /10.0.0.2",
+            "PacketResponder for block blk_7503483334202473044 terminating",
+            "Deleting block blk_-5974833545991408899 file /tmp/x",
+            "Receiving block blk_7503483334202473044 src: /10.0.0.3",
+        ],
+        "EventId": ["E1", "E9", "E1", "E2", "E3", "E1"],
+    })
+
+
+def test_line_without_block_keeps_19_digit_block_ids_exact():
+    matrix = build_hdfs_matrix(_logs())
+
+    assert matrix["BlockId"].dtype == "int64"
+    assert matrix["BlockId"].tolist() == [-5974833545991408899, -5974833545991408898, 7503483334202473044]
+    counts = matrix.set_index("BlockId")
+    assert counts.loc[-5974833545991408899, ["E1", "E3"]].tolist() == [1, 1]
+    assert counts.loc[-5974833545991408898, "E1"] == 1
+    assert counts.loc[7503483334202473044, ["E1", "E2"]].tolist() == [1, 1]
+    # La ligne sans bloc n'est comptée nulle part
+    assert "E9" not in counts.columns
+
+
+def test_timing_rows_match_count_rows():
+    matrix = build_hdfs_matrix(_logs(), timing=True)
+
+    assert len(matrix) == 3
+    assert not matrix.isna().any().any()
+    assert matrix.set_index("BlockId").loc[7503483334202473044, "time_to_error_s"] == 0.0
@@ -0,0 +1,18 @@
+import os
+
+import pandas as pd
+
+from incremental_features_matrix import update_bgl_matrix_incremental
+from configs.incremental_state import state_paths
+
+
+def test_first_run_without_valid_timestamp_writes_nothing(tmp_path):
+    input_path = tmp_path / "structured.csv"
+    output_path = str(tmp_path / "matrix.csv")
+    pd.DataFrame({"Timestamp": ["garbage", None], "EventId": ["E1", "E2"]}).to_csv(input_path, index=False)
+
+    matrix = update_bgl_matrix_incremental(str(input_path), output_path)
+
+    assert matrix.empty
+    assert not os.path.exists(output_path)
+    assert not os.path.exists(state_paths(output_path)[0])
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_bgl_matrix import bgl_agg_eventid_histogram
+from configs.online_windows import OnlineWindowCounter
+from configs.windows import EPOCH_COL, MICROSECONDS_PER_MINUTE, apply_sliding_window
+
+
+@pytest.mark.parametrize("window_minutes, step_minutes", [(5, 1), (6, 4), (5, 10)])
+def test_online_counter_replay_matches_apply_sliding_window(window_minutes, step_minutes):
+    rng = np.random.default_rng(0)
+    timestamps = np.sort(rng.integers(0, 90 * MICROSECONDS_PER_MINUTE, size=300))
+    df = pd.DataFrame({EPOCH_COL: timestamps, "EventId": rng.choice(["E1", "E2", "E3"], size=300)})
+
+    # Rejeu dans le désordre (permutations locales, retard < 30 s), premier événement en tête
+    jitter = np.r_[0, rng.integers(0, 20_000_000, size=len(df) - 1)]
+    stream = df.iloc[np.argsort(timestamps + jitter, kind="stable")]
+
+    counter = OnlineWindowCounter(window_minutes, step_minutes, allowed_lateness_seconds=30)
+    rows = []
+    for ts, event_id in zip(stream[EPOCH_COL].tolist(), stream["EventId"].tolist()):
+        rows.extend(counter.add(ts, event_id))
+    rows.extend(counter.flush())
+    online = counter.to_frame(rows)
+
+    batch = apply_sliding_window(df, EPOCH_COL, window_minutes, step_minutes, bgl_agg_eventid_histogram)
+    batch = batch.reindex(columns=online.columns).fillna(0).astype(np.int64)
+
+    assert counter.late_events == 0
+    pd.testing.assert_frame_equal(online.astype(np.int64), batch)
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from build_bgl_matrix import build_bgl_matrix_sliding
+from configs.parameter_features import bgl_parameter_features
+from configs.windows import EPOCH_COL
+
+MINUTE_US = 60_000_000
+
+
+def test_bgl_parameter_features_skip_empty_match_matrix_rows():
+    df = pd.DataFrame({
+        EPOCH_COL: np.array([0, 1, 27, 61, 62], dtype=np.int64) * MINUTE_US,
+        "EventId": ["E1", "E1", "E2", "E1", "E1"],
+        "ParameterList": ["['10']", "['30']", "['x']", "['5']", "['5']"],
+    })
+
+    matrix = build_bgl_matrix_sliding(df, EPOCH_COL, window_minutes=5, step_minutes=10, skip_empty=True)
+    params = bgl_parameter_features(df, [("E1", 0)], EPOCH_COL, 5, 10, skip_empty=True)
+
+    assert params["window_start"].tolist() == matrix["window_start"].tolist()
+    assert params["param:E1:0:sum"].tolist() == [40.0, 0.0, 10.0]
+    assert params["param:E1:0:max"].tolist() == [30.0, 0.0, 5.0]
+    assert params["param:E1:0:nunique"].tolist() == [2, 0, 1]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from build_bgl_matrix import build_bgl_matrix_sessions, build_bgl_matrix_sliding
+from configs.sequence_store import build_bgl_session_sequences, build_bgl_window_sequences
+from configs.windows import EPOCH_COL
+
+MINUTE_US = 60_000_000
+
+
+def test_session_sequences_match_session_matrix_rows():
+    df = pd.DataFrame({
+        EPOCH_COL: np.array([0, 1, 2, 30, 31, 3, 40, 41, 4], dtype=np.int64) * MINUTE_US,
+        "Node": ["R1", "R1", "R1", "R1", "R1", "R0", "R0", "R0", None],
+        "EventId": ["E1", "E2", None, "E1", "E3", "E2", "E2", "E1", "E1"],
+    })
+
+    matrix = build_bgl_matrix_sessions(df, EPOCH_COL, gap_minutes=5)
+    store = build_bgl_session_sequences(df, EPOCH_COL, gap_minutes=5)
+
+    assert len(store) == len(matrix) == 4
+    assert store.sessions.tolist() == matrix["session_start"].tolist()
+    assert [store.decode(i) for i in range(len(store))] == [["E1", "E2"], ["E2"], ["E1", "E3"], ["E2", "E1"]]
+    for i, sequence in enumerate(store.decode(i) for i in range(len(store))):
+        counts = pd.Series(sequence).value_counts()
+        assert all(matrix.loc[i, event] == counts.get(event, 0) for event in ("E1", "E2", "E3"))
+
+
+def test_window_sequences_skip_empty_match_matrix_rows():
+    df = pd.DataFrame({
+        EPOCH_COL: np.array([0, 1, 2, 27, 61], dtype=np.int64) * MINUTE_US,
+        "EventId": ["E1", "E2", None, "E3", "E1"],
+    })
+
+    matrix = build_bgl_matrix_sliding(df, EPOCH_COL, window_minutes=5, step_minutes=10, skip_empty=True)
+    store = build_bgl_window_sequences(df, EPOCH_COL, window_minutes=5, step_minutes=10, skip_empty=True)
+
+    assert len(store) == len(matrix)
+    assert store.sessions.tolist() == matrix["window_start"].tolist()
+    assert [store.decode(i) for i in range(len(store))] == [["E1", "E2"], [], ["E1"]]
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from configs.windows import EPOCH_COL, WEIGHT_COL, apply_sliding_window, apply_sliding_window_fields
+
+MINUTE_US = 60_000_000
+
+
+def _logs(minutes) -> pd.DataFrame:
+    return pd.DataFrame({
+        EPOCH_COL: np.asarray(minutes, dtype=np.int64) * MINUTE_US,
+        "EventId": ["E1"] * len(minutes),
+    })
+
+
+def _count_events(df_window, w_start, w_end) -> dict:
+    return {"window_start": w_start, "window_end": w_end, "E1": len(df_window)}
+
+
+def test_skip_empty_step_larger_than_window_keeps_one_row_per_empty_run():
+    # Fenêtres [0, 5[, [10, 15[, ... : l'événement à 27 min tombe entre deux fenêtres
+    df = _logs([0, 27, 61])
+
+    loop = apply_sliding_window(df, EPOCH_COL, 5, 10, _count_events, skip_empty=True)
+    fields = apply_sliding_window_fields(df, EPOCH_COL, 5, 10, {"EventId": ""}, skip_empty=True)
+
+    assert loop[WEIGHT_COL].tolist() == [1, 5, 1]
+    assert loop[WEIGHT_COL].tolist() == fields[WEIGHT_COL].tolist()
+    assert loop["window_end"].tolist() == fields["window_end"].tolist()
+    assert loop["E1"].tolist() == fields["E1"].tolist() == [1, 0, 1]
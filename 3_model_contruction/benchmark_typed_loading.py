@@ -0,0 +1,130 @@
+"""
+benchmark_typed_loading.py
+--------------------------
+Compare le chargement standard (int64 / float64) au chargement typé (schéma, uint / float32)
+sur une même matrice : temps de lecture, taille de X, temps d'entraînement TimeSeries CV
+et pic de mémoire résidente.
+
+Chaque mode tourne dans un processus neuf (spawn) : le pic RSS mesuré (ru_maxrss) est
+celui du seul mode, sans les allocations du mode précédent. Le premier passage typé
+écrit le schéma si besoin (mode "typed (schéma créé)"), le second le réutilise.
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import time
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from configs.data_utils import load_hdfs_matrix_and_labels
+from configs.matrix_schema import load_schema
+from logistic_regression_model import train_eval_logistic_regression_timeseries
+from random_forest_model import train_eval_random_forest_timeseries
+
+
+def _run_mode(
+    typed: bool,
+    matrix_csv: str,
+    labels_csv: Optional[str],
+    model_name: str,
+    n_splits: int,
+    n_jobs: int,
+    queue,
+) -> None:
+    # Étape 1. Chargement (lecture + fusion des labels + tri chronologique)
+    start = time.perf_counter()
+    X, y, sample_weight = load_hdfs_matrix_and_labels(matrix_csv, labels_csv, typed=typed)
+    load_seconds = time.perf_counter() - start
+
+    # Étape 2. Entraînement TimeSeries CV (folds séquentiels : temps comparables)
+    trainers = {
+        "rf": train_eval_random_forest_timeseries,
+        "lr": train_eval_logistic_regression_timeseries,
+    }
+    result: Dict[str, Any] = {
+        "load_s": load_seconds,
+        "X_mb": X.memory_usage(index=False, deep=False).sum() / 2**20,
+    }
+    for name in (["rf", "lr"] if model_name == "both" else [model_name]):
+        start = time.perf_counter()
+        fold_models = trainers[name](
+            X, y, n_splits=n_splits, n_jobs=n_jobs, fold_workers=1, sample_weight=sample_weight
+        )
+        result[f"{name}_fit_s"] = time.perf_counter() - start
+        result[f"{name}_pr_auc"] = fold_models[-1].metrics.get("pr_auc")
+
+    # Étape 3. Pic de mémoire résidente du processus (Linux : ru_maxrss en Ko)
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put(result)
+
+
+def benchmark_typed_loading(
+    matrix_csv: str,
+    labels_csv: Optional[str] = None,
+    model_name: str = "both",
+    n_splits: int = 5,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    """
+    Mesure les modes float64 (actuel) et typé, chacun dans un processus séparé.
+
+    Retour
+    ------
+    DataFrame (une ligne par mode) : load_s, X_mb, <modèle>_fit_s, <modèle>_pr_auc, peak_rss_mb.
+    """
+    if model_name not in ("rf", "lr", "both"):
+        raise ValueError(f"Modèle inconnu : {model_name} (attendu : 'rf', 'lr' ou 'both').")
+
+    modes = [("float64", False)]
+    if load_schema(matrix_csv) is None:
+        modes.append(("typed (schéma créé)", True))
+    modes.append(("typed", True))
+
+    ctx = mp.get_context("spawn")
+    rows = {}
+    for label, typed in modes:
+        print(f"\n[INFO] ===== Mode {label} =====")
+        queue = ctx.Queue()
+        process = ctx.Process(
+            target=_run_mode,
+            args=(typed, matrix_csv, labels_csv, model_name, n_splits, n_jobs, queue),
+        )
+        process.start()
+        rows[label] = queue.get()
+        process.join()
+
+    df_bench = pd.DataFrame.from_dict(rows, orient="index")
+    print("\n=== Chargement float64 vs typé ===")
+    print(df_bench.round(3).to_string())
+
+    reference, typed_row = df_bench.iloc[0], df_bench.iloc[-1]
+    print(
+        f"[INFO] X : {reference['X_mb']:.1f} Mo → {typed_row['X_mb']:.1f} Mo | "
+        f"pic RSS : {reference['peak_rss_mb']:.0f} Mo → {typed_row['peak_rss_mb']:.0f} Mo"
+    )
+    return df_bench
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du chargement typé (mémoire, temps de fit) vs float64.")
+
+    parser.add_argument("--matrix_csv", type=str, required=True, help="Chemin vers la matrice (HDFS ou BGL).")
+    parser.add_argument("--labels_csv", type=str, required=False, help="Chemin vers le fichier de labels.")
+    parser.add_argument("--model", type=str, default="both", help="Modèle: 'rf', 'lr' ou 'both'.")
+    parser.add_argument("--splits", type=int, default=5, help="Nombre de splits TimeSeries.")
+    parser.add_argument("--n_jobs", type=int, default=-1, help="Cœurs pour les arbres (folds séquentiels).")
+    parser.add_argument("--output", type=str, default=None, help="CSV de sortie des mesures (optionnel).")
+
+    args = parser.parse_args()
+
+    df_bench = benchmark_typed_loading(
+        matrix_csv=args.matrix_csv,
+        labels_csv=args.labels_csv,
+        model_name=args.model,
+        n_splits=args.splits,
+        n_jobs=args.n_jobs,
+    )
+    if args.output is not None:
+        df_bench.to_csv(args.output)
+        print(f"[INFO] Mesures écrites : {args.output}")
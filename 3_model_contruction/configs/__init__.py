@@ -0,0 +1,8 @@
+# Les étapes s'exécutent depuis leur propre dossier : la racine du projet est ajoutée
+# au chemin pour les modules partagés entre étapes (common/, ex : common.block_ids)
+import os
+import sys
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
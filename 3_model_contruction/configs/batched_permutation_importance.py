@@ -0,0 +1,175 @@
+"""
+batched_permutation_importance.py
+---------------------------------
+Permutation importance par lots, sur un buffer réutilisé (remplace
+sklearn.inspection.permutation_importance dans compute_permutation_importance).
+
+sklearn copie X_test pour chaque feature et lance p × n_repeats prédictions séparées.
+Ici :
+- le buffer contient B copies empilées de X_test, allouées UNE fois ;
+- chaque copie reçoit une (unité, répétition) : les colonnes de l'unité sont permutées
+  en place, puis restaurées après la prédiction ;
+- une seule prédiction pour les B copies (B = budget mémoire / taille de X_test) ;
+- une unité = une feature ou un groupe de features permutées ensemble (familles de
+  templates, etc.) ;
+- les unités constantes sur le test ont une importance nulle, sans prédiction ;
+- arrêt anticipé optionnel : une unité dont les min_repeats premières répétitions
+  changent le score de moins de early_stop_tol n'est pas répétée davantage.
+
+Les permutations sont celles de sklearn (même graine, mêmes mélanges cumulés par
+répétition) et le score est average_precision sur decision_function / predict_proba
+comme le scorer "average_precision" : sans arrêt anticipé, les importances sont
+identiques à celles de permutation_importance.
+
+Fonctions :
+- batched_permutation_importance : Importances (moyenne, écart-type, brutes) par unité.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.metrics import average_precision_score
+from sklearn.utils import check_random_state
+
+
+# Taille maximale du buffer de permutation (nombre d'éléments)
+BATCH_ELEMENTS = 1 << 24
+
+
+@dataclass
+class PermutationImportanceResult:
+    names: List[str]                    # nom de chaque unité (feature ou groupe)
+    importances_mean: np.ndarray        # (n_units,)
+    importances_std: np.ndarray         # (n_units,)
+    importances: np.ndarray             # (n_units, n_repeats), NaN si arrêt anticipé
+    n_repeats_done: np.ndarray          # (n_units,) répétitions réellement calculées
+
+
+def _positive_scores(model, X: np.ndarray) -> np.ndarray:
+    # Même réponse que le scorer "average_precision" : decision_function, sinon proba
+    if hasattr(model, "decision_function"):
+        return model.decision_function(X)
+    return model.predict_proba(X)[:, 1]
+
+
+def _repeat_permutations(n_samples: int, n_repeats: int, random_state) -> np.ndarray:
+    """
+    (n_repeats, n_samples) : ordre des lignes de chaque répétition, comme sklearn
+    (une graine commune à toutes les features, mélanges cumulés d'une répétition à l'autre).
+    """
+    seed = check_random_state(random_state).randint(np.iinfo(np.int32).max + 1)
+    rng = np.random.RandomState(seed)
+
+    shuffling_idx = np.arange(n_samples)
+    order = np.arange(n_samples)
+    perms = np.empty((n_repeats, n_samples), dtype=np.intp)
+    for r in range(n_repeats):
+        rng.shuffle(shuffling_idx)
+        order = order[shuffling_idx]
+        perms[r] = order
+    return perms
+
+
+def batched_permutation_importance(
+    model,
+    X: np.ndarray,
+    y: np.ndarray,
+    n_repeats: int = 10,
+    random_state: int = 42,
+    feature_names: Optional[List[str]] = None,
+    groups: Optional[Dict[str, List[int]]] = None,
+    early_stop_tol: Optional[float] = None,
+    min_repeats: int = 3,
+    batch_elements: int = BATCH_ELEMENTS,
+) -> PermutationImportanceResult:
+    """
+    Permutation importance (baisse de PR-AUC) de chaque feature ou groupe de features.
+
+    Paramètres
+    ----------
+    model :
+        Estimateur entraîné (predict_proba ou decision_function).
+    X : np.ndarray
+        Données de test (n_samples, n_features), dans le dtype attendu par le modèle
+        (float32 pour RandomForest : aucune conversion par prédiction).
+    y : np.ndarray
+        Labels binaires du test.
+    feature_names : list[str] | None
+        Noms des colonnes (unités = features si groups est None).
+    groups : dict[str, list[int]] | None
+        Unités = groupes {nom: indices de colonnes} permutés ensemble.
+    early_stop_tol : float | None
+        Arrêt anticipé des unités dont |importance| <= early_stop_tol sur les
+        min_repeats premières répétitions (None = toujours n_repeats répétitions).
+    batch_elements : int
+        Taille maximale du buffer (nombre d'éléments), fixe le nombre de copies par lot.
+
+    Retour
+    ------
+    PermutationImportanceResult
+    """
+    X = np.ascontiguousarray(X)
+    y = np.asarray(y)
+    n_samples, n_features = X.shape
+
+    # Unités permutées : une par feature, ou une par groupe
+    if groups is None:
+        names = list(feature_names) if feature_names is not None else [str(j) for j in range(n_features)]
+        unit_cols = [np.array([j]) for j in range(n_features)]
+    else:
+        names = list(groups)
+        unit_cols = [np.asarray(cols, dtype=np.intp) for cols in groups.values()]
+        if any(len(cols) == 0 for cols in unit_cols):
+            raise ValueError("Chaque groupe de features doit contenir au moins une colonne.")
+
+    n_units = len(unit_cols)
+    perms = _repeat_permutations(n_samples, n_repeats, random_state)
+    baseline = average_precision_score(y, _positive_scores(model, X))
+
+    importances = np.full((n_units, n_repeats), np.nan)
+
+    # Étape 1. Colonnes constantes sur le test (fréquent : EventId absents du fold) :
+    # la permutation ne change rien → importance nulle, sans prédiction
+    constant = np.all(X == X[:1], axis=0)
+    varying = [u for u in range(n_units) if not constant[unit_cols[u]].all()]
+    importances[[u for u in range(n_units) if constant[unit_cols[u]].all()]] = 0.0
+
+    # Étape 2. Buffer de B copies de X, alloué une fois et restauré après chaque lot
+    first_repeats = n_repeats if early_stop_tol is None else min(min_repeats, n_repeats)
+    max_tasks = max(1, len(varying) * n_repeats)
+    batch = int(max(1, min(max_tasks, batch_elements // max(1, n_samples * n_features))))
+    buffer = np.tile(X, (batch, 1))
+
+    def run_tasks(tasks):
+        for start in range(0, len(tasks), batch):
+            chunk = tasks[start:start + batch]
+
+            # Permutation en place des colonnes de l'unité dans sa copie
+            for k, (u, r) in enumerate(chunk):
+                cols = unit_cols[u]
+                buffer[k * n_samples:(k + 1) * n_samples, cols] = X[np.ix_(perms[r], cols)]
+
+            # Une prédiction pour tout le lot
+            scores = _positive_scores(model, buffer[:len(chunk) * n_samples])
+
+            for k, (u, r) in enumerate(chunk):
+                block = slice(k * n_samples, (k + 1) * n_samples)
+                importances[u, r] = baseline - average_precision_score(y, scores[block])
+                buffer[block, unit_cols[u]] = X[:, unit_cols[u]]
+
+    # Étape 3. Tâches (unité, répétition) : toutes les répétitions, ou d'abord les min_repeats
+    run_tasks([(u, r) for u in varying for r in range(first_repeats)])
+
+    # Étape 4. Arrêt anticipé : répétitions restantes pour les unités encore actives
+    if first_repeats < n_repeats:
+        active = [u for u in varying if np.any(np.abs(importances[u, :first_repeats]) > early_stop_tol)]
+        run_tasks([(u, r) for u in active for r in range(first_repeats, n_repeats)])
+
+    n_done = np.sum(~np.isnan(importances), axis=1)
+    return PermutationImportanceResult(
+        names=names,
+        importances_mean=np.nanmean(importances, axis=1),
+        importances_std=np.nanstd(importances, axis=1),
+        importances=importances,
+        n_repeats_done=n_done,
+    )
@@ -1,44 +1,48 @@
 import pandas as pd
 
+from common.block_ids import encode_block_ids
+
+# Colonne int64 (µs depuis epoch) ajoutée au CSV structuré par le parsing
+# (même nom que EPOCH_COL de 1_logparser/configs/epoch_timestamps.py)
+EPOCH_COL = "EpochUs"
+
+
 def load_structured_logs(structured_csv: str) -> pd.DataFrame:
     """
-    Charge le fichier structuré HDFS et construit une colonne timestamp réelle.
-    Format attendu : LineId,Date,Time,Pid,Level,Component,Content,EventId,...
+    Charge le fichier structuré HDFS et construit une colonne timestamp (µs epoch, int64).
+    Format attendu : LineId,Date,Time,EpochUs,Pid,Level,Component,Content,EventId,...
+
+    La colonne EpochUs calculée au parsing est lue directement (seules les colonnes
+    utiles sont chargées) ; pour un CSV structuré plus ancien, elle est recalculée
+    depuis Date (yymmdd, ex : 81109 → 2008-11-09) et Time (hhmmss).
     """
-    df = pd.read_csv(structured_csv)
-
-    # Combiner Date + Time en un vrai timestamp
-    # Exemple HDFS : Date = 81109  (08-11 09 ??)
-    # Tu dois convertir Date/Time → timestamp ci-dessous :
-    df["Date"] = df["Date"].astype(str)
-    df["Time"] = df["Time"].astype(str).str.zfill(6)  # ex: "203615"
-
-    # Transformation en HH:MM:SS
-    df["TimeFmt"] = df["Time"].str.slice(0,2) + ":" + df["Time"].str.slice(2,4) + ":" + df["Time"].str.slice(4,6)
-
-    # Transformation en date HDFS
-    # Date = MMDD hhmmss (LogHub format)
-    # ex: 81109 → "08-11"
-    df["Month"] = df["Date"].str.slice(0,1)
-    df["Day"]   = df["Date"].str.slice(1,3)
-
-    # Construire un timestamp complet (année arbitraire mais cohérente)
-    df["timestamp"] = pd.to_datetime(
-        "2018-" + df["Month"] + "-" + df["Day"] + " " + df["TimeFmt"],
-        errors="coerce"
+    header = pd.read_csv(structured_csv, nrows=0).columns
+
+    if EPOCH_COL in header:
+        df = pd.read_csv(structured_csv, usecols=["Content", EPOCH_COL])
+        df["timestamp"] = df[EPOCH_COL].astype("Int64")
+        return df
+
+    df = pd.read_csv(structured_csv, usecols=["Content", "Date", "Time"])
+    ts = pd.to_datetime(
+        df["Date"].astype(str).str.zfill(6) + df["Time"].astype(str).str.zfill(6),
+        format="%y%m%d%H%M%S",
+        errors="coerce",
     )
+    epoch_us = pd.Series(ts.to_numpy(dtype="datetime64[us]").astype("int64"), index=df.index)
+    df["timestamp"] = epoch_us.where(ts.notna()).astype("Int64")
 
     return df
 
 
 def compute_block_first_timestamp(df_struct: pd.DataFrame) -> pd.DataFrame:
     """
-    Pour chaque BlockId, on prend le timestamp de la première occurrence.
+    Pour chaque BlockId (int64), on prend le timestamp de la première occurrence.
     """
     df = df_struct.copy()
 
-    # Extraire BlockId depuis ParameterList quand EventId contient 'blk'
-    df["BlockId"] = df["Content"].str.extract(r"(blk_[\-0-9]+)")
+    # Extraire BlockId (int64) depuis Content
+    df["BlockId"] = encode_block_ids(df["Content"])
 
     # Enlever les lignes sans block
     df = df.dropna(subset=["BlockId"])
@@ -60,6 +64,8 @@ def reorder_matrix_by_chronology(matrix_csv: str, block_ts_df: pd.DataFrame) ->
     puis trie les blocks par ordre chronologique.
     """
     df_matrix = pd.read_csv(matrix_csv)
+    # Matrice produite avant le codage int64 des BlockId : conversion "blk_..." → int64
+    df_matrix["BlockId"] = encode_block_ids(df_matrix["BlockId"])
 
     # Fusion
     df = df_matrix.merge(block_ts_df, on="BlockId", how="left")
@@ -81,7 +87,8 @@ def build_chronological_matrix(
     Construit / réordonne la matrice de features de manière chronologique.
 
     - HDFS :
-        * on utilise les logs structurés pour calculer le premier timestamp par BlockId
+        * si la matrice contient déjà first_ts (--hdfs-timing), tri direct
+        * sinon, on utilise les logs structurés pour calculer le premier timestamp par BlockId
         * on réordonne la matrice BlockId × EventId en conséquence
     - BGL :
         * la matrice est déjà agrégée par fenêtre temporelle (window_start)
@@ -92,7 +99,12 @@ def build_chronological_matrix(
     # Charger la matrice existante
     df_matrix_chrono = pd.read_csv(matrix_csv)
 
-    if dataset == "hdfs":
+    if dataset == "hdfs" and "first_ts" in df_matrix_chrono.columns:
+        # Matrice générée avec --hdfs-timing : first_ts déjà calculé, pas de relecture des logs
+        print("[INFO] first_ts présent dans la matrice HDFS, tri direct.")
+        df_matrix_chrono = df_matrix_chrono.sort_values("first_ts")
+
+    elif dataset == "hdfs":
         print("[INFO] Chargement structured logs (HDFS)...")
         df_struct = load_structured_logs(structured_csv)
 
@@ -105,9 +117,11 @@ def build_chronological_matrix(
     elif dataset == "bgl":
         print("[INFO] Dataset BGL : tri éventuel sur 'window_start' s'il est présent...")
         if "window_start" in df_matrix_chrono.columns:
-            df_matrix_chrono["window_start"] = pd.to_datetime(
-                df_matrix_chrono["window_start"], errors="coerce"
-            )
+            # window_start en µs epoch (int64) : tri direct ; anciennes matrices : dates texte
+            if not pd.api.types.is_numeric_dtype(df_matrix_chrono["window_start"]):
+                df_matrix_chrono["window_start"] = pd.to_datetime(
+                    df_matrix_chrono["window_start"], errors="coerce"
+                )
             df_matrix_chrono = df_matrix_chrono.sort_values("window_start")
             print("[INFO] Tri chronologique appliqué sur 'window_start'.")
         else:
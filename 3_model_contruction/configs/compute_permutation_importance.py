@@ -1,12 +1,16 @@
+from typing import Dict, List, Optional
+
 import pandas as pd
 import numpy as np
 
 from sklearn.model_selection import TimeSeriesSplit
-from sklearn.inspection import permutation_importance
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 import matplotlib.pyplot as plt
 
+from configs.batched_permutation_importance import batched_permutation_importance
+from configs.fold_model_cache import FoldModel
+
 def compute_permutation_importance(
     model,
     X: pd.DataFrame,
@@ -14,25 +18,46 @@ def compute_permutation_importance(
     n_splits: int = 5,
     n_repeats: int = 10,
     random_state: int = 42,
+    fold_models: Optional[List[FoldModel]] = None,
+    feature_groups: Optional[Dict[str, List[str]]] = None,
+    early_stop_tol: Optional[float] = None,
 ) -> pd.DataFrame:
     """
     Calcule la permutation importance d'un modèle scikit-learn
     en utilisant une TimeSeries Cross-Validation (Rolling / Sliding-origin).
 
-    - À chaque fold :
-        * le modèle est ré-entraîné sur le passé (train)
-        * la permutation importance est calculée sur le futur (test)
+    - À chaque fold, la permutation importance est calculée sur le futur (test) avec un
+      modèle entraîné sur le passé (train).
     - Les données de TEST restent intactes (pas de rééchantillonnage, pas de balancing).
-    - Le modèle est ré-entraîné SANS class_weight pour l’interprétation.
+    - Si fold_models est fourni (cas de train_models.py : modèles déjà entraînés par les
+      entraîneurs TimeSeries CV, voir configs/fold_model_cache.py), aucun ré-entraînement :
+      chaque modèle est évalué sur le test de son fold tel qu'il a été entraîné, donc AVEC
+      le class_weight de l'entraînement ("balanced" par défaut) ; model peut valoir None.
+    - Sinon, `model` est ré-entraîné sur le train de chaque fold SANS class_weight.
+    - Moteur par lots (configs/batched_permutation_importance.py) : feature_groups
+      {nom: [colonnes]} permute des groupes de features ensemble (une ligne par groupe),
+      early_stop_tol arrête tôt les features clairement sans importance.
 
     Retourne : DataFrame triée par importance décroissante,
                importance moyenne et écart-type sur les n_splits.
     """
 
-    # TimeSeries CV (respect du temps)
-    tscv = TimeSeriesSplit(n_splits=n_splits)
+    # TimeSeries CV (respect du temps) ; folds repris des modèles déjà entraînés si fournis
+    if fold_models is not None:
+        n_splits = len(fold_models)
+        model = fold_models[0].model
+        folds = [(np.arange(fm.train_end), np.arange(fm.train_end, fm.test_end)) for fm in fold_models]
+    else:
+        folds = TimeSeriesSplit(n_splits=n_splits).split(X)
+
+    # Groupes de features → indices de colonnes
+    groups = None
+    if feature_groups is not None:
+        unknown = sorted({c for cols in feature_groups.values() for c in cols} - set(X.columns))
+        if unknown:
+            raise ValueError(f"Colonnes inconnues dans feature_groups : {unknown[:10]}")
+        groups = {name: [X.columns.get_loc(c) for c in cols] for name, cols in feature_groups.items()}
 
-    n_features = X.shape[1]
     all_importances_mean = []
     all_importances_std = []
 
@@ -47,28 +72,36 @@ def compute_permutation_importance(
         base_params.pop("class_weight")
 
     fold_idx = 0
-    for train_idx, test_idx in tscv.split(X):
+    for train_idx, test_idx in folds:
         fold_idx += 1
         print(f"\n[INFO] Fold {fold_idx} — Train: {len(train_idx)} | Test: {len(test_idx)}")
 
-        X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
-        y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
-
-        # --- Ré-entraînement du modèle pour l’interprétation (sans class_weight) ---
-        print("[INFO]   Ré-entraînement du modèle (sans class_weight) sur le train du fold...")
-        model_clean = model.__class__(**base_params)
-        model_clean.fit(X_train, y_train)
-
-        # --- Calcul de la permutation importance sur le test du fold ---
+        # Modèles entraînés et évalués sur des tableaux (sans noms de colonnes)
+        if fold_models is not None:
+            # --- Modèle du fold déjà entraîné (avec le class_weight de l'entraînement) ---
+            print("[INFO]   Modèle du fold repris de l'entraînement TimeSeries CV (pas de ré-entraînement).")
+            model_clean = fold_models[fold_idx - 1].model
+        else:
+            # --- Ré-entraînement du modèle pour l’interprétation (sans class_weight) ---
+            print("[INFO]   Ré-entraînement du modèle (sans class_weight) sur le train du fold...")
+            model_clean = model.__class__(**base_params)
+            model_clean.fit(X.iloc[train_idx].to_numpy(), y.iloc[train_idx].to_numpy())
+
+        # float32 pour les forêts (type interne des arbres : pas de conversion par prédiction)
+        dtype = np.float32 if isinstance(model_clean, RandomForestClassifier) else np.float64
+        X_test, y_test = X.iloc[test_idx].to_numpy(dtype=dtype), y.iloc[test_idx].to_numpy()
+
+        # --- Calcul de la permutation importance sur le test du fold (PR-AUC, par lots) ---
         print("[INFO]   Calcul de la permutation importance sur le test du fold...")
-        perm = permutation_importance(
+        perm = batched_permutation_importance(
             model_clean,
             X_test,
             y_test,
             n_repeats=n_repeats,
             random_state=random_state,
-            scoring="average_precision",  # PR-AUC : adapté aux datasets déséquilibrés
-            n_jobs=-1,
+            feature_names=list(X.columns),
+            groups=groups,
+            early_stop_tol=early_stop_tol,
         )
 
         all_importances_mean.append(perm.importances_mean)
@@ -83,7 +116,7 @@ def compute_permutation_importance(
 
     df_importance = pd.DataFrame(
         {
-            "feature": X.columns,
+            "feature": perm.names,
             "importance_mean": mean_importance,
             "importance_std": std_importance,
         }
@@ -1,22 +1,52 @@
 # data_utils.py
 
+import os
 from typing import List, Tuple, Optional
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+from common.block_ids import MISSING_LABEL, encode_block_ids, load_label_index
+from configs.label_diagnostics import print_label_diagnostics
+from configs.matrix_schema import read_matrix_typed
+from configs.shared_matrix import share_features
+
+# Nombre de fenêtres représentées par une ligne (matrices BGL fenêtrées avec skip_empty)
+WEIGHT_COL = "window_weight"
+
 
 def load_hdfs_matrix_and_labels(
     matrix_csv: str,
     labels_csv: Optional[str] = None,
     label_col: str = "Label",
-) -> Tuple[pd.DataFrame, pd.Series]:
+    mmap_dir: Optional[str] = None,
+    typed: bool = False,
+    diagnostics: str = "full",
+    diagnostics_sample_rows: int = 100_000,
+) -> Tuple[pd.DataFrame, pd.Series, Optional[pd.Series]]:
     """
     Charge la matrice des features, fusionne avec les labels si nécessaire,
-    trie chronologiquement, et renvoie X (features) et y (labels).
+    trie chronologiquement, et renvoie X (features), y (labels) et les poids des lignes.
+
+    Les poids viennent de la colonne window_weight (suite de fenêtres vides résumée en
+    une ligne, cf. apply_sliding_window(skip_empty=True)) : à passer en sample_weight
+    au fit pour que chaque ligne compte pour le nombre de fenêtres qu'elle représente.
+    None si la matrice n'a pas cette colonne (toutes les lignes pèsent 1).
+
+    Si mmap_dir est fourni, X et y sont écrits dans <mmap_dir>/<matrice>_X.npy / _y.npy
+    et renvoyés adossés à ces fichiers en memory-map (lecture seule) : les entraînements
+    multi-processus s'y attachent au lieu d'en recevoir une copie.
+
+    Si typed est vrai, la matrice est lue avec des types réduits (uint8/16/32, float32)
+    décrits par le schéma <matrix_csv>.schema.json, créé au premier chargement typé.
+
+    diagnostics ("full", "sample" ou "off") contrôle l'aperçu X + y et la corrélation
+    features / label (sur diagnostics_sample_rows lignes en mode "sample", voir
+    configs/label_diagnostics.py).
     """
 
-    # --- Charger la matrice ---
-    df_matrix = pd.read_csv(matrix_csv)
+    # --- Charger la matrice (types réduits via le schéma si typed) ---
+    df_matrix = read_matrix_typed(matrix_csv) if typed else pd.read_csv(matrix_csv)
     df = df_matrix  # nom local simplifié
 
     # --- CAS 1 : le label existe déjà dans la matrice => on ignore labels_csv ---
@@ -30,34 +60,46 @@ def load_hdfs_matrix_and_labels(
                 f"'{label_col}' absent de la matrice et aucun fichier labels_csv fourni."
             )
 
-        df_labels = pd.read_csv(labels_csv)
+        labels_header = pd.read_csv(labels_csv, nrows=0).columns
 
-        if label_col not in df_labels.columns:
+        if label_col not in labels_header:
             raise ValueError(
                 f"Erreur : la colonne '{label_col}' est absente de {labels_csv}. "
-                f"Colonnes disponibles : {list(df_labels.columns)}"
+                f"Colonnes disponibles : {list(labels_header)}"
             )
 
-        if "BlockId" not in df.columns or "BlockId" not in df_labels.columns:
+        if "BlockId" not in df.columns or "BlockId" not in labels_header:
             raise ValueError("La fusion requiert une colonne BlockId dans les deux CSV.")
 
-        df = df.merge(df_labels[["BlockId", label_col]], on="BlockId", how="inner")
+        # Jointure sur BlockId int64 : index trié des labels (cache .npz) + searchsorted,
+        # BlockId sans label écartés (équivalent du merge inner)
+        block_ids = encode_block_ids(df["BlockId"])
+        labels = load_label_index(labels_csv, label_col).lookup(block_ids.fillna(0).to_numpy(dtype="int64"))
+        keep = (labels != MISSING_LABEL) & block_ids.notna().to_numpy()
+
+        df = df.loc[keep].copy()
+        df["BlockId"] = block_ids[keep].astype("int64")
+        df[label_col] = labels[keep]
         print(f"[INFO] Fusion BlockId OK — df.shape = {df.shape}")
 
     # --- Tri chronologique si disponible ---
-    for ts_col in ("first_ts", "window_start"):
+    for ts_col in ("first_ts", "window_start", "session_start"):
         if ts_col in df.columns:
-            df[ts_col] = pd.to_datetime(df[ts_col], errors="coerce")
+            # µs epoch (int64) : tri direct, sans parsing ; anciennes matrices : dates texte
+            if not pd.api.types.is_numeric_dtype(df[ts_col]):
+                df[ts_col] = pd.to_datetime(df[ts_col], errors="coerce")
             df = df.sort_values(ts_col)
             print(f"[INFO] Tri chronologique appliqué sur '{ts_col}'.")
             break
 
     # --- Séparer X (features) / y (labels) ---
-    exclude_cols = {"BlockId", label_col, "first_ts", "window_start", "window_end", "Label"}
+    exclude_cols = {"BlockId", label_col, "failure_count", "first_ts", "last_ts", "window_start", "window_end", WEIGHT_COL,
+                    "session_start", "session_end", "Node", "Label"}
 
     feature_cols = [c for c in df.columns if c not in exclude_cols]
     X = df[feature_cols]
     y = df[label_col]
+    sample_weight = df[WEIGHT_COL].astype(np.float64) if WEIGHT_COL in df.columns else None
 
     # --- Conversion des labels texte en 0/1 ---
     if y.dtype == object:
@@ -74,25 +116,50 @@ def load_hdfs_matrix_and_labels(
         raise ValueError(f"[ERROR] Labels invalides : {df[label_col].unique()}")
 
     print(f"[INFO] Features: {len(feature_cols)}  —  Labels: {y.value_counts().to_dict()}")
+    if sample_weight is not None:
+        print(f"[INFO] {WEIGHT_COL} : {len(sample_weight)} lignes représentent {int(sample_weight.sum())} fenêtres")
 
-    # --- CHECK : affichage X + y ---
-    print("\n[CHECK] Aperçu X + y (5 premières lignes) :")
-    print(pd.concat([X, y], axis=1).head())
+    # --- CHECK : aperçu + corrélation features / label (leakage), désactivable ---
+    print_label_diagnostics(X, y, mode=diagnostics, sample_rows=diagnostics_sample_rows)
 
-    # --- CHECK : corrélation des features avec le label ---
-    print("\n[CHECK] Corrélation des features avec y :")
-    df_corr = pd.concat([X, y], axis=1).corr()[label_col].sort_values(ascending=False)
-    print(df_corr)
+    # --- Buffer partagé (memory-map) pour les entraînements multi-processus ---
+    if mmap_dir is not None:
+        prefix = os.path.splitext(os.path.basename(matrix_csv))[0]
+        X, y = share_features(X, y, mmap_dir, prefix=prefix)
 
-    # --- CHECK : features suspects (corrélation trop forte) ---
-    suspicious = df_corr[abs(df_corr) >= 0.7]  # seuil configurable
-    if len(suspicious) > 1:  # y corrélé à y → 1 élément à ignorer
-        print("\n[ALERT] Features avec corrélation > 0.8 (risque de leakage) :")
-        print(suspicious)
-    else:
-        print("\n[INFO] Aucune corrélation anormale détectée — dataset sain.")
+    return X, y, sample_weight
+
+
+def compress_duplicate_rows(
+    X: np.ndarray,
+    y: np.ndarray,
+    sample_weight: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Regroupe les lignes identiques (features + label) d'un TRAIN en lignes uniques avec
+    leur nombre d'occurrences, à passer en sample_weight au fit (les folds de test ne
+    sont jamais compressés).
+
+    Si sample_weight est fourni (ex : window_weight), chaque ligne unique reçoit la
+    somme des poids de ses occurrences au lieu de leur nombre.
 
-    return X, y
+    Retour
+    ------
+    X_unique, y_unique, counts (float64), dans l'ordre de première apparition.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+
+    # Une ligne = ses octets (features + label) : comparaison exacte en une passe de tri
+    rows = np.ascontiguousarray(np.column_stack([X, y.astype(X.dtype)]))
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+    if sample_weight is not None:
+        counts = np.bincount(inverse.ravel(), weights=np.asarray(sample_weight, dtype=np.float64), minlength=len(first))
+
+    order = np.argsort(first, kind="stable")
+    first, counts = first[order], counts[order]
+    return X[first], y[first], counts.astype(np.float64)
 
 
 # def split_60_20_20_chrono(
@@ -1,8 +1,16 @@
 from __future__ import annotations
-from typing import Dict, Iterable, Optional
+from typing import Dict, Optional
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+
+# Colonnes numériques qui ne sont pas des features (identifiant HDFS int64, label et nombre
+# de lignes en failure, poids des fenêtres vides BGL, bornes temporelles en µs epoch)
+PROTECTED_COLS = (
+    "BlockId", "Label", "failure_count", "window_weight",
+    "window_start", "window_end", "first_ts", "last_ts", "session_start", "session_end",
+)
 
 
 def _numeric_frame(df: pd.DataFrame) -> pd.DataFrame:
@@ -13,28 +21,96 @@ def _numeric_frame(df: pd.DataFrame) -> pd.DataFrame:
     return df.select_dtypes(include=[np.number]).copy()
 
 
-def _choose_feature_to_drop(
-    feat_a: str,
-    feat_b: str,
-    variances: pd.Series,
-    importances: Optional[Dict[str, float]] = None,
-) -> str:
-    """
-    Décide quelle feature supprimer entre feat_a et feat_b.
+# Écart au seuil en dessous duquel une paire est recalculée en float64 (arrondis float32)
+BORDERLINE_TOL = 1e-4
 
-    Règles :
-      - si des importances sont fournies : on garde la feature la plus importante
-      - sinon : on garde la feature avec la plus grande variance
-      → la feature RETOURNÉE est celle à SUPPRIMER.
-    """
-    if importances is not None:
-        imp_a = importances.get(feat_a, 0.0)
-        imp_b = importances.get(feat_b, 0.0)
-        return feat_a if imp_a < imp_b else feat_b
+# Densité en dessous de laquelle la matrice est traitée en creux (matrices de comptes)
+SPARSE_DENSITY = 0.1
 
-    var_a = variances.get(feat_a, 0.0)
-    var_b = variances.get(feat_b, 0.0)
-    return feat_a if var_a < var_b else feat_b
+# Taille maximale (en éléments) d'un bloc de la matrice de corrélation
+BLOCK_ELEMENTS = 1 << 24
+
+
+# Colonne k de la matrice en float64 (une colonne à la fois, jamais toute la matrice)
+def _column(numeric_df: pd.DataFrame, k: int) -> np.ndarray:
+    return numeric_df.iloc[:, k].to_numpy(dtype=np.float64)
+
+
+def _correlated_pairs(numeric_df: pd.DataFrame, corr_threshold: float):
+    """
+    Paires (i, j), i < j, de colonnes avec |corr| >= corr_threshold, sans construire la
+    matrice p×p ni de copie float64 de toute la matrice : moyennes / écarts-types colonne
+    par colonne, corrélation calculée par blocs de colonnes, seules les paires au-dessus
+    du seuil sont gardées.
+    - dense : données standardisées en float32, produit Z_blocᵀ Z / n ;
+    - creux (comptes, densité < SPARSE_DENSITY) : seules les valeurs non nulles sont
+      stockées, Xᵀ X creux, centrage appliqué après coup ;
+    - paires proches du seuil (|corr - seuil| < BORDERLINE_TOL) recalculées en float64
+      à partir de leurs deux colonnes uniquement.
+    Colonnes constantes : corrélation indéfinie (NaN pour pandas), jamais appariées.
+
+    Retour
+    ------
+    (rows, cols) : indices des paires, triés par colonne puis par ligne
+    (ordre de parcours de la matrice triangulaire supérieure).
+    """
+    n, p = numeric_df.shape
+
+    # Étape 1. Statistiques par colonne (float64, une colonne à la fois)
+    means, stds, nnz = np.empty(p), np.empty(p), np.empty(p, dtype=np.int64)
+    for k in range(p):
+        column = _column(numeric_df, k)
+        means[k], stds[k], nnz[k] = column.mean(), column.std(), np.count_nonzero(column)
+    constant = ~(stds > 0)
+    stds[constant] = 1.0
+
+    # Étape 2. Matrice de travail : float32 standardisée ou creuse (valeurs non nulles seules)
+    sparse = nnz.sum() < SPARSE_DENSITY * n * p
+    if sparse:
+        indptr = np.r_[0, np.cumsum(nnz)]
+        indices = np.empty(indptr[-1], dtype=np.int64)
+        data = np.empty(indptr[-1], dtype=np.float64)
+        for k in range(p):
+            column = _column(numeric_df, k)
+            rows_k = np.flatnonzero(column)
+            indices[indptr[k]:indptr[k + 1]], data[indptr[k]:indptr[k + 1]] = rows_k, column[rows_k]
+        X = sp.csc_matrix((data, indices, indptr), shape=(n, p))
+    else:
+        Z = np.zeros((n, p), dtype=np.float32)
+        for k in np.flatnonzero(~constant):
+            Z[:, k] = (_column(numeric_df, k) - means[k]) / stds[k]
+
+    block = max(1, BLOCK_ELEMENTS // max(p, 1))
+    rows, cols = [], []
+    for lo in range(0, p, block):
+        hi = min(lo + block, p)
+        # Étape 3. Bloc de corrélations (colonnes lo:hi contre les colonnes suivantes)
+        if sparse:
+            gram = np.asarray((X[:, lo:hi].T @ X[:, lo:]).todense(), dtype=np.float64)
+            corr = (gram / n - np.outer(means[lo:hi], means[lo:])) / np.outer(stds[lo:hi], stds[lo:])
+        else:
+            corr = Z[:, lo:hi].T @ Z[:, lo:] / n
+
+        # Étape 4. Paires i < j au-dessus du seuil (avec marge pour les arrondis)
+        i, j = np.nonzero(np.abs(corr) >= corr_threshold - BORDERLINE_TOL)
+        i, j = i + lo, j + lo
+        keep = (i < j) & ~constant[i] & ~constant[j]
+        i, j, r = i[keep], j[keep], np.abs(corr[i[keep] - lo, j[keep] - lo]).astype(np.float64)
+
+        # Étape 5. Paires proches du seuil : corrélation exacte en float64 (deux colonnes à la fois)
+        for k in np.flatnonzero(np.abs(r - corr_threshold) < BORDERLINE_TOL):
+            a = _column(numeric_df, i[k]) - means[i[k]]
+            b = _column(numeric_df, j[k]) - means[j[k]]
+            r[k] = abs((a * b).sum() / np.sqrt((a * a).sum() * (b * b).sum()))
+
+        above = r >= corr_threshold
+        rows.append(i[above])
+        cols.append(j[above])
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+    order = np.lexsort((rows, cols))
+    return rows[order], cols[order]
 
 
 def drop_correlated_features(
@@ -55,49 +131,60 @@ def drop_correlated_features(
     # Séparer numérique / non numérique
     numeric_df = _numeric_frame(df)
     non_numeric_df = df.drop(columns=numeric_df.columns, errors="ignore")
-    # --- Protection supplémentaire : retirer Label du numérique ---
-    if "Label" in numeric_df.columns:
-        numeric_df = numeric_df.drop(columns=["Label"])
+    # --- Protection supplémentaire : retirer Label (poids des fenêtres BGL, bornes temporelles) du numérique ---
+    protected_cols = [c for c in PROTECTED_COLS if c in numeric_df.columns]
+    numeric_df = numeric_df.drop(columns=protected_cols)
 
     if numeric_df.shape[1] <= 1:
         return numeric_df
 
-    corr_matrix = numeric_df.corr(method="pearson").abs()
     variances = numeric_df.var()
-
-    # Partie supérieure de la matrice de corrélation
-    mask_upper = np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
-    upper = corr_matrix.where(mask_upper)
+    columns = list(numeric_df.columns)
+
+    # Paires fortement corrélées (partie supérieure de la matrice, parcours colonne par colonne)
+    if numeric_df.isna().to_numpy().any():
+        # Valeurs manquantes : corrélation "pairwise complete" de pandas
+        corr_matrix = numeric_df.corr(method="pearson").abs().to_numpy()
+        pair_rows, pair_cols = np.nonzero(np.triu(corr_matrix >= corr_threshold, k=1))
+        order = np.lexsort((pair_rows, pair_cols))
+        pair_rows, pair_cols = pair_rows[order], pair_cols[order]
+    else:
+        pair_rows, pair_cols = _correlated_pairs(numeric_df, corr_threshold)
+
+    # Feature à supprimer dans chaque paire, pour toutes les paires à la fois : on garde la
+    # plus importante (importances fournies, 0 si absente) sinon la plus grande variance ;
+    # la ligne est supprimée si son score est strictement plus faible, la colonne sinon
+    if feature_importances is not None:
+        scores = np.array([feature_importances.get(c, 0.0) for c in columns], dtype=float)
+    else:
+        scores = variances.reindex(columns).to_numpy(dtype=float)
+    drop_row = scores[pair_rows] < scores[pair_cols]
 
     to_drop: set[str] = set()
+    dropped = np.zeros(len(columns), dtype=bool)
 
     print(f"\n=== [CORR] Début filtrage corrélation (seuil = {corr_threshold}) ===")
     initial_cols = list(numeric_df.columns)
 
-    for col in upper.columns:
-        # lignes fortement corrélées à `col`
-        high_corr_rows: Iterable[str] = upper.index[upper[col] >= corr_threshold]
-        for row in high_corr_rows:
-            if row in to_drop or col in to_drop:
-                continue
-
-            drop_feat = _choose_feature_to_drop(
-                feat_a=row,
-                feat_b=col,
-                variances=variances,
-                importances=feature_importances,
-            )
-            to_drop.add(drop_feat)
-            print(f"[CORR] Suppression: '{drop_feat}' (corrélation élevée avec '{col}' et '{row}')")
+    # Parcours glouton des paires (même ordre que la boucle colonne / lignes d'origine)
+    for row, col, row_loses in zip(pair_rows.tolist(), pair_cols.tolist(), drop_row.tolist()):
+        if dropped[row] or dropped[col]:
+            continue
+
+        drop_idx = row if row_loses else col
+        dropped[drop_idx] = True
+        to_drop.add(columns[drop_idx])
+        print(f"[CORR] Suppression: '{columns[drop_idx]}' (corrélation élevée avec '{columns[col]}' et '{columns[row]}')")
 
     print(f"[CORR] Total supprimées: {len(to_drop)} / {len(initial_cols)}")
     print("==========================================")
 
     numeric_reduced = numeric_df.drop(columns=list(to_drop), errors="ignore")
 
-    # Remettre Label dans les colonnes non numériques pour conservation finale
-    if "Label" in df.columns and "Label" not in non_numeric_df.columns:
-        non_numeric_df["Label"] = df["Label"]
+    # Remettre Label / window_weight / bornes temporelles dans les colonnes non numériques pour conservation finale
+    for col in PROTECTED_COLS:
+        if col in df.columns and col not in non_numeric_df.columns:
+            non_numeric_df[col] = df[col]
 
     # Réattacher les colonnes non numériques (BlockId etc.)
     df_final = numeric_reduced
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import pandas as pd
 import numpy as np
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from numpy.linalg import LinAlgError
+
+# Colonnes numériques qui ne sont pas des features (identifiant HDFS int64, label et nombre
+# de lignes en failure, poids des fenêtres vides BGL, bornes temporelles en µs epoch)
+PROTECTED_COLS = (
+    "BlockId", "Label", "failure_count", "window_weight",
+    "window_start", "window_end", "first_ts", "last_ts", "session_start", "session_end",
+)
 
 
 def _numeric_frame(df: pd.DataFrame) -> pd.DataFrame:
@@ -14,64 +19,98 @@ def _numeric_frame(df: pd.DataFrame) -> pd.DataFrame:
     return df.select_dtypes(include=[np.number]).copy()
 
 
-# def _compute_vif_series(numeric_features: pd.DataFrame) -> pd.Series:
-#     """
-#     Calcule le VIF pour chaque colonne numérique.
-#     """
-#     if numeric_features.shape[1] == 0:
-#         return pd.Series(dtype=float)
-#
-#     values = numeric_features.values
-#     vifs = [
-#         variance_inflation_factor(values, i)
-#         for i in range(values.shape[1])
-#     ]
-#     return pd.Series(vifs, index=numeric_features.columns, name="VIF")
-
+# VIF bornés comme statsmodels (R² plafonné à 1 - 1e-15) : colinéarité exacte → ~1e15
+VIF_MAX = 1.0 / (1.0 - (1.0 - 1e-15))
 
+# Valeur propre relative en dessous de laquelle la matrice de corrélation est singulière
+SINGULAR_TOL = 1e-12
 
+# Au-delà de ce VIF, l'inverse est recalculé au lieu d'être mis à jour (erreurs d'arrondi)
+DOWNDATE_MAX_VIF = 1e8
 
 
-def _compute_vif_series(X: pd.DataFrame) -> pd.Series:
+def _standardized_correlation(X: pd.DataFrame) -> np.ndarray:
     """
-    Calcule le VIF pour chaque colonne de X en étant robuste :
-    - supprime les colonnes constantes avant le calcul
-    - en cas de problème numérique (SVD non convergente), renvoie VIF = inf
+    Matrice de corrélation (Pearson) des colonnes de X, calculée sur les données
+    standardisées (moyenne 0, écart-type 1) comme variance_inflation_factor de statsmodels.
     """
-    if X.shape[1] == 0:
-        return pd.Series(dtype=float)
+    values = np.asarray(X.values, dtype=float)
+    values = (values - values.mean(axis=0)) / values.std(axis=0)
+    return values.T @ values / len(values)
 
-    # 1) Supprimer les colonnes constantes (variance = 0)
-    variances = X.var(axis=0)
-    non_constant_cols = variances[variances > 0].index.tolist()
-    X_nc = X[non_constant_cols]
 
-    if X_nc.shape[1] == 0:
-        # Toutes les colonnes étaient constantes
-        return pd.Series(
-            data=[],
-            index=[],
-            dtype=float,
-            name="VIF"
-        )
+def _inverse_correlation(corr: np.ndarray):
+    """
+    Inverse de la matrice de corrélation par décomposition spectrale.
 
-    values = np.asarray(X_nc.values, dtype=float)
+    Retour
+    ------
+    (inverse, None) si la matrice est inversible ;
+    (None, colonnes_colinéaires) sinon : colonnes qui participent au noyau
+    (colinéarité exacte, VIF = VIF_MAX).
+    """
+    eigvals, eigvecs = np.linalg.eigh(corr)
+    null = eigvals <= SINGULAR_TOL * max(eigvals[-1], 1.0)
+    if not null.any():
+        return (eigvecs / eigvals) @ eigvecs.T, None
 
-    vifs = []
-    for i in range(values.shape[1]):
-        try:
-            vif_val = variance_inflation_factor(values, i)
-        except LinAlgError:
-            # SVD non convergente -> multicolinéarité extrême -> on marque VIF = inf
-            vif_val = float("inf")
-        except Exception:
-            # Par sécurité, toute autre erreur -> on marque VIF = inf
-            vif_val = float("inf")
+    null_weight = np.sqrt((eigvecs[:, null] ** 2).sum(axis=1))
+    return None, np.flatnonzero(null_weight > 1e-6)
 
-        vifs.append(vif_val)
 
-    vif_series = pd.Series(vifs, index=X_nc.columns, name="VIF")
-    return vif_series
+def _vif_elimination(X: pd.DataFrame, vif_threshold: float):
+    """
+    Élimination récursive (une colonne par tour, VIF max d'abord, 1ère en cas d'égalité)
+    sans réajuster de régression : l'inverse de la matrice de corrélation est mis à jour
+    à chaque suppression (complément de Schur, mise à jour de rang un, O(p²)) :
+        R⁻¹ sans k = A[-k, -k] - A[-k, k] A[k, -k] / A[k, k]
+    Matrice singulière : on retire d'abord les colonnes exactement colinéaires.
+
+    Retour
+    ------
+    Liste des (colonne supprimée, VIF au moment de la suppression), dans l'ordre.
+    """
+    variances = X.var(axis=0)
+    columns = np.asarray(variances[variances > 0].index, dtype=object)
+    n_constant = X.shape[1] - len(columns)
+    dropped = []
+    if len(columns) == 0:
+        return dropped
+
+    corr = _standardized_correlation(X[list(columns)])
+    active = np.arange(len(columns))
+    inverse, collinear = _inverse_correlation(corr) if len(active) > 1 else (np.ones((1, 1)), None)
+
+    # Même condition d'arrêt que la boucle d'origine : plus d'une colonne restante
+    while len(active) + n_constant > 1:
+        # Étape 1. VIF de toutes les colonnes actives (diagonale de l'inverse)
+        if inverse is None:
+            vifs = np.ones(len(active))
+            vifs[collinear] = VIF_MAX
+        else:
+            vifs = np.clip(np.diag(inverse), 1.0, VIF_MAX)
+
+        k = int(np.argmax(vifs))
+        if vifs[k] < vif_threshold:
+            break
+        dropped.append((columns[active[k]], float(vifs[k])))
+
+        # Étape 2. Inverse sans la colonne k : mise à jour de rang un, ou recalcul
+        #          (matrice singulière ou VIF très élevé → arrondis)
+        keep = np.arange(len(active)) != k
+        if inverse is not None and vifs[k] < DOWNDATE_MAX_VIF:
+            a = inverse[keep, k]
+            inverse = inverse[np.ix_(keep, keep)] - np.outer(a, a) / inverse[k, k]
+        elif keep.sum() > 1:
+            inverse, collinear = _inverse_correlation(corr[np.ix_(active[keep], active[keep])])
+        else:
+            inverse, collinear = np.ones((keep.sum(), keep.sum())), None
+        active = active[keep]
+
+        if len(active) == 0:
+            break
+
+    return dropped
 
 
 def drop_high_vif_features(
@@ -87,9 +126,9 @@ def drop_high_vif_features(
     # Séparer numérique / non numérique
     numeric_df = _numeric_frame(df)
     non_numeric_df = df.drop(columns=numeric_df.columns, errors="ignore")
-    # --- Protection supplémentaire : retirer Label du numérique ---
-    if "Label" in numeric_df.columns:
-        numeric_df = numeric_df.drop(columns=["Label"])
+    # --- Protection supplémentaire : retirer Label (poids des fenêtres BGL, bornes temporelles) du numérique ---
+    protected_cols = [c for c in PROTECTED_COLS if c in numeric_df.columns]
+    numeric_df = numeric_df.drop(columns=protected_cols)
 
     # Rien à filtrer
     if numeric_df.shape[1] <= 1:
@@ -99,32 +138,23 @@ def drop_high_vif_features(
     print(f"\n=== [VIF] Début filtrage VIF (seuil = {vif_threshold}) ===")
 
     initial_cols = list(numeric_df.columns)
-    removed = 0
-
-    # Copie de travail :
-    working_df = numeric_df.copy()
-
-    # Boucle récursive
-    while working_df.shape[1] > 1:
-        vif_values = _compute_vif_series(working_df)
-        max_vif = vif_values.max()
-
-        if max_vif < vif_threshold:
-            break
 
-        to_drop = vif_values.idxmax()
-        removed += 1
-        print(f"[VIF] Suppression: '{to_drop}' (VIF = {max_vif:.2f})")
+    # Élimination sur l'inverse de la matrice de corrélation (une décomposition, puis mises à jour)
+    dropped = _vif_elimination(numeric_df, vif_threshold)
+    for col, vif in dropped:
+        print(f"[VIF] Suppression: '{col}' (VIF = {vif:.2f})")
+    removed = len(dropped)
 
-        working_df = working_df.drop(columns=[to_drop])
+    working_df = numeric_df.drop(columns=[col for col, _ in dropped])
 
     print(f"[VIF] Total supprimées: {removed} / {len(initial_cols)}")
     print("==========================================")
 
     numeric_reduced = working_df
-    # Remettre Label dans les colonnes non numériques pour conservation finale
-    if "Label" in df.columns and "Label" not in non_numeric_df.columns:
-        non_numeric_df["Label"] = df["Label"]
+    # Remettre Label / window_weight / bornes temporelles dans les colonnes non numériques pour conservation finale
+    for col in PROTECTED_COLS:
+        if col in df.columns and col not in non_numeric_df.columns:
+            non_numeric_df[col] = df[col]
 
     # Réattacher les colonnes non numériques
     df_final = pd.concat([non_numeric_df, numeric_reduced], axis=1)
@@ -0,0 +1,161 @@
+"""
+fold_model_cache.py
+-------------------
+Cache des modèles entraînés par fold de TimeSeries CV.
+
+Les entraîneurs (RandomForest, LogisticRegression) y déposent leurs modèles par fold ;
+la permutation importance les réutilise directement au lieu de ré-entraîner les mêmes
+modèles sur les mêmes folds.
+
+Le cache est gardé en mémoire et, si cache_dir est fourni, persisté sur disque :
+
+    <cache_dir>/<nom du modèle>/meta.json        signature + bornes + métriques
+    <cache_dir>/<nom du modèle>/fold_<k>.joblib  modèle entraîné du fold k
+
+Une entrée n'est réutilisée que si sa signature correspond aux données courantes
+(nombre de lignes, colonnes, empreinte de X, y et des poids, n_splits, class_weight).
+
+Classes / fonctions :
+- FoldModel      : Modèle entraîné d'un fold (bornes, modèle, métriques).
+- fold_signature : Signature des données et de la configuration d'entraînement.
+- FoldModelCache : Stockage en mémoire + persistance optionnelle.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class FoldModel:
+    fold: int                   # numéro du fold (à partir de 1)
+    train_end: int              # train = [0, train_end)
+    test_end: int               # test  = [train_end, test_end)
+    model: Any                  # estimateur scikit-learn entraîné sur le train du fold
+    metrics: Dict[str, Any]     # métriques sur le test du fold
+
+
+def fold_signature(
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_splits: int,
+    class_weight: Optional[str],
+    config: Optional[Dict[str, Any]] = None,
+    sample_weight: Optional[pd.Series] = None,
+) -> Dict[str, Any]:
+    """
+    Signature des données (taille, colonnes, empreinte des valeurs et des poids des
+    lignes) et de la configuration d'entraînement (config : paramètres propres au mode
+    d'entraînement, valeurs JSON). Deux signatures égales → les modèles du cache sont
+    réutilisables.
+    """
+    # Empreinte sensible à l'ordre des lignes (les folds dépendent de l'ordre chronologique),
+    # colonne par colonne : ni copie concaténée de X, ni hachage ligne à ligne
+    columns = [X[c] for c in X.columns] + [y] + ([] if sample_weight is None else [sample_weight])
+    digest = hashlib.sha1()
+    for column in columns:
+        digest.update(pd.util.hash_array(np.asarray(column)).tobytes())
+    return {
+        "n_samples": int(len(X)),
+        "columns": [str(c) for c in X.columns],
+        "fingerprint": digest.hexdigest(),
+        "n_splits": int(n_splits),
+        "class_weight": class_weight,
+        "config": config or {},
+    }
+
+
+class FoldModelCache:
+    """
+    Modèles par fold, indexés par nom de modèle ("random_forest", "logistic_regression").
+
+    Paramètres
+    ----------
+    cache_dir : str | None
+        Dossier de persistance (None = cache en mémoire uniquement).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self._entries: Dict[str, List[FoldModel]] = {}
+        self._signatures: Dict[str, Dict[str, Any]] = {}
+
+    def put(self, name: str, signature: Dict[str, Any], fold_models: List[FoldModel]) -> None:
+        """
+        Enregistre les modèles d'un entraînement (et les écrit sur disque si cache_dir).
+        """
+        self._entries[name] = fold_models
+        self._signatures[name] = signature
+        if self.cache_dir is not None:
+            self._save(name)
+
+    def get(self, name: str, signature: Dict[str, Any]) -> Optional[List[FoldModel]]:
+        """
+        Modèles par fold pour cette signature (mémoire, puis disque), None sinon.
+        """
+        if self._signatures.get(name) != signature and self.cache_dir is not None:
+            self._load(name, signature)
+        if name in self._entries and self._signatures[name] == signature:
+            return self._entries[name]
+        return None
+
+    # -----------------------------------------------------
+    # Persistance
+    # -----------------------------------------------------
+    def _model_dir(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _save(self, name: str) -> None:
+        model_dir = self._model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        # meta.json supprimé puis réécrit en dernier : un cache sans meta.json est ignoré
+        meta_path = os.path.join(model_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        folds = []
+        for fm in self._entries[name]:
+            joblib.dump(fm.model, os.path.join(model_dir, f"fold_{fm.fold}.joblib"))
+            folds.append({
+                "fold": fm.fold,
+                "train_end": fm.train_end,
+                "test_end": fm.test_end,
+                "metrics": {k: (None if v is None else float(v)) for k, v in fm.metrics.items()},
+            })
+
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"signature": self._signatures[name], "folds": folds}, f)
+        print(f"[INFO] Modèles par fold sauvegardés : {model_dir}")
+
+    def _load(self, name: str, signature: Dict[str, Any]) -> None:
+        meta_path = os.path.join(self._model_dir(name), "meta.json")
+        if not os.path.exists(meta_path):
+            return
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["signature"] != signature:
+            return
+
+        fold_models = []
+        for fold in meta["folds"]:
+            model_path = os.path.join(self._model_dir(name), f"fold_{fold['fold']}.joblib")
+            if not os.path.exists(model_path):
+                print(f"[WARN] Cache incomplet ({model_path} absent), ré-entraînement.")
+                return
+            fold_models.append(FoldModel(
+                fold=fold["fold"],
+                train_end=fold["train_end"],
+                test_end=fold["test_end"],
+                model=joblib.load(model_path),
+                metrics=fold["metrics"],
+            ))
+
+        self._entries[name] = fold_models
+        self._signatures[name] = meta["signature"]
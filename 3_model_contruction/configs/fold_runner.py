@@ -0,0 +1,173 @@
+"""
+fold_runner.py
+--------------
+Exécution des folds de TimeSeries Cross-Validation en parallèle, sans copier X par fold.
+
+Les splits de TimeSeriesSplit sont des préfixes contigus : train = X[:train_end],
+test = X[train_end:test_end]. X est donc gardé dans UN tableau contigu et chaque fold
+reçoit des vues (slices), pas des copies (X.iloc[train_idx] copiait toute la matrice).
+
+Parallélisme :
+- les folds tournent dans un pool de processus ; X et y sont écrits une seule fois
+  en .npy (ou déjà partagés, voir shared_matrix.py) et ouverts en memory-map par
+  chaque worker (pas de sérialisation de X) ;
+- budget total de cœurs partagé : n_workers folds en parallèle × n_jobs du modèle
+  (RandomForest) <= n_jobs total.
+
+Fonctions :
+- time_series_fold_bounds : Bornes (train_end, test_end) de chaque fold.
+- split_core_budget       : Répartition des cœurs entre folds et modèle.
+- run_timeseries_folds    : Exécution des folds (séquentielle ou pool de processus).
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+from configs.shared_matrix import memmap_path, shared_values
+
+
+@dataclass(frozen=True)
+class FoldBounds:
+    fold: int           # numéro du fold (à partir de 1)
+    train_end: int      # train = [0, train_end)
+    test_end: int       # test  = [train_end, test_end)
+
+
+# fit_eval(X_train, y_train, X_test, y_test, n_jobs) → résultat du fold (métriques, modèle...)
+# (+ sample_weight=poids du train en mot-clé, si run_timeseries_folds reçoit des poids)
+FoldFunction = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int], Any]
+
+
+def time_series_fold_bounds(n_samples: int, n_splits: int) -> List[FoldBounds]:
+    """
+    Bornes des folds de TimeSeriesSplit(n_splits) (mêmes indices que tscv.split(X)).
+    """
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+    bounds = []
+    for fold, (train_idx, test_idx) in enumerate(tscv.split(np.empty((n_samples, 1))), start=1):
+        train_end, test_end = len(train_idx), int(test_idx[-1]) + 1
+        if train_idx[-1] != train_end - 1 or test_idx[0] != train_end or len(test_idx) != test_end - train_end:
+            raise ValueError("TimeSeriesSplit ne produit pas des segments contigus.")
+        bounds.append(FoldBounds(fold=fold, train_end=train_end, test_end=test_end))
+    return bounds
+
+
+def split_core_budget(n_folds: int, n_jobs: int = -1, max_workers: Optional[int] = None) -> Tuple[int, int]:
+    """
+    (nombre de folds en parallèle, n_jobs de chaque modèle) pour un budget de n_jobs cœurs
+    (-1 = tous les cœurs).
+    """
+    total = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else max(1, n_jobs)
+    workers = max(1, min(n_folds, total, max_workers or n_folds))
+    return workers, max(1, total // workers)
+
+
+# Tableaux ouverts en memory-map par chaque worker (une seule ouverture par processus)
+_ATTACHED = {}
+
+
+def _attach(path: str) -> np.ndarray:
+    if path not in _ATTACHED:
+        _ATTACHED[path] = np.load(path, mmap_mode="r")
+    return _ATTACHED[path]
+
+
+def _run_fold(fit_eval: FoldFunction, bounds: FoldBounds, model_n_jobs: int, X, y, w=None) -> Tuple[int, Any]:
+    # X / y / w : tableaux, ou chemins .npy à ouvrir en memory-map (workers)
+    if isinstance(X, str):
+        X, y = _attach(X), _attach(y)
+    if isinstance(w, str):
+        w = _attach(w)
+
+    # Poids passés uniquement s'ils existent : les fit_eval sans sample_weight restent valides
+    weight_kwargs = {} if w is None else {"sample_weight": w[:bounds.train_end]}
+    result = fit_eval(
+        X[:bounds.train_end],
+        y[:bounds.train_end],
+        X[bounds.train_end:bounds.test_end],
+        y[bounds.train_end:bounds.test_end],
+        model_n_jobs,
+        **weight_kwargs,
+    )
+    return bounds.fold, result
+
+
+def run_timeseries_folds(
+    fit_eval: FoldFunction,
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_splits: int = 5,
+    n_jobs: int = -1,
+    max_workers: Optional[int] = None,
+    dtype=np.float64,
+    mmap_dir: Optional[str] = None,
+    sample_weight: Optional[pd.Series] = None,
+) -> List[Tuple[int, Any]]:
+    """
+    Exécute fit_eval sur chaque fold de TimeSeries CV.
+
+    Paramètres
+    ----------
+    fit_eval : callable
+        Fonction de niveau module (sérialisable) :
+            fit_eval(X_train, y_train, X_test, y_test, n_jobs) -> résultat
+    n_jobs : int
+        Budget total de cœurs (-1 = tous), partagé entre folds et modèle.
+    max_workers : int | None
+        Nombre maximal de folds en parallèle (1 = séquentiel, dans le processus courant).
+    dtype :
+        Type de X dans le tableau partagé (float32 pour RandomForest : c'est le type
+        utilisé en interne par sklearn, aucune conversion par fold). Ignoré si X est
+        déjà partagé en memory-map (configs/shared_matrix.py) : ce buffer est utilisé.
+    mmap_dir : str | None
+        Dossier des fichiers .npy temporaires (défaut : dossier temporaire du système).
+    sample_weight : pd.Series | None
+        Poids des lignes (ex : window_weight), tranchés comme y et passés au fit_eval
+        en sample_weight=<poids du train> ; None = fit_eval appelé sans poids.
+
+    Retour
+    ------
+    Liste des (numéro de fold, résultat), dans l'ordre des folds.
+    """
+    folds = time_series_fold_bounds(len(X), n_splits)
+    workers, model_n_jobs = split_core_budget(len(folds), n_jobs, max_workers)
+
+    # Un seul tableau contigu ; les folds en sont des vues. X / y déjà partagés en
+    # memory-map (load_hdfs_matrix_and_labels(mmap_dir=...)) : utilisés tels quels
+    X_values, y_values = shared_values(X), shared_values(y)
+    if X_values is None:
+        X_values = np.ascontiguousarray(X.to_numpy(dtype=dtype))
+    if y_values is None:
+        y_values = np.ascontiguousarray(np.asarray(y))
+    w_values = None if sample_weight is None else np.ascontiguousarray(np.asarray(sample_weight, dtype=np.float64))
+
+    print(f"[INFO] Folds : {len(folds)} — en parallèle : {workers} — n_jobs par modèle : {model_n_jobs}")
+
+    if workers == 1:
+        return [_run_fold(fit_eval, bounds, model_n_jobs, X_values, y_values, w_values) for bounds in folds]
+
+    with tempfile.TemporaryDirectory(dir=mmap_dir) as tmp_dir:
+        # Workers attachés aux fichiers partagés ; sinon écriture unique dans tmp_dir
+        x_path, y_path = memmap_path(X_values), memmap_path(y_values)
+        if x_path is None:
+            x_path = os.path.join(tmp_dir, "X.npy")
+            np.save(x_path, X_values)
+        if y_path is None:
+            y_path = os.path.join(tmp_dir, "y.npy")
+            np.save(y_path, y_values)
+        w_path = None
+        if w_values is not None:
+            w_path = os.path.join(tmp_dir, "w.npy")
+            np.save(w_path, w_values)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_fold, fit_eval, bounds, model_n_jobs, x_path, y_path, w_path) for bounds in folds]
+            results = [future.result() for future in futures]
+
+    return sorted(results, key=lambda item: item[0])
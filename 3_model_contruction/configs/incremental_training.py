@@ -0,0 +1,220 @@
+"""
+incremental_training.py
+-----------------------
+Entraînement incrémental sur les folds croissants de TimeSeriesSplit.
+
+Le train du fold k+1 contient celui du fold k : au lieu de ré-entraîner de zéro,
+le modèle du fold k est prolongé avec les nouvelles données.
+
+- RandomForest : warm_start. Le premier fold entraîne n_estimators arbres, chaque fold
+  suivant ajoute warm_start_trees arbres entraînés sur TOUT le train du fold (pas
+  seulement les nouvelles lignes) : seul le nombre d'arbres est incrémental, le gain
+  vient des arbres déjà entraînés, conservés (copie superficielle de la liste par fold).
+- Régression logistique : SGDClassifier(loss="log_loss") + partial_fit, sur les seules
+  nouvelles lignes de chaque fold (sgd_epochs passes), après un StandardScaler mis à jour
+  en ligne (partial_fit). Le modèle d'un fold = Pipeline(scaler, sgd) figé à ce fold.
+
+Pondération des classes ("balanced") : n / (2 · n_c) recalculé à chaque fold sur les
+comptes CUMULÉS de tout le train vu jusque-là (et non sur le seul lot de nouvelles
+lignes), passé explicitement (dict pour la forêt, sample_weight pour SGD). Avec des
+poids de lignes (window_weight), les comptes sont des sommes de poids et les poids
+sont aussi passés au fit.
+
+Fonctions :
+- balanced_weights                : Poids "balanced" à partir des comptes de classes.
+- train_incremental_random_forest : Folds RandomForest en warm_start.
+- train_incremental_sgd_logistic  : Folds régression logistique SGD en partial_fit.
+- print_cold_start_comparison     : Temps et écarts de métriques vs entraînement à froid.
+- timed                           : Résultat et durée d'un entraînement.
+"""
+import copy
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from configs.fold_model_cache import FoldModel
+from configs.fold_runner import split_core_budget, time_series_fold_bounds
+from configs.metrics_utils import compute_binary_classification_metrics
+from configs.shared_matrix import shared_values
+
+
+CLASSES = np.array([0, 1])
+
+
+def balanced_weights(class_counts: np.ndarray) -> Dict[int, float]:
+    """
+    Poids "balanced" de sklearn (n / (n_classes · n_c)) ; 1.0 pour une classe absente.
+    """
+    n = class_counts.sum()
+    weights = np.where(class_counts > 0, n / (len(class_counts) * np.maximum(class_counts, 1)), 1.0)
+    return {int(c): float(w) for c, w in zip(CLASSES, weights)}
+
+
+def _as_array(data, dtype) -> np.ndarray:
+    # Buffer partagé (memory-map) utilisé tel quel, sinon une seule conversion contiguë
+    values = shared_values(data)
+    return values if values is not None else np.ascontiguousarray(data.to_numpy(dtype=dtype))
+
+
+def _evaluate(model, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, float]:
+    # IMPORTANT : test jamais rebalancé → distribution réelle conservée
+    return compute_binary_classification_metrics(
+        y_true=y_test,
+        y_pred=model.predict(X_test),
+        y_proba=model.predict_proba(X_test)[:, 1],
+    )
+
+
+def train_incremental_random_forest(
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_splits: int = 5,
+    n_jobs: int = -1,
+    class_weight: Optional[str] = "balanced",
+    n_estimators: int = 200,
+    warm_start_trees: int = 50,
+    sample_weight: Optional[pd.Series] = None,
+) -> List[FoldModel]:
+    """
+    RandomForest en warm_start sur les folds croissants : n_estimators arbres au premier
+    fold, puis warm_start_trees arbres de plus par fold. Les nouveaux arbres voient tout
+    le train du fold (lignes des folds précédents comprises), pas seulement les lignes
+    ajoutées : seul le nombre d'arbres à entraîner est incrémental.
+    """
+    X_values, y_values = _as_array(X, np.float32), np.asarray(y)
+    w_values = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    _, model_n_jobs = split_core_budget(1, n_jobs)
+
+    rf = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=None,
+        n_jobs=model_n_jobs,
+        random_state=42,
+        warm_start=True,
+        # Bootstrap pondéré (sum(sample_weight) tirages) quand des lignes regroupent des fenêtres
+        max_samples=None if w_values is None else 1.0,
+    )
+
+    fold_models = []
+    for bounds in time_series_fold_bounds(len(X_values), n_splits):
+        X_train, y_train = X_values[:bounds.train_end], y_values[:bounds.train_end]
+        w_train = None if w_values is None else w_values[:bounds.train_end]
+
+        # Poids des classes sur tout le train du fold (= cumul des données vues)
+        weights = balanced_weights(np.bincount(y_train, weights=w_train, minlength=2)) if class_weight == "balanced" else None
+        if bounds.fold > 1:
+            rf.set_params(n_estimators=rf.n_estimators + warm_start_trees)
+        rf.set_params(class_weight=weights)
+        rf.fit(X_train, y_train, sample_weight=w_train)
+
+        # Modèle figé à ce fold : les fits suivants ajoutent des arbres à une nouvelle liste
+        model = copy.copy(rf)
+        model.estimators_ = list(rf.estimators_)
+
+        metrics = _evaluate(model, X_values[bounds.train_end:bounds.test_end], y_values[bounds.train_end:bounds.test_end])
+        fold_models.append(FoldModel(bounds.fold, bounds.train_end, bounds.test_end, model, metrics))
+
+    return fold_models
+
+
+def train_incremental_sgd_logistic(
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_splits: int = 5,
+    class_weight: Optional[str] = "balanced",
+    sgd_epochs: int = 5,
+    random_state: int = 42,
+    sample_weight: Optional[pd.Series] = None,
+) -> List[FoldModel]:
+    """
+    Régression logistique SGD (log_loss) continuée d'un fold à l'autre par partial_fit
+    sur les nouvelles lignes du train, avec standardisation mise à jour en ligne.
+    """
+    X_values, y_values = _as_array(X, np.float64), np.asarray(y)
+    w_values = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    rng = np.random.RandomState(random_state)
+
+    scaler = StandardScaler()
+    # alpha plus fort que le défaut et moyenne des poids : au plus près de liblinear (C=1)
+    sgd = SGDClassifier(loss="log_loss", alpha=1e-3, average=True, random_state=random_state)
+    class_counts = np.zeros(len(CLASSES), dtype=np.float64)
+
+    fold_models = []
+    seen = 0
+    for bounds in time_series_fold_bounds(len(X_values), n_splits):
+        # Nouvelles lignes du train depuis le fold précédent
+        X_new = np.asarray(X_values[seen:bounds.train_end], dtype=np.float64)
+        y_new = y_values[seen:bounds.train_end]
+        w_new = None if w_values is None else w_values[seen:bounds.train_end]
+        seen = bounds.train_end
+
+        scaler.partial_fit(X_new, sample_weight=w_new)
+        X_new = scaler.transform(X_new)
+
+        # Poids des classes à partir des comptes cumulés (tout le train vu jusqu'ici)
+        class_counts += np.bincount(y_new, weights=w_new, minlength=len(CLASSES))
+        if class_weight == "balanced":
+            weights = balanced_weights(class_counts)
+            fit_weight = np.where(y_new == 1, weights[1], weights[0])
+            if w_new is not None:
+                fit_weight = fit_weight * w_new
+        else:
+            fit_weight = w_new
+
+        for _ in range(sgd_epochs):
+            order = rng.permutation(len(X_new))
+            sgd.partial_fit(
+                X_new[order],
+                y_new[order],
+                classes=CLASSES,
+                sample_weight=None if fit_weight is None else fit_weight[order],
+            )
+
+        # Modèle figé à ce fold (scaler + SGD)
+        model = Pipeline([("scaler", copy.deepcopy(scaler)), ("sgd", copy.deepcopy(sgd))])
+
+        metrics = _evaluate(model, X_values[bounds.train_end:bounds.test_end], y_values[bounds.train_end:bounds.test_end])
+        fold_models.append(FoldModel(bounds.fold, bounds.train_end, bounds.test_end, model, metrics))
+
+    return fold_models
+
+
+def print_cold_start_comparison(
+    title: str,
+    incremental: List[FoldModel],
+    incremental_seconds: float,
+    cold: List[FoldModel],
+    cold_seconds: float,
+) -> pd.DataFrame:
+    """
+    Affiche le gain de temps et les écarts de métriques (incrémental - à froid) par fold.
+    """
+    rows = []
+    for inc, ref in zip(incremental, cold):
+        row = {"fold": inc.fold}
+        for name, value in inc.metrics.items():
+            row[f"{name}_delta"] = value - ref.metrics.get(name, np.nan)
+        rows.append(row)
+    df_delta = pd.DataFrame(rows).set_index("fold")
+
+    gain = 1 - incremental_seconds / cold_seconds if cold_seconds > 0 else 0.0
+    print(f"\n=== {title} — incrémental vs entraînement à froid ===")
+    print(f"[INFO] Temps : incrémental {incremental_seconds:.2f}s | à froid {cold_seconds:.2f}s | gain {gain * 100:.1f}%")
+    print("[INFO] Écarts de métriques par fold (incrémental - à froid) :")
+    print(df_delta.round(4))
+    return df_delta
+
+
+def timed(train, *args, **kwargs):
+    """
+    (résultat de train(*args, **kwargs), durée en secondes).
+    """
+    start = time.perf_counter()
+    result = train(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,151 @@
+"""
+label_diagnostics.py
+--------------------
+Diagnostics de fuite du label au chargement : aperçu X + y et corrélation features / label.
+
+Au lieu de pd.concat([X, y]).corr() (matrice (p+1)² complète pour n'en lire qu'une
+colonne), la corrélation de Pearson de chaque feature avec y est calculée en une passe :
+  r_j = x_j · (y - ȳ) / sqrt((Σx_j² - (Σx_j)² / n) · Σ(y - ȳ)²)
+- matrice dense : produits matrice-vecteur par blocs de lignes (float64, sans copie
+  complète de X) ;
+- matrice creuse (scipy.sparse ou colonnes pd.SparseDtype) : mêmes sommes calculées
+  sur les seules valeurs non nulles (X.T @ y), sans densifier.
+Les colonnes constantes ont une corrélation NaN (comme DataFrame.corr()).
+
+Modes (DIAGNOSTIC_MODES) :
+- "full"   : toutes les lignes ;
+- "sample" : échantillon aléatoire de sample_rows lignes (reproductible) ;
+- "off"    : aucun diagnostic (ni aperçu ni corrélation), pour les exécutions en production.
+
+Fonctions :
+- feature_label_correlation : Corrélation de Pearson de chaque feature avec y.
+- print_label_diagnostics   : Aperçu X + y et alerte sur les features suspectes.
+"""
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+DIAGNOSTIC_MODES = ("full", "sample", "off")
+
+# Lignes par bloc pour le calcul dense (copie float64 limitée à un bloc)
+CHUNK_ROWS = 65536
+
+# |corr| à partir de laquelle une feature est signalée (risque de leakage)
+LEAKAGE_THRESHOLD = 0.7
+
+
+def _is_sparse_frame(X) -> bool:
+    return isinstance(X, pd.DataFrame) and len(X.columns) > 0 and all(
+        isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes
+    )
+
+
+def feature_label_correlation(X, y) -> pd.Series:
+    """
+    Corrélation de Pearson de chaque colonne de X avec y (X dense, creux ou DataFrame).
+
+    Retour
+    ------
+    pd.Series indexée par les colonnes de X (NaN pour une colonne constante).
+    """
+    columns = X.columns if isinstance(X, pd.DataFrame) else pd.RangeIndex(X.shape[1])
+    y_centered = np.asarray(y, dtype=np.float64)
+    n = len(y_centered)
+    if n != X.shape[0]:
+        raise ValueError(f"X et y n'ont pas le même nombre de lignes : {X.shape[0]} vs {n}.")
+    y_centered = y_centered - y_centered.mean()
+
+    # Sommes Σx, Σx² et x·(y - ȳ) par colonne
+    if sp.issparse(X) or _is_sparse_frame(X):
+        X_sparse = sp.csc_matrix(X.sparse.to_coo() if isinstance(X, pd.DataFrame) else X, dtype=np.float64)
+        sum_x = np.asarray(X_sparse.sum(axis=0)).ravel()
+        sum_x2 = np.asarray(X_sparse.multiply(X_sparse).sum(axis=0)).ravel()
+        dot_xy = X_sparse.T @ y_centered
+    else:
+        sum_x = np.zeros(X.shape[1])
+        sum_x2 = np.zeros(X.shape[1])
+        dot_xy = np.zeros(X.shape[1])
+        for start in range(0, n, CHUNK_ROWS):
+            block = X.iloc[start:start + CHUNK_ROWS] if isinstance(X, pd.DataFrame) else X[start:start + CHUNK_ROWS]
+            block = np.asarray(block, dtype=np.float64)
+            sum_x += block.sum(axis=0)
+            sum_x2 += np.einsum("ij,ij->j", block, block)
+            dot_xy += y_centered[start:start + CHUNK_ROWS] @ block
+
+    ss_x = sum_x2 - sum_x**2 / max(n, 1)
+    ss_y = y_centered @ y_centered
+    # Variance nulle (aux erreurs d'arrondi près) → corrélation indéfinie
+    constant = ss_x <= 1e-12 * np.maximum(sum_x2, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = dot_xy / np.sqrt(ss_x * ss_y)
+    corr[constant | (ss_y == 0)] = np.nan
+    return pd.Series(np.clip(corr, -1.0, 1.0), index=columns, name="corr")
+
+
+def print_label_diagnostics(
+    X: pd.DataFrame,
+    y: pd.Series,
+    mode: str = "full",
+    sample_rows: int = 100_000,
+    threshold: float = LEAKAGE_THRESHOLD,
+    random_state: int = 42,
+) -> Optional[pd.Series]:
+    """
+    Affiche l'aperçu X + y et la corrélation de chaque feature avec y, puis signale
+    les features dont |corr| >= threshold.
+
+    Paramètres
+    ----------
+    X : pd.DataFrame
+        Matrice de features.
+    y : pd.Series
+        Labels binaires correspondants.
+    mode : str
+        "full" (toutes les lignes), "sample" (sample_rows lignes tirées au hasard) ou "off".
+    sample_rows : int
+        Taille de l'échantillon en mode "sample".
+    threshold : float
+        Seuil |corr| de l'alerte de leakage.
+    random_state : int
+        Graine du tirage de l'échantillon.
+
+    Retour
+    ------
+    Corrélations triées par ordre décroissant (None si mode "off").
+    """
+    if mode not in DIAGNOSTIC_MODES:
+        raise ValueError(f"Mode de diagnostic inconnu : {mode} (attendu : {', '.join(DIAGNOSTIC_MODES)}).")
+    if mode == "off":
+        return None
+
+    # --- CHECK : affichage X + y ---
+    print("\n[CHECK] Aperçu X + y (5 premières lignes) :")
+    print(pd.concat([X.head(), y.head()], axis=1))
+
+    # --- Échantillon (lignes triées : ordre chronologique conservé) ---
+    X_diag, y_diag, scope = X, y, f"{len(X)} lignes"
+    if mode == "sample" and len(X) > sample_rows:
+        rng = np.random.RandomState(random_state)
+        rows = np.sort(rng.choice(len(X), size=sample_rows, replace=False))
+        X_diag, y_diag = X.iloc[rows], y.iloc[rows]
+        scope = f"échantillon de {sample_rows} / {len(X)} lignes"
+
+    # --- CHECK : corrélation des features avec le label ---
+    start = time.perf_counter()
+    df_corr = feature_label_correlation(X_diag, y_diag).sort_values(ascending=False)
+    print(f"\n[CHECK] Corrélation des features avec y ({scope}, {time.perf_counter() - start:.2f}s) :")
+    print(df_corr)
+
+    # --- CHECK : features suspects (corrélation trop forte) ---
+    suspicious = df_corr[df_corr.abs() >= threshold]
+    if len(suspicious) > 0:
+        print(f"\n[ALERT] Features avec |corrélation| >= {threshold} (risque de leakage) :")
+        print(suspicious)
+    else:
+        print("\n[INFO] Aucune corrélation anormale détectée — dataset sain.")
+
+    return df_corr
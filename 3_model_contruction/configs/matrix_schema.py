@@ -0,0 +1,123 @@
+"""
+matrix_schema.py
+----------------
+Chargement typé des matrices de features : types réduits à la lecture.
+
+Les CSV de features sont lus par défaut en int64 / float64. Les comptages d'EventId
+tiennent en uint8 / uint16 / uint32 et les modèles n'ont besoin que de float32 :
+- au premier chargement typé, les types minimaux sont déduits des valeurs puis écrits
+  dans un schéma à côté de la matrice (<matrix_csv>.schema.json) ;
+- les chargements suivants lisent directement le CSV avec ces types (read_csv(dtype=...)),
+  sans passer par une matrice int64 complète ;
+- le schéma est refait si le CSV a changé (taille ou date de modification différentes).
+
+Règles de réduction :
+- entiers → plus petit type (non) signé contenant min et max ;
+- flottants → float32 (type lu tel quel par read_csv via le schéma) ;
+- colonnes temporelles / identifiants (TIME_ID_COLS) et colonnes texte : inchangées.
+
+Fonctions :
+- downcast_frame     : Réduit les types d'un DataFrame.
+- load_schema        : Schéma à jour d'une matrice (None si absent ou périmé).
+- write_schema       : Écrit le schéma d'une matrice.
+- read_matrix_typed  : Lecture typée (schéma existant, sinon lecture + réduction + schéma).
+"""
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Colonnes jamais réduites : µs epoch / dates, identifiants (précision int64 / float64)
+TIME_ID_COLS = frozenset({
+    "BlockId", "Node", "first_ts", "last_ts", "window_start", "window_end",
+    "session_start", "session_end",
+})
+
+SCHEMA_VERSION = 1
+
+
+def _schema_path(matrix_csv: str) -> str:
+    return f"{matrix_csv}.schema.json"
+
+
+def _csv_stamp(matrix_csv: str) -> Dict[str, int]:
+    stat = os.stat(matrix_csv)
+    return {"size": int(stat.st_size), "mtime_ns": int(stat.st_mtime_ns)}
+
+
+def _downcast_column(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values):
+        return values
+
+    if pd.api.types.is_float_dtype(values):
+        return values.astype(np.float32)
+
+    if len(values) == 0:
+        return values.astype(np.uint8)
+    kind = "unsigned" if values.min() >= 0 else "integer"
+    return pd.to_numeric(values, downcast=kind)
+
+
+def downcast_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copie de df avec les colonnes numériques réduites (hors TIME_ID_COLS).
+    """
+    return pd.DataFrame(
+        {col: df[col] if col in TIME_ID_COLS else _downcast_column(df[col]) for col in df.columns},
+        index=df.index,
+    )
+
+
+def load_schema(matrix_csv: str) -> Optional[Dict[str, str]]:
+    """
+    {colonne: dtype} si <matrix_csv>.schema.json existe et correspond au CSV actuel.
+    """
+    path = _schema_path(matrix_csv)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    if payload.get("version") != SCHEMA_VERSION or payload.get("csv") != _csv_stamp(matrix_csv):
+        return None
+    return payload["dtypes"]
+
+
+def write_schema(matrix_csv: str, df: pd.DataFrame) -> str:
+    """
+    Écrit les types numériques de df dans <matrix_csv>.schema.json (colonnes texte omises).
+    """
+    dtypes = {
+        str(col): str(dtype)
+        for col, dtype in df.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype)
+    }
+    path = _schema_path(matrix_csv)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": SCHEMA_VERSION, "csv": _csv_stamp(matrix_csv), "dtypes": dtypes}, f, indent=2)
+    return path
+
+
+def read_matrix_typed(matrix_csv: str) -> pd.DataFrame:
+    """
+    Lit la matrice avec les types réduits : directement via le schéma s'il est à jour,
+    sinon lecture standard, réduction des types et écriture du schéma.
+    """
+    schema = load_schema(matrix_csv)
+    if schema is not None:
+        df = pd.read_csv(matrix_csv, dtype=schema)
+        print(f"[INFO] Matrice lue avec son schéma ({_schema_path(matrix_csv)}).")
+    else:
+        df = downcast_frame(pd.read_csv(matrix_csv))
+        try:
+            path = write_schema(matrix_csv, df)
+            print(f"[INFO] Schéma de la matrice écrit : {path}")
+        except OSError as exc:
+            print(f"[WARN] Schéma non écrit ({_schema_path(matrix_csv)}) : {exc}")
+
+    size_mb = df.memory_usage(deep=False).sum() / 2**20
+    print(f"[INFO] Matrice typée : {size_mb:.1f} Mo en mémoire.")
+    return df
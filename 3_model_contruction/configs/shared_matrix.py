@@ -0,0 +1,120 @@
+"""
+shared_matrix.py
+----------------
+X et y dans des fichiers .npy ouverts en memory-map, partagés par tous les processus.
+
+load_hdfs_matrix_and_labels(..., mmap_dir=...) écrit X et y une seule fois puis renvoie
+un DataFrame / une Series adossés à ces fichiers (aucune copie en mémoire) :
+- les workers de fold_runner ouvrent les mêmes fichiers (pages partagées via le cache
+  du système) au lieu de recevoir une copie de X ;
+- les arbres (RandomForest n_jobs) et la permutation importance travaillent en threads
+  / dans le processus, directement sur le buffer.
+
+Type du buffer : float32 si toutes les colonnes sont entières et exactement représentables
+(comptages d'EventId : c'est le type interne des arbres, et la conversion float64 faite
+par liblinear redonne les mêmes valeurs) ou déjà float32 (chargement typé), sinon float64.
+
+Fonctions :
+- shared_dtype    : Type du buffer partagé pour X.
+- share_features  : Écrit X / y en .npy et renvoie les versions memory-mappées.
+- memmap_path     : Fichier .npy d'un tableau memory-mappé (None sinon).
+- shared_values   : Tableau partagé d'un DataFrame / d'une Series adossé(e) à un .npy.
+- report_peak_rss : Affiche le pic de mémoire résidente (processus + workers).
+"""
+import os
+import resource
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Entiers exactement représentables en float32
+FLOAT32_EXACT_MAX = 1 << 24
+
+# Nombre de lignes écrites à la fois dans le .npy (pas de copie dense complète de X)
+WRITE_CHUNK_ROWS = 65536
+
+
+def shared_dtype(X: pd.DataFrame) -> np.dtype:
+    """
+    float32 si toutes les colonnes sont float32, booléennes ou entières avec |x| < 2^24,
+    sinon float64.
+    """
+    for col in X.columns:
+        values = X[col]
+        if pd.api.types.is_bool_dtype(values) or values.dtype == np.float32:
+            continue
+        if not pd.api.types.is_integer_dtype(values):
+            return np.dtype(np.float64)
+        if len(values) and values.abs().max() >= FLOAT32_EXACT_MAX:
+            return np.dtype(np.float64)
+    return np.dtype(np.float32)
+
+
+def share_features(
+    X: pd.DataFrame,
+    y: pd.Series,
+    mmap_dir: str,
+    prefix: str = "matrix",
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Écrit X (<mmap_dir>/<prefix>_X.npy) et y (<prefix>_y.npy), puis renvoie X et y
+    adossés à ces fichiers en memory-map (lecture seule, même index et mêmes colonnes).
+    """
+    os.makedirs(mmap_dir, exist_ok=True)
+    x_path = os.path.join(mmap_dir, f"{prefix}_X.npy")
+    y_path = os.path.join(mmap_dir, f"{prefix}_y.npy")
+
+    dtype = shared_dtype(X)
+    out = np.lib.format.open_memmap(x_path, mode="w+", dtype=dtype, shape=X.shape)
+    for start in range(0, len(X), WRITE_CHUNK_ROWS):
+        out[start:start + WRITE_CHUNK_ROWS] = X.iloc[start:start + WRITE_CHUNK_ROWS].to_numpy(dtype=dtype)
+    out.flush()
+    del out
+    np.save(y_path, y.to_numpy())
+
+    X_shared = pd.DataFrame(np.load(x_path, mmap_mode="r"), index=X.index, columns=X.columns, copy=False)
+    y_shared = pd.Series(np.load(y_path, mmap_mode="r"), index=y.index, name=y.name, copy=False)
+
+    size_mb = X_shared.shape[0] * X_shared.shape[1] * dtype.itemsize / 2**20
+    print(f"[INFO] X partagé en memory-map ({dtype.name}, {size_mb:.1f} Mo) : {x_path}")
+    return X_shared, y_shared
+
+
+def memmap_path(values: np.ndarray) -> Optional[str]:
+    """
+    Chemin du .npy si values est une vue complète et contiguë d'un tableau memory-mappé.
+    """
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    if base is None or base.filename is None:
+        return None
+
+    full_view = (
+        values.shape == base.shape
+        and values.dtype == base.dtype
+        and values.flags["C_CONTIGUOUS"]
+        and values.__array_interface__["data"][0] == base.__array_interface__["data"][0]
+    )
+    return str(base.filename) if full_view else None
+
+
+def shared_values(data) -> Optional[np.ndarray]:
+    """
+    Valeurs d'un DataFrame / d'une Series adossé(e) à un .npy (sans copie), None sinon.
+    """
+    if isinstance(data, pd.DataFrame) and data.dtypes.nunique() != 1:
+        return None
+    values = data.to_numpy()
+    return values if memmap_path(values) is not None else None
+
+
+def report_peak_rss(stage: str) -> None:
+    """
+    Pic de mémoire résidente du processus et de ses workers terminés (Linux : ru_maxrss en Ko).
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"[INFO] Pic RSS ({stage}) : {own:.0f} Mo (processus), {children:.0f} Mo (plus gros worker)")
@@ -1,17 +1,106 @@
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, List, Optional
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import TimeSeriesSplit
 
+from configs.data_utils import compress_duplicate_rows
+from configs.fold_model_cache import FoldModel, FoldModelCache, fold_signature
+from configs.fold_runner import run_timeseries_folds, time_series_fold_bounds
+from configs.incremental_training import print_cold_start_comparison, timed, train_incremental_sgd_logistic
 from configs.metrics_utils import compute_binary_classification_metrics, print_metrics
+from configs.shared_matrix import shared_dtype
+
+
+# Un fold : entraînement sur le passé, évaluation sur le futur (fonction de niveau module
+# pour être exécutée dans un worker du pool de processus ; liblinear est mono-cœur)
+def _fit_eval_logistic_regression_fold(
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    n_jobs: int,
+    class_weight: Optional[str] = "balanced",
+    compress_duplicates: bool = False,
+    sample_weight=None,
+):
+    # Lignes identiques du TRAIN regroupées, comptes (ou sommes des poids window_weight)
+    # passés en sample_weight (test intact)
+    if compress_duplicates:
+        n_rows = len(X_train)
+        X_train, y_train, sample_weight = compress_duplicate_rows(X_train, y_train, sample_weight)
+        print(f"[INFO] Train compressé : {n_rows} → {len(X_train)} lignes uniques")
+
+    # ----- Modèle entraîné uniquement sur le passé -----
+    logreg = LogisticRegression(
+        solver="liblinear",
+        max_iter=2000,
+        class_weight=class_weight,  # pondération seulement sur le TRAIN
+    )
+    logreg.fit(X_train, y_train, sample_weight=sample_weight)
+
+    # ----- Évaluation sur le futur (test du fold) -----
+    # IMPORTANT : test jamais rebalancé → distribution réelle conservée
+    y_test_pred = logreg.predict(X_test)
+    y_test_proba = logreg.predict_proba(X_test)[:, 1]
+
+    metrics = compute_binary_classification_metrics(
+        y_true=y_test,
+        y_pred=y_test_pred,
+        y_proba=y_test_proba,
+    )
+    return metrics, logreg
+
+
+# Entraînement de zéro à chaque fold (folds en parallèle sur des vues de X)
+def _logistic_regression_cold_folds(
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_splits: int,
+    n_jobs: int,
+    fold_workers: Optional[int],
+    class_weight: Optional[str],
+    compress_duplicates: bool = False,
+    sample_weight: Optional[pd.Series] = None,
+) -> List[FoldModel]:
+    # Folds = vues sur un tableau contigu : float32 si exact (comptages, matrice typée),
+    # sinon float64 ; liblinear travaille en float64 (mêmes valeurs)
+    results = run_timeseries_folds(
+        partial(_fit_eval_logistic_regression_fold, class_weight=class_weight, compress_duplicates=compress_duplicates),
+        X,
+        y,
+        n_splits=n_splits,
+        n_jobs=n_jobs,
+        max_workers=fold_workers,
+        sample_weight=sample_weight,
+        dtype=shared_dtype(X),
+    )
+    bounds = {b.fold: b for b in time_series_fold_bounds(len(X), n_splits)}
+    return [
+        FoldModel(
+            fold=fold_idx,
+            train_end=bounds[fold_idx].train_end,
+            test_end=bounds[fold_idx].test_end,
+            model=model,
+            metrics=metrics,
+        )
+        for fold_idx, (metrics, model) in results
+    ]
 
 
 def train_eval_logistic_regression_timeseries(
     X: pd.DataFrame,
     y: pd.Series,
     n_splits: int = 5,
-) -> None:
+    n_jobs: int = -1,
+    fold_workers: Optional[int] = None,
+    class_weight: Optional[str] = "balanced",
+    model_cache: Optional[FoldModelCache] = None,
+    incremental: bool = False,
+    compare_cold_start: bool = False,
+    compress_duplicates: bool = False,
+    sample_weight: Optional[pd.Series] = None,
+) -> List[FoldModel]:
     """
     Entraîne et évalue une régression logistique avec une stratégie de
     TimeSeries Cross-Validation (Rolling Window / Sliding-origin).
@@ -31,39 +120,75 @@ def train_eval_logistic_regression_timeseries(
         Labels binaires correspondants (0 = normal, 1 = anomalie).
     n_splits : int
         Nombre de folds pour la TimeSeries Cross-Validation.
-    """
+    n_jobs : int
+        Budget total de cœurs (-1 = tous) : nombre maximal de folds en parallèle.
+    fold_workers : int | None
+        Nombre maximal de folds en parallèle (1 = séquentiel).
+    class_weight : str | None
+        Pondération des classes sur le train ("balanced" ou None).
+    model_cache : FoldModelCache | None
+        Cache des modèles par fold : réutilisé s'il correspond aux données, sinon rempli.
+    incremental : bool
+        Entraînement incrémental (SGDClassifier log_loss + partial_fit continué d'un fold
+        à l'autre) au lieu de liblinear de zéro par fold (voir configs/incremental_training.py).
+    compare_cold_start : bool
+        En mode incrémental, entraîne aussi à froid et affiche temps et écarts de métriques.
+    compress_duplicates : bool
+        Entraînement de zéro : lignes identiques (features + label) du train de chaque
+        fold regroupées, comptes passés en sample_weight (test jamais compressé).
+        Incompatible avec incremental (ValueError).
+    sample_weight : pd.Series | None
+        Poids des lignes (window_weight : nombre de fenêtres représentées), passés au fit
+        de chaque fold (multipliés par les comptes si compress_duplicates) et pris en
+        compte dans class_weight="balanced".
 
-    tscv = TimeSeriesSplit(n_splits=n_splits)
-    fold_metrics = []
+    Retour
+    ------
+    Liste des modèles entraînés par fold (FoldModel), dans l'ordre des folds.
+    """
 
-    for fold_idx, (train_idx, test_idx) in enumerate(tscv.split(X), start=1):
-        X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
-        y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+    # Compression des doublons : entraînement de zéro uniquement (les lots incrémentaux
+    # ne sont pas compressés), combinaison refusée plutôt qu'ignorée
+    if incremental and compress_duplicates:
+        raise ValueError("compress_duplicates n'est pas disponible en mode incrémental (--incremental).")
 
-        # ----- Modèle entraîné uniquement sur le passé -----
-        logreg = LogisticRegression(
-            solver="liblinear",
-            max_iter=2000,
-            class_weight="balanced",  # pondération seulement sur le TRAIN
-        )
-        logreg.fit(X_train, y_train)
+    # Modèles par fold déjà entraînés sur ces données (cache mémoire / disque) ?
+    fold_models = None
+    cache_name = "logistic_regression_incremental" if incremental else "logistic_regression"
+    if model_cache is not None:
+        config = None if incremental else {"compress_duplicates": compress_duplicates}
+        signature = fold_signature(X, y, n_splits, class_weight, config, sample_weight)
+        fold_models = model_cache.get(cache_name, signature)
 
-        # ----- Évaluation sur le futur (test du fold) -----
-        # IMPORTANT : test jamais rebalancé → distribution réelle conservée
-        y_test_pred = logreg.predict(X_test)
-        y_test_proba = logreg.predict_proba(X_test)[:, 1]
+    if fold_models is None:
+        if incremental:
+            fold_models, incremental_seconds = timed(
+                train_incremental_sgd_logistic, X, y, n_splits=n_splits, class_weight=class_weight,
+                sample_weight=sample_weight,
+            )
+            if compare_cold_start:
+                cold_models, cold_seconds = timed(
+                    _logistic_regression_cold_folds, X, y, n_splits, n_jobs, fold_workers, class_weight, compress_duplicates, sample_weight
+                )
+                print_cold_start_comparison("Logistic Regression", fold_models, incremental_seconds, cold_models, cold_seconds)
+        else:
+            fold_models = _logistic_regression_cold_folds(
+                X, y, n_splits, n_jobs, fold_workers, class_weight, compress_duplicates, sample_weight
+            )
+        if model_cache is not None:
+            model_cache.put(cache_name, signature, fold_models)
+    else:
+        print("[INFO] Modèles par fold repris du cache, pas de ré-entraînement.")
 
-        metrics = compute_binary_classification_metrics(
-            y_true=y_test,
-            y_pred=y_test_pred,
-            y_proba=y_test_proba,
-        )
-
-        title = f"Logistic Regression - TimeSeriesCV Fold {fold_idx}"
-        print_metrics(title, metrics)
-        fold_metrics.append((title, metrics))
+    fold_metrics = []
+    for fm in fold_models:
+        title = f"Logistic Regression - TimeSeriesCV Fold {fm.fold}"
+        print_metrics(title, fm.metrics)
+        fold_metrics.append((title, fm.metrics))
 
     # Optionnel : dernier fold considéré comme "test final"
     last_title, last_metrics = fold_metrics[-1]
     print("\n=== Dernier fold considéré comme Test final (futur) ===")
     print_metrics("Logistic Regression - Test final (dernier fold)", last_metrics)
+
+    return fold_models
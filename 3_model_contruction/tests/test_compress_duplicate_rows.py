@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from configs.data_utils import compress_duplicate_rows
+
+
+def test_duplicate_rows_counted_in_first_appearance_order():
+    X = np.array([[1, 0], [0, 2], [1, 0], [1, 0], [0, 2]], dtype=np.float32)
+    y = np.array([0, 1, 0, 1, 1])
+
+    X_unique, y_unique, counts = compress_duplicate_rows(X, y)
+
+    # (même features mais label différent : lignes distinctes)
+    assert X_unique.tolist() == [[1, 0], [0, 2], [1, 0]]
+    assert y_unique.tolist() == [0, 1, 1]
+    assert counts.tolist() == [2.0, 2.0, 1.0]
+
+
+def test_duplicate_rows_sum_existing_weights():
+    X = np.array([[1, 0], [0, 2], [1, 0]], dtype=np.float64)
+    y = np.array([0, 1, 0])
+
+    _, _, counts = compress_duplicate_rows(X, y, sample_weight=np.array([1.0, 5.0, 3.0]))
+
+    assert counts.tolist() == [4.0, 5.0]
+
+
+def test_weighted_fit_on_compressed_rows_matches_full_fit():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 3, size=(400, 3)).astype(np.float64)
+    y = (X[:, 0] + rng.integers(0, 2, size=400) > 2).astype(int)
+
+    X_unique, y_unique, counts = compress_duplicate_rows(X, y)
+    assert len(X_unique) < len(X)
+
+    full = LogisticRegression().fit(X, y)
+    compressed = LogisticRegression().fit(X_unique, y_unique, sample_weight=counts)
+    assert compressed.coef_ == pytest.approx(full.coef_, abs=1e-4)
+    assert compressed.intercept_ == pytest.approx(full.intercept_, abs=1e-4)
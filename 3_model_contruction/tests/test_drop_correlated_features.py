@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from configs.drop_correlated_features import _correlated_pairs
+
+
+def _reference_pairs(df, threshold):
+    corr = df.corr().abs().to_numpy()
+    rows, cols = np.nonzero(np.triu(corr >= threshold, k=1))
+    order = np.lexsort((rows, cols))
+    return rows[order].tolist(), cols[order].tolist()
+
+
+@pytest.mark.parametrize("density", [1.0, 0.03])
+def test_correlated_pairs_match_pandas(density):
+    rng = np.random.default_rng(0)
+    base = rng.poisson(3.0, size=(2000, 6)) * (rng.random((2000, 6)) < density)
+    df = pd.DataFrame(base, columns=[f"E{k}" for k in range(6)])
+    df["copy"] = df["E0"] * 2
+    df["noisy"] = df["E1"] + rng.poisson(1.0, 2000) * (rng.random(2000) < density)
+    df["constant"] = 7
+
+    # (seuil juste sous la corrélation E1 / noisy : paire recalculée en float64)
+    threshold = float(df["E1"].corr(df["noisy"])) - 1e-9
+    rows, cols = _correlated_pairs(df, threshold)
+
+    assert (rows.tolist(), cols.tolist()) == _reference_pairs(df, threshold)
+    assert (1, 7) in zip(rows.tolist(), cols.tolist())
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from configs.fold_model_cache import FoldModel, FoldModelCache, fold_signature
+
+
+def _data():
+    X = pd.DataFrame({"E1": [0, 1, 2, 3], "E2": [1.5, 0.0, 2.0, 0.5]})
+    y = pd.Series([0, 1, 0, 1], name="Label")
+    return X, y
+
+
+def test_signature_follows_values_order_and_weights():
+    X, y = _data()
+    reference = fold_signature(X, y, 2, "balanced")
+
+    assert fold_signature(X.copy(), y.copy(), 2, "balanced") == reference
+    assert fold_signature(X.iloc[::-1].reset_index(drop=True), y.iloc[::-1].reset_index(drop=True), 2, "balanced") != reference
+    assert fold_signature(X, y.replace({0: 1, 1: 0}), 2, "balanced") != reference
+    assert fold_signature(X, y, 2, "balanced", sample_weight=pd.Series([1.0, 3.0, 1.0, 1.0])) != reference
+    assert fold_signature(X, y, 3, "balanced") != reference
+
+
+def test_models_persisted_and_reloaded_for_same_signature(tmp_path):
+    X, y = _data()
+    signature = fold_signature(X, y, 2, None, {"compress_duplicates": False})
+    fold_models = [FoldModel(fold=1, train_end=2, test_end=4, model={"coef": np.arange(3)}, metrics={"pr_auc": 0.5})]
+    FoldModelCache(cache_dir=str(tmp_path)).put("random_forest", signature, fold_models)
+
+    reloaded = FoldModelCache(cache_dir=str(tmp_path)).get("random_forest", signature)
+    assert reloaded is not None and reloaded[0].model["coef"].tolist() == [0, 1, 2]
+    assert reloaded[0].metrics == {"pr_auc": 0.5}
+
+    other = fold_signature(X, y, 2, None, {"compress_duplicates": True})
+    assert FoldModelCache(cache_dir=str(tmp_path)).get("random_forest", other) is None
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import TimeSeriesSplit
+
+from configs.fold_runner import run_timeseries_folds, split_core_budget, time_series_fold_bounds
+
+
+# (niveau module : sérialisable pour le pool de processus)
+def _fold_sums(X_train, y_train, X_test, y_test, n_jobs, sample_weight=None):
+    weight_sum = None if sample_weight is None else float(np.sum(sample_weight))
+    return float(X_train.sum()), int(y_train.sum()), float(X_test.sum()), len(y_test), weight_sum
+
+
+def _data(n=23):
+    X = pd.DataFrame({"E1": np.arange(n, dtype=np.int64), "E2": np.arange(n, dtype=np.int64) % 3})
+    y = pd.Series(np.arange(n) % 2, name="Label")
+    w = pd.Series(np.arange(1, n + 1, dtype=np.float64))
+    return X, y, w
+
+
+def test_fold_bounds_match_timeseries_split():
+    bounds = time_series_fold_bounds(23, 4)
+    splits = list(TimeSeriesSplit(n_splits=4).split(np.empty((23, 1))))
+
+    assert [b.fold for b in bounds] == [1, 2, 3, 4]
+    assert [(b.train_end, b.test_end) for b in bounds] == [(len(tr), te[-1] + 1) for tr, te in splits]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_folds_receive_train_test_slices_and_weights(max_workers):
+    X, y, w = _data()
+    results = run_timeseries_folds(_fold_sums, X, y, n_splits=4, n_jobs=2, max_workers=max_workers, sample_weight=w)
+
+    expected = []
+    for fold, (train_idx, test_idx) in enumerate(TimeSeriesSplit(n_splits=4).split(X), start=1):
+        expected.append((fold, (
+            float(X.iloc[train_idx].to_numpy().sum()), int(y.iloc[train_idx].sum()),
+            float(X.iloc[test_idx].to_numpy().sum()), len(test_idx), float(w.iloc[train_idx].sum()),
+        )))
+    assert results == expected
+
+    unweighted = run_timeseries_folds(_fold_sums, X, y, n_splits=4, n_jobs=2, max_workers=max_workers)
+    assert all(result[-1] is None for _, result in unweighted)
+
+
+def test_core_budget_shared_between_folds_and_model():
+    assert split_core_budget(5, n_jobs=8) == (5, 1)
+    assert split_core_budget(2, n_jobs=8) == (2, 4)
+    assert split_core_budget(5, n_jobs=8, max_workers=1) == (1, 8)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from configs.incremental_training import balanced_weights, train_incremental_random_forest, train_incremental_sgd_logistic
+from random_forest_model import train_eval_random_forest_timeseries
+
+
+def _data(n=240):
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({"E1": rng.poisson(2, n), "E2": rng.poisson(1, n)})
+    y = pd.Series(((X["E1"] > 3) | (rng.rand(n) < 0.05)).astype(int), name="Label")
+    return X, y
+
+
+def test_balanced_weights_match_sklearn_rule():
+    assert balanced_weights(np.array([6, 2])) == pytest.approx({0: 8 / 12, 1: 8 / 4})
+    # Classe absente : poids 1.0 (les autres gardent n / (2 · n_c))
+    assert balanced_weights(np.array([5, 0])) == {0: 0.5, 1: 1.0}
+
+
+def test_random_forest_folds_add_trees_and_stay_frozen():
+    X, y = _data()
+    fold_models = train_incremental_random_forest(X, y, n_splits=3, n_jobs=1, n_estimators=10, warm_start_trees=5)
+
+    assert [len(fm.model.estimators_) for fm in fold_models] == [10, 15, 20]
+    # Les arbres des folds précédents sont réutilisés, pas ré-entraînés
+    assert fold_models[1].model.estimators_[:10] == fold_models[0].model.estimators_
+    assert all(0.0 <= fm.metrics["pr_auc"] <= 1.0 for fm in fold_models)
+
+
+def test_sgd_folds_use_expanding_train():
+    X, y = _data()
+    fold_models = train_incremental_sgd_logistic(X, y, n_splits=3)
+
+    assert [fm.train_end for fm in fold_models] == [60, 120, 180]
+    proba = fold_models[-1].model.predict_proba(X.to_numpy(dtype=np.float64))[:, 1]
+    assert proba.shape == (len(X),) and np.all((proba >= 0) & (proba <= 1))
+
+
+def test_incremental_rejects_duplicate_compression():
+    X, y = _data()
+    with pytest.raises(ValueError, match="incrémental"):
+        train_eval_random_forest_timeseries(X, y, n_splits=3, incremental=True, compress_duplicates=True)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from configs.label_diagnostics import feature_label_correlation, print_label_diagnostics
+
+
+def _data(n=500):
+    rng = np.random.default_rng(0)
+    y = pd.Series((rng.random(n) < 0.2).astype(int), name="Label")
+    X = pd.DataFrame({
+        "leak": y * 3 + rng.integers(0, 2, n),
+        "noise": rng.poisson(2.0, n),
+        "rare": rng.poisson(0.05, n),
+        "constant": np.full(n, 4),
+    })
+    return X, y
+
+
+def _reference(X, y):
+    return pd.concat([X, y], axis=1).corr()["Label"].drop("Label")
+
+
+def test_dense_correlation_matches_dataframe_corr(monkeypatch):
+    monkeypatch.setattr("configs.label_diagnostics.CHUNK_ROWS", 64)
+    X, y = _data()
+
+    corr = feature_label_correlation(X, y)
+
+    reference = _reference(X, y)
+    assert corr.index.tolist() == X.columns.tolist()
+    assert np.isnan(corr["constant"]) and np.isnan(reference["constant"])
+    assert corr.drop("constant").to_numpy() == pytest.approx(reference.drop("constant").to_numpy(), abs=1e-10)
+
+
+def test_sparse_inputs_match_dense():
+    X, y = _data()
+    dense = feature_label_correlation(X, y)
+
+    from_scipy = feature_label_correlation(sp.csr_matrix(X.to_numpy(dtype=float)), y)
+    from_frame = feature_label_correlation(X.astype(pd.SparseDtype(float, 0)), y)
+
+    assert from_scipy.to_numpy() == pytest.approx(dense.to_numpy(), abs=1e-10, nan_ok=True)
+    assert from_frame.to_numpy() == pytest.approx(dense.to_numpy(), abs=1e-10, nan_ok=True)
+
+
+def test_diagnostic_modes():
+    X, y = _data()
+
+    assert print_label_diagnostics(X, y, mode="off") is None
+    assert print_label_diagnostics(X, y, mode="sample", sample_rows=100).index[0] == "leak"
+    with pytest.raises(ValueError):
+        print_label_diagnostics(X, y, mode="fast")
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from configs.matrix_schema import load_schema, read_matrix_typed
+
+
+def _write_matrix(path, n_rows=4):
+    pd.DataFrame({
+        "window_start": np.arange(n_rows, dtype=np.int64) * 60_000_000 + 1_117_838_570_000_000,
+        "E1": np.arange(n_rows) * 100,
+        "E2": np.arange(n_rows) * 1000,
+        "delta": np.linspace(-1.5, 1.5, n_rows),
+        "Node": [f"R{k}" for k in range(n_rows)],
+    }).to_csv(path, index=False)
+
+
+def test_typed_read_writes_schema_then_reuses_it(tmp_path):
+    matrix_csv = str(tmp_path / "matrix.csv")
+    _write_matrix(matrix_csv)
+
+    first = read_matrix_typed(matrix_csv)
+    assert first.dtypes.astype(str).to_dict() == {
+        "window_start": "int64", "E1": "uint16", "E2": "uint16", "delta": "float32", "Node": first["Node"].dtype.name,
+    }
+    assert load_schema(matrix_csv) == {"window_start": "int64", "E1": "uint16", "E2": "uint16", "delta": "float32"}
+
+    second = read_matrix_typed(matrix_csv)
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_schema_ignored_once_the_csv_changes(tmp_path):
+    matrix_csv = str(tmp_path / "matrix.csv")
+    _write_matrix(matrix_csv)
+    read_matrix_typed(matrix_csv)
+
+    _write_matrix(matrix_csv, n_rows=400)
+    assert load_schema(matrix_csv) is None
+    assert read_matrix_typed(matrix_csv)["E2"].dtype == np.uint32
+    assert os.path.exists(f"{matrix_csv}.schema.json") and load_schema(matrix_csv)["E2"] == "uint32"
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from configs.shared_matrix import memmap_path, share_features, shared_dtype, shared_values
+
+
+def test_shared_dtype_float32_only_for_exact_values():
+    assert shared_dtype(pd.DataFrame({"E1": [0, 3], "flag": [True, False]})) == np.float32
+    assert shared_dtype(pd.DataFrame({"E1": np.array([0.5, 1.0], dtype=np.float32)})) == np.float32
+    assert shared_dtype(pd.DataFrame({"E1": [0, 1 << 24]})) == np.float64
+    assert shared_dtype(pd.DataFrame({"E1": [0.5, 1.0]})) == np.float64
+
+
+def test_shared_features_backed_by_npy_without_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr("configs.shared_matrix.WRITE_CHUNK_ROWS", 2)
+    X = pd.DataFrame({"E1": [0, 1, 2, 3, 4], "E2": [5, 0, 0, 1, 2]}, index=[10, 11, 12, 13, 14])
+    y = pd.Series([0, 1, 0, 0, 1], index=X.index, name="Label")
+
+    X_shared, y_shared = share_features(X, y, str(tmp_path))
+
+    pd.testing.assert_frame_equal(X_shared, X.astype(np.float32))
+    assert y_shared.tolist() == y.tolist() and y_shared.index.equals(y.index) and y_shared.name == "Label"
+    x_values = shared_values(X_shared)
+    assert x_values is not None and memmap_path(x_values) == str(tmp_path / "matrix_X.npy")
+    assert memmap_path(shared_values(y_shared)) == str(tmp_path / "matrix_y.npy")
+
+    # Vue partielle ou copie : plus partageable par chemin
+    assert memmap_path(x_values[1:]) is None
+    assert shared_values(X) is None
@@ -1,13 +1,13 @@
 # train_models.py
 
-import argparse, os
+import argparse, json, os
 from typing import Optional
 
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
 from configs.build_chronological_matrix import build_chronological_matrix
 from configs.data_utils import load_hdfs_matrix_and_labels
+from configs.fold_model_cache import FoldModelCache
+from configs.shared_matrix import report_peak_rss
 from random_forest_model import train_eval_random_forest_timeseries
 from logistic_regression_model import train_eval_logistic_regression_timeseries
 from configs.compute_permutation_importance import (
@@ -21,6 +21,20 @@ def train_model(
     structured_csv: Optional[str] = None,
     model_name: str = "both",
     n_splits: int = 5,
+    n_jobs: int = -1,
+    fold_workers: Optional[int] = None,
+    class_weight: Optional[str] = "balanced",
+    model_cache_dir: Optional[str] = None,
+    feature_groups_json: Optional[str] = None,
+    perm_early_stop_tol: Optional[float] = None,
+    mmap_dir: Optional[str] = None,
+    incremental: bool = False,
+    warm_start_trees: int = 50,
+    compare_cold_start: bool = False,
+    compress_duplicates: bool = False,
+    typed: bool = False,
+    diagnostics: str = "full",
+    diagnostics_sample_rows: int = 100_000,
 ) -> None:
     """
     Entraîne RandomForest et/ou Logistic Regression avec une stratégie
@@ -29,7 +43,16 @@ def train_model(
     - Respect strict de l'ordre temporel
     - Aucune fuite du futur vers le passé
     - Les données de test NE SONT PAS rebalancées
-    - Seul le TRAIN utilise class_weight="balanced"
+    - Seul le TRAIN utilise class_weight (par défaut "balanced")
+    - Les modèles par fold sont réutilisés pour la permutation importance ; avec
+      model_cache_dir, ils sont persistés et repris au prochain lancement sur les mêmes données
+    - feature_groups_json ({groupe: [colonnes]}) : importance par groupe de features
+    - mmap_dir : X et y partagés en memory-map entre tous les processus d'entraînement
+    - incremental : modèles prolongés d'un fold au suivant (warm_start / partial_fit),
+      compare_cold_start : comparaison temps / métriques avec l'entraînement de zéro
+    - compress_duplicates : lignes identiques du train regroupées (comptes en sample_weight)
+    - typed : matrice lue avec des types réduits (schéma stocké avec la matrice)
+    - diagnostics : aperçu + corrélation features / label ("full", "sample" ou "off")
     """
 
     dataset = dataset_name.lower()
@@ -58,11 +81,16 @@ def train_model(
     # 2) Chargement X, y (triés chronologiquement)
     # -----------------------------------------------------
     print("[INFO] Chargement des features et labels...")
-    X, y = load_hdfs_matrix_and_labels(
+    X, y, sample_weight = load_hdfs_matrix_and_labels(
         matrix_csv=final_matrix_csv,
         labels_csv=labels_csv,
-        label_col="Label"
+        label_col="Label",
+        mmap_dir=mmap_dir,
+        typed=typed,
+        diagnostics=diagnostics,
+        diagnostics_sample_rows=diagnostics_sample_rows,
     )
+    report_peak_rss("après chargement")
 
     # Vérification du tri chronologique
     # (X doit avoir été construit avec un 'timestamp' trié)
@@ -76,63 +104,86 @@ def train_model(
     # -----------------------------------------------------
     model = model_name.lower()
 
+    # Modèles par fold renvoyés par les entraîneurs : la permutation importance les
+    # réutilise sans ré-entraînement. Cache (et signature des données, qui relit X en
+    # entier) uniquement s'ils doivent être persistés (model_cache_dir)
+    model_cache = FoldModelCache(cache_dir=model_cache_dir) if model_cache_dir is not None else None
+    rf_fold_models = lr_fold_models = None
+
     if model in ("rf", "both"):
         print("\n[MODEL] RandomForest - TimeSeries Cross-Validation")
-        train_eval_random_forest_timeseries(
+        rf_fold_models = train_eval_random_forest_timeseries(
             X=X,
             y=y,
-            n_splits=n_splits
+            n_splits=n_splits,
+            n_jobs=n_jobs,
+            fold_workers=fold_workers,
+            class_weight=class_weight,
+            model_cache=model_cache,
+            incremental=incremental,
+            warm_start_trees=warm_start_trees,
+            compare_cold_start=compare_cold_start,
+            compress_duplicates=compress_duplicates,
+            sample_weight=sample_weight,
         )
 
     if model in ("lr", "both"):
         print("\n[MODEL] LogisticRegression - TimeSeries Cross-Validation")
-        train_eval_logistic_regression_timeseries(
+        lr_fold_models = train_eval_logistic_regression_timeseries(
             X=X,
             y=y,
-            n_splits=n_splits
+            n_splits=n_splits,
+            n_jobs=n_jobs,
+            fold_workers=fold_workers,
+            class_weight=class_weight,
+            model_cache=model_cache,
+            incremental=incremental,
+            compare_cold_start=compare_cold_start,
+            compress_duplicates=compress_duplicates,
+            sample_weight=sample_weight,
         )
 
     if model not in ("rf", "lr", "both"):
         raise ValueError(f"model_name doit être 'rf', 'lr' ou 'both', reçu: {model_name}")
 
-    # 4) Interprétation – Importance des features
+    report_peak_rss("après entraînement")
+
+    # 4) Interprétation – Importance des features (modèles des folds, sans ré-entraînement)
     print("\n[INTERPRETATION] Importance des features (Permutation Importance, TimeSeries CV)")
 
-    if model in ("rf", "both"):
+    feature_groups = None
+    if feature_groups_json is not None:
+        with open(feature_groups_json, "r", encoding="utf-8") as f:
+            feature_groups = json.load(f)
+
+    if rf_fold_models is not None:
         print(f"[INTERPRETATION] RandomForest – Permutation Importance ({dataset})")
-        rf_base = RandomForestClassifier(
-            n_estimators=200,
-            max_depth=None,
-            n_jobs=-1,
-            random_state=42,
-            # pas de class_weight
-        )
         compute_permutation_importance(
-            model=rf_base,
+            model=None,
             X=X,
             y=y,
-            n_splits=n_splits,
             n_repeats=10,
             random_state=42,
+            fold_models=rf_fold_models,
+            feature_groups=feature_groups,
+            early_stop_tol=perm_early_stop_tol,
         )
 
-    if model in ("lr", "both"):
+    if lr_fold_models is not None:
         print(f"[INTERPRETATION] LogisticRegression – Permutation Importance ({dataset})")
-        lr_base = LogisticRegression(
-            solver="liblinear",
-            max_iter=2000,
-            random_state=42,
-            # pas de class_weight
-        )
         compute_permutation_importance(
-            model=lr_base,
+            model=None,
             X=X,
             y=y,
-            n_splits=n_splits,
             n_repeats=10,
             random_state=42,
+            fold_models=lr_fold_models,
+            feature_groups=feature_groups,
+            early_stop_tol=perm_early_stop_tol,
         )
 
+    report_peak_rss("après interprétation")
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Train RandomForest / LogisticRegression avec TimeSeries Cross-Validation."
@@ -143,6 +194,20 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--structured_csv", type=str, required=False, help="Chemin vers le log structuré pour BGL.")
     parser.add_argument("--model", type=str, default="both", help="Modèle: 'rf', 'lr' ou 'both'.")
     parser.add_argument("--splits", type=int, default=5, help="Nombre de splits TimeSeries.")
+    parser.add_argument("--n_jobs", type=int, default=-1, help="Budget total de cœurs (folds parallèles × n_jobs du modèle).")
+    parser.add_argument("--fold_workers", type=int, default=None, help="Nombre maximal de folds en parallèle (1 = séquentiel).")
+    parser.add_argument("--class_weight", type=str, default="balanced", choices=["balanced", "none"], help="Pondération des classes sur le train.")
+    parser.add_argument("--feature_groups_json", type=str, default=None, help="JSON {groupe: [colonnes]} : permutation importance par groupe de features.")
+    parser.add_argument("--perm_early_stop_tol", type=float, default=None, help="Arrêt anticipé des features dont |importance| <= tol sur les premières répétitions.")
+    parser.add_argument("--incremental", action="store_true", help="Entraînement incrémental d'un fold au suivant (RF warm_start, LR SGD partial_fit).")
+    parser.add_argument("--warm_start_trees", type=int, default=50, help="Arbres ajoutés à chaque fold en mode incrémental.")
+    parser.add_argument("--compare_cold_start", action="store_true", help="Compare le mode incrémental à l'entraînement de zéro (temps, métriques).")
+    parser.add_argument("--compress_duplicates", action="store_true", help="Regroupe les lignes identiques du train de chaque fold (comptes en sample_weight ; sans --incremental).")
+    parser.add_argument("--typed", action="store_true", help="Lecture typée de la matrice (uint8/16/32, float32 ; schéma <matrix_csv>.schema.json).")
+    parser.add_argument("--diagnostics", type=str, default="full", choices=["full", "sample", "off"], help="Diagnostics de leakage au chargement (aperçu + corrélation avec le label).")
+    parser.add_argument("--diagnostics_sample_rows", type=int, default=100_000, help="Lignes utilisées par les diagnostics en mode 'sample'.")
+    parser.add_argument("--mmap_dir", type=str, default=None, help="Dossier des buffers X/y partagés en memory-map (.npy).")
+    parser.add_argument("--model_cache_dir", type=str, default=None, help="Dossier de persistance des modèles par fold (réutilisés si les données sont identiques).")
     return parser.parse_args()
 
 
@@ -155,6 +220,20 @@ def main() -> None:
         structured_csv=args.structured_csv,
         model_name=args.model,
         n_splits=args.splits,
+        n_jobs=args.n_jobs,
+        fold_workers=args.fold_workers,
+        class_weight=None if args.class_weight == "none" else args.class_weight,
+        model_cache_dir=args.model_cache_dir,
+        feature_groups_json=args.feature_groups_json,
+        perm_early_stop_tol=args.perm_early_stop_tol,
+        mmap_dir=args.mmap_dir,
+        incremental=args.incremental,
+        warm_start_trees=args.warm_start_trees,
+        compare_cold_start=args.compare_cold_start,
+        compress_duplicates=args.compress_duplicates,
+        typed=args.typed,
+        diagnostics=args.diagnostics,
+        diagnostics_sample_rows=args.diagnostics_sample_rows,
     )
 
 
@@ -0,0 +1,128 @@
+"""
+block_ids.py
+------------
+BlockId HDFS codés en entiers int64 signés (blk_-5974833545991408899 → -5974833545991408899)
+et jointure compacte avec HDFS_anomaly_label.csv.
+
+Principe :
+- le BlockId est un long Java : il tient exactement dans un int64, plus de chaînes
+  Python dans les matrices / séquences (mémoire, tri et fusion sur des entiers) ;
+- les labels sont rangés une fois pour toutes dans deux tableaux triés
+  (keys int64, labels int8), mis en cache à côté du CSV (<labels_csv>.npz) :
+  la jointure est un np.searchsorted au lieu d'un merge sur ~575k chaînes ;
+- la chaîne "blk_..." n'est reconstruite que pour l'affichage / l'export.
+
+Module unique partagé par les étapes (import : from common.block_ids import ...,
+racine du projet ajoutée au chemin par configs/__init__.py de chaque étape) : extraction
+des BlockId et cache <labels_csv>.npz identiques partout.
+
+Fonctions :
+- encode_block_ids   : BlockId (ou Content contenant un BlockId) → Int64 (NA si absent).
+- decode_block_ids   : int64 → "blk_..." (affichage / export).
+- load_label_index   : Index trié des labels (cache .npz reconstruit si le CSV est plus récent).
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+BLOCK_PREFIX = "blk_"
+
+# Partie numérique du BlockId (blk_-123 → -123)
+BLOCK_ID_PATTERN = r"blk_(-?\d+)"
+
+# Labels HDFS_anomaly_label.csv → 0 / 1 (mêmes valeurs que data_utils de l'étape 3)
+LABEL_VALUES = {"Normal": 0, "normal": 0, "Anomaly": 1, "anomaly": 1}
+
+# Valeur renvoyée par BlockLabelIndex.lookup pour un BlockId absent du fichier de labels
+MISSING_LABEL = -1
+
+
+def encode_block_ids(values: pd.Series) -> pd.Series:
+    """
+    BlockId int64 de chaque valeur : chaîne "blk_..." ou texte la contenant (Content).
+    Valeurs déjà entières renvoyées telles quelles. NA si aucun BlockId.
+    """
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype("Int64")
+
+    digits = values.astype(str).str.extract(BLOCK_ID_PATTERN, expand=False)
+    valid = digits.notna().to_numpy(copy=True)
+
+    # Conversion sur les seules valeurs présentes (un passage par float perdrait des chiffres)
+    codes = pd.Series(pd.NA, index=values.index, dtype="Int64")
+    codes[valid] = digits[valid].astype(np.int64).to_numpy()
+    return codes
+
+
+def decode_block_ids(codes) -> np.ndarray:
+    """
+    int64 → "blk_..." (tableau de chaînes), pour l'affichage ou l'export.
+    """
+    return np.char.add(BLOCK_PREFIX, np.asarray(codes, dtype=np.int64).astype(str)).astype(object)
+
+
+@dataclass
+class BlockLabelIndex:
+    keys: np.ndarray            # (n_blocks,) int64 triés
+    labels: np.ndarray          # (n_blocks,) int8 : 0 normal, 1 anomalie
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, block_ids) -> np.ndarray:
+        """
+        Label (int8) de chaque BlockId int64, MISSING_LABEL si absent du fichier de labels.
+        """
+        block_ids = np.asarray(block_ids, dtype=np.int64)
+        if len(self.keys) == 0:
+            return np.full(len(block_ids), MISSING_LABEL, dtype=np.int8)
+
+        pos = np.minimum(np.searchsorted(self.keys, block_ids), len(self.keys) - 1)
+        found = self.keys[pos] == block_ids
+        return np.where(found, self.labels[pos], MISSING_LABEL).astype(np.int8)
+
+
+def build_label_index(labels_csv: str, label_col: str = "Label") -> BlockLabelIndex:
+    """
+    Lit HDFS_anomaly_label.csv (BlockId, Label) et construit l'index trié.
+    """
+    df = pd.read_csv(labels_csv, usecols=["BlockId", label_col])
+
+    # Étape 1. Labels texte → 0 / 1 (fichiers déjà binarisés acceptés)
+    labels = df[label_col]
+    if not pd.api.types.is_numeric_dtype(labels):
+        labels = labels.map(LABEL_VALUES)
+    if labels.isna().any():
+        raise ValueError(
+            f"Valeurs inattendues dans {label_col} : seulement {sorted(LABEL_VALUES)} ou 0 / 1 autorisés."
+        )
+
+    # Étape 2. BlockId entiers triés (doublons : première occurrence conservée)
+    keys = encode_block_ids(df["BlockId"])
+    if keys.isna().any():
+        raise ValueError(f"BlockId invalides dans {labels_csv} : {df.loc[keys.isna(), 'BlockId'].head().tolist()}")
+    keys = keys.to_numpy(dtype=np.int64)
+
+    keys, first = np.unique(keys, return_index=True)
+    return BlockLabelIndex(keys=keys, labels=labels.to_numpy(dtype=np.int8)[first])
+
+
+def load_label_index(labels_csv: str, label_col: str = "Label") -> BlockLabelIndex:
+    """
+    Index des labels, lu depuis le cache <labels_csv>.npz s'il est plus récent que le CSV,
+    sinon construit puis mis en cache.
+    """
+    cache_path = f"{labels_csv}.npz"
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(labels_csv):
+        with np.load(cache_path) as payload:
+            return BlockLabelIndex(keys=payload["keys"], labels=payload["labels"])
+
+    index = build_label_index(labels_csv, label_col)
+    try:
+        np.savez(cache_path, keys=index.keys, labels=index.labels)
+    except OSError as exc:
+        print(f"[WARN] Cache des labels non écrit ({cache_path}) : {exc}")
+    return index